@@ -0,0 +1,73 @@
+"""
+Benchmarks del backend. Se ejecutan desde la carpeta backend/, por ejemplo:
+
+    python manage.py seed_benchmark_data --requests 50000
+    python -m benchmarks.micro --output micro.json
+    python -m benchmarks.load --output load.json
+    python -m benchmarks.assignment --open 10000 --output assignment.json
+    python -m benchmarks.compare antes.json despues.json
+
+Los resultados en JSON llevan el commit y la fecha para comparar entre
+versiones.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    import django
+    django.setup()
+
+
+def percentiles(samples, points=(50, 95, 99)):
+    """
+    Percentiles (en las mismas unidades que ``samples``) por interpolación,
+    como statistics.quantiles.
+    """
+    if not samples:
+        return {point: None for point in points}
+    if len(samples) == 1:
+        return {point: samples[0] for point in points}
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return {point: cuts[point - 1] for point in points}
+
+
+def commit_info():
+    def git(*args):
+        try:
+            return subprocess.run(
+                ['git', *args], capture_output=True, text=True, check=True,
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    return {
+        'id': git('rev-parse', 'HEAD'),
+        'branch': git('rev-parse', '--abbrev-ref', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain')),
+    }
+
+
+def write_results(path, kind, benchmarks, **config):
+    """
+    Guarda los resultados con el formato que lee benchmarks.compare.
+    """
+    data = {
+        'kind': kind,
+        'datetime': datetime.now(timezone.utc).isoformat(),
+        'commit_info': commit_info(),
+        'machine_info': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+        },
+        'config': config,
+        'benchmarks': benchmarks,
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, default=str)
@@ -0,0 +1,111 @@
+"""
+Latencia de la asignación automática de técnicos (request.assignment) con
+muchas solicitudes abiertas, frente a contar la carga de todos los técnicos
+en cada asignación:
+
+    python -m benchmarks.assignment --open 10000 --technicians 20 --output assignment.json
+
+Las solicitudes y técnicos se crean dentro de una transacción que se
+revierte al terminar. Los resultados usan el formato de benchmarks.micro,
+así que se comparan con benchmarks.compare.
+"""
+import argparse
+
+from benchmarks import setup_django, write_results
+from benchmarks.micro import Benchmark
+
+PREFIX = '__assignment'
+
+
+def naive_assignment():
+    """
+    Alternativa sin índice en memoria: agrega la carga de todos los técnicos.
+    """
+    from django.contrib.auth.models import User
+    from django.db.models import Count
+    from request.models import OPEN_STATUSES, Request
+
+    staff = User.objects.filter(is_staff=True, is_active=True).values_list('pk', flat=True)
+    counts = dict(
+        Request.objects.filter(status__in=OPEN_STATUSES, technician__in=staff)
+        .values_list('technician_id')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    return min(staff, key=lambda pk: (counts.get(pk, 0), pk))
+
+
+def benchmarks(department):
+    from request.assignment import assign_technician, assignment_lock, workload
+    from request.models import Request
+
+    def assign():
+        with assignment_lock():
+            return assign_technician(department.pk)
+
+    def assign_and_create():
+        with assignment_lock():
+            Request.objects.create(
+                subject='Asignación', description='Benchmark', note='Benchmark', department=department,
+                technician_id=assign_technician(department.pk),
+            )
+
+    return {
+        'assign_heap': assign,
+        'assign_naive_aggregate': naive_assignment,
+        'assign_and_create': assign_and_create,
+        'workload_rebuild': workload.rebuild,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--open', type=int, default=10000, help='Solicitudes abiertas que se crean.')
+    parser.add_argument('--technicians', type=int, default=20)
+    parser.add_argument('-k', dest='keyword', help='Sólo los benchmarks cuyo nombre contiene este texto.')
+    parser.add_argument('--max-time', type=float, default=1.0, help='Segundos por benchmark.')
+    parser.add_argument('--output', help='Guarda los resultados en un archivo JSON.')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.management import call_command
+    from django.db import connection, transaction
+    from department.models import Department
+    from request.models import OPEN_STATUSES, Request
+
+    bench = Benchmark(max_time=args.max_time)
+    results = []
+    with transaction.atomic():
+        call_command(
+            'seed_benchmark_data', requests=args.open, technicians=args.technicians,
+            prefix=PREFIX, verbosity=0,
+        )
+        Request.objects.filter(technician__username__startswith=PREFIX).update(status=Request.OPEN, resolved_at=None)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE request_request')
+        open_total = Request.objects.filter(status__in=OPEN_STATUSES).count()
+        print(f'{open_total} solicitudes abiertas')
+
+        department = Department.objects.filter(name__startswith=PREFIX).order_by('pk').first()
+        for name, func in benchmarks(department).items():
+            if args.keyword and args.keyword not in name:
+                continue
+            result = bench(f'{name}_{args.open}_open', func)
+            results.append(result)
+            stats = result['stats']
+            print(
+                f"{result['name']:<36} mediana {stats['median'] * 1000:9.3f} ms | min {stats['min'] * 1000:9.3f} ms | "
+                f"{stats['ops']:9.1f} op/s | {result['queries']} consultas"
+            )
+        transaction.set_rollback(True)
+
+    if args.output:
+        write_results(
+            args.output, 'micro', results,
+            database=connection.vendor, open=args.open, technicians=args.technicians,
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Compara el rendimiento de peticiones autenticadas con TokenAuthentication de
+DRF (consulta Token + User en cada petición) contra
+user.authentication.CachedTokenAuthentication:
+
+    python -m benchmarks.auth --requests 2000
+
+Usa la base de datos configurada en DATABASE_URL; el usuario y el token de
+prueba se crean dentro de una transacción que se revierte al terminar.
+"""
+import argparse
+import json
+import time
+
+from benchmarks import setup_django
+
+
+def _run(client, url, headers, count):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        for _ in range(count):
+            response = client.get(url, headers=headers)
+            assert response.status_code == 200, response.status_code
+        elapsed = time.perf_counter() - start
+    return {
+        'requests_per_second': count / elapsed,
+        'mean_ms': elapsed / count * 1000,
+        'queries_per_request': len(queries.captured_queries) / count,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--output', help='Guarda los resultados en un archivo JSON.')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.db import transaction
+    from django.test import Client
+    from django.urls import reverse
+    from rest_framework.authentication import TokenAuthentication
+    from rest_framework.authtoken.models import Token
+    from user.authentication import CachedTokenAuthentication, token_cache
+    from user.views import UserViewSet
+
+    report = []
+    with transaction.atomic():
+        user = User.objects.create_user(username='__benchmark_auth', is_staff=True)
+        token = Token.objects.create(user=user)
+        url = reverse('user-detail', args=[user.pk])
+        headers = {'authorization': f'Token {token.key}'}
+        client = Client()
+        original = UserViewSet.authentication_classes
+        try:
+            for name, authentication in (('sin caché', TokenAuthentication), ('con caché', CachedTokenAuthentication)):
+                UserViewSet.authentication_classes = [authentication]
+                token_cache.clear()
+                client.get(url, headers=headers)
+                report.append({'variant': name, **_run(client, url, headers, args.requests)})
+        finally:
+            UserViewSet.authentication_classes = original
+            transaction.set_rollback(True)
+
+    for row in report:
+        print(
+            f"{row['variant']:>9}: {row['requests_per_second']:8.1f} req/s | "
+            f"media {row['mean_ms']:6.3f} ms | {row['queries_per_request']:.2f} consultas por petición"
+        )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
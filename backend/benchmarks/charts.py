@@ -0,0 +1,123 @@
+"""
+Compara el gráfico de los informes con pyplot + pandas a un PNG temporal
+(implementación anterior) contra request.charts (Figure/Agg en memoria).
+
+Cada variante corre en un proceso nuevo para medir el costo de importación y
+el pico de memoria (RSS) de forma aislada:
+
+    python -m benchmarks.charts --iterations 10 --departments 12
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import time
+
+
+def legacy_chart(counts, dpi):
+    import pandas as pd
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from tempfile import NamedTemporaryFile
+
+    full_counts = pd.Series(dict(counts))
+    with NamedTemporaryFile(suffix=".png", delete=False) as chart_file:
+        plt.figure(figsize=(10, 6))
+        full_counts.plot(kind='bar', color='skyblue')
+        plt.title('Número de Solicitudes por Departamento')
+        plt.xlabel('Departamento')
+        plt.ylabel('Número de Solicitudes')
+        plt.xticks(rotation=45, ha='right')
+        plt.tight_layout()
+        plt.savefig(chart_file.name, dpi=dpi)
+        plt.close()
+    with open(chart_file.name, 'rb') as f:
+        content = f.read()
+    os.remove(chart_file.name)
+    return content
+
+
+def current_chart(counts, dpi):
+    from request import charts
+    # Sin memorizar: se mide el dibujo completo en cada iteración
+    charts._render_department_chart.cache_clear()
+    return charts.department_chart(counts, dpi=dpi)
+
+
+VARIANTS = {
+    'legacy': legacy_chart,
+    'current': current_chart,
+}
+
+
+def _run_variant(name, counts, iterations, dpi, results):
+    render = VARIANTS[name]
+
+    start = time.perf_counter()
+    render(counts, dpi)
+    first_call = time.perf_counter() - start
+
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        render(counts, dpi)
+        timings.append(time.perf_counter() - start)
+
+    result = {
+        'variant': name,
+        'first_call_ms': first_call * 1000,
+        'median_ms': statistics.median(timings) * 1000,
+        'max_ms': max(timings) * 1000,
+        # ru_maxrss está en KB en Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+    if name == 'current':
+        from request import charts
+        charts.department_chart(counts, dpi=dpi)
+        start = time.perf_counter()
+        charts.department_chart(counts, dpi=dpi)
+        result['memoized_ms'] = (time.perf_counter() - start) * 1000
+
+    results.put(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--departments', type=int, default=12)
+    parser.add_argument('--dpi', type=int, default=300)
+    parser.add_argument('--output', help='Guarda los resultados en un archivo JSON.')
+    args = parser.parse_args()
+
+    counts = [(f'Departamento {i:02d}', (i * 7) % 23) for i in range(args.departments)]
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+
+    report = []
+    for name in VARIANTS:
+        process = context.Process(target=_run_variant, args=(name, counts, args.iterations, args.dpi, results))
+        process.start()
+        report.append(results.get())
+        process.join()
+
+    for row in report:
+        line = (
+            f"{row['variant']:>8}: primera llamada {row['first_call_ms']:8.1f} ms | "
+            f"mediana {row['median_ms']:7.1f} ms | máx {row['max_ms']:7.1f} ms | "
+            f"RSS pico {row['peak_rss_mb']:6.1f} MB"
+        )
+        if 'memoized_ms' in row:
+            line += f" | memorizado {row['memoized_ms']:.3f} ms"
+        print(line)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Compara dos resultados JSON de benchmarks.micro, load o servers (por
+ejemplo de dos commits) y termina con código 1 si alguna métrica empeoró más
+que --threshold:
+
+    python -m benchmarks.compare antes.json despues.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+# Métricas comparadas por tipo de resultado: (nombre, extractor, mayor es mejor)
+METRICS = {
+    'micro': [
+        ('median_ms', lambda row: row['stats']['median'] * 1000, False),
+        ('queries', lambda row: row['queries'], False),
+    ],
+    'load': [
+        ('requests_per_second', lambda row: row['requests_per_second'], True),
+        ('p95_ms', lambda row: row['p95_ms'], False),
+        ('p99_ms', lambda row: row['p99_ms'], False),
+        ('queries_per_request', lambda row: row['queries_per_request'], False),
+    ],
+    'servers': [
+        ('requests_per_second', lambda row: row['requests_per_second'], True),
+        ('p95_ms', lambda row: row['p95_ms'], False),
+    ],
+}
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(before, after, threshold):
+    """
+    Filas (benchmark, métrica, antes, después, cambio %, empeoró).
+    """
+    if before['kind'] != after['kind']:
+        raise ValueError(f"No se pueden comparar resultados '{before['kind']}' y '{after['kind']}'.")
+    previous = {row['name']: row for row in before['benchmarks']}
+    rows = []
+    for row in after['benchmarks']:
+        old = previous.get(row['name'])
+        if old is None:
+            continue
+        for metric, value, higher_is_better in METRICS[after['kind']]:
+            old_value, new_value = value(old), value(row)
+            if old_value is None or new_value is None:
+                continue
+            change = (new_value - old_value) / old_value * 100 if old_value else 0.0
+            worse = -change if higher_is_better else change
+            # Las consultas no tienen ruido: cualquier aumento cuenta
+            regressed = worse > 0 if 'queries' in metric else worse > threshold
+            rows.append((row['name'], metric, old_value, new_value, change, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Porcentaje tolerado antes de marcar regresión.')
+    args = parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    print(f"{(before['commit_info'].get('id') or '?')[:10]} -> {(after['commit_info'].get('id') or '?')[:10]}")
+    rows = compare(before, after, args.threshold)
+    for name, metric, old_value, new_value, change, regressed in rows:
+        mark = 'REGRESIÓN' if regressed else ''
+        print(f"{name:<28} {metric:<20} {old_value:12.3f} -> {new_value:12.3f} ({change:+7.1f} %) {mark}")
+
+    if any(row[-1] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+Prueba de carga local por HTTP: levanta la aplicación WSGI en un servidor
+con hilos dentro del proceso y la recorre con clientes concurrentes.
+Reporta throughput, p50/p95/p99 y consultas SQL por petición de cada
+escenario:
+
+    python manage.py seed_benchmark_data --requests 50000
+    python -m benchmarks.load --concurrency 8 --requests 500 --output load.json
+
+Usa los datos ya guardados en DATABASE_URL (el servidor abre sus propias
+conexiones, así que no ve datos sin confirmar).
+"""
+import argparse
+import http.client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from benchmarks import percentiles, setup_django, write_results
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class QueryCounter:
+    """
+    Middleware WSGI que cuenta las consultas de cada petición con
+    connection.execute_wrapper (la conexión es la del hilo que atiende).
+    """
+    def __init__(self, application):
+        self.application = application
+        self.queries = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        from django.db import connection
+
+        count = 0
+
+        def counter(execute, sql, params, many, context):
+            nonlocal count
+            count += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(counter):
+            response = self.application(environ, start_response)
+            # Las respuestas en streaming consultan mientras se leen
+            body = list(response)
+            if hasattr(response, 'close'):
+                response.close()
+        with self._lock:
+            self.queries += count
+            self.requests += 1
+        return body
+
+    def reset(self):
+        with self._lock:
+            queries, requests = self.queries, self.requests
+            self.queries = self.requests = 0
+        return queries, requests
+
+
+def scenarios():
+    """
+    (nombre, ruta) de los endpoints medidos. Todos son de lectura y no piden
+    autenticación.
+    """
+    from django.urls import reverse
+    from django.utils import timezone
+    from request.models import Request
+
+    end = timezone.localdate()
+    start = end - timedelta(days=30)
+    dates = f'start_date={start.isoformat()}&end_date={end.isoformat()}'
+    request_id = Request.objects.order_by('-created_at').values_list('pk', flat=True).first()
+    requests = reverse('request-list')
+    return [
+        ('requests_page', f'{requests}?page_size=50'),
+        ('requests_page_fields', f'{requests}?page_size=50&fields=id,subject,department_name,created_at'),
+        ('requests_date_range', f'{requests}?page_size=50&{dates}'),
+        ('requests_search', f'{requests}?page_size=50&q=solicitud'),
+        ('request_detail', reverse('request-detail', args=[request_id])),
+        ('request_stats', f"{reverse('request-stats')}?{dates}"),
+        ('departments', reverse('department-list')),
+    ]
+
+
+def get(host, port, path):
+    connection = http.client.HTTPConnection(host, port, timeout=60)
+    try:
+        start = time.perf_counter()
+        connection.request('GET', path, headers={'Accept': 'application/json'})
+        response = connection.getresponse()
+        response.read()
+        return response.status, time.perf_counter() - start
+    finally:
+        connection.close()
+
+
+def run_scenario(host, port, path, concurrency, total):
+    latencies = []
+    errors = 0
+    with ThreadPoolExecutor(concurrency) as executor:
+        start = time.perf_counter()
+        for status, elapsed in executor.map(lambda _: get(host, port, path), range(total)):
+            latencies.append(elapsed * 1000)
+            if status != 200:
+                errors += 1
+        elapsed = time.perf_counter() - start
+    cuts = percentiles(latencies)
+    return {
+        'requests_per_second': total / elapsed,
+        'p50_ms': cuts[50],
+        'p95_ms': cuts[95],
+        'p99_ms': cuts[99],
+        'max_ms': max(latencies),
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=500, help='Peticiones por escenario.')
+    parser.add_argument('-k', dest='keyword', help='Sólo los escenarios cuyo nombre contiene este texto.')
+    parser.add_argument('--output', help='Guarda los resultados en un archivo JSON.')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+
+    application = QueryCounter(get_wsgi_application())
+    server = make_server('127.0.0.1', 0, application, server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+    host, port = server.server_address
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    results = []
+    try:
+        for name, path in scenarios():
+            if args.keyword and args.keyword not in name:
+                continue
+            # Calentamiento: cachés de consultas, plantillas y conexiones
+            run_scenario(host, port, path, args.concurrency, args.concurrency)
+            application.reset()
+            row = run_scenario(host, port, path, args.concurrency, args.requests)
+            queries, requests = application.reset()
+            row = {'name': name, 'path': path, **row, 'queries_per_request': queries / requests if requests else None}
+            results.append(row)
+            print(
+                f"{name:<22} {row['requests_per_second']:8.1f} req/s | p50 {row['p50_ms']:7.2f} ms | "
+                f"p95 {row['p95_ms']:7.2f} ms | p99 {row['p99_ms']:7.2f} ms | "
+                f"{row['queries_per_request']:.2f} consultas/petición | {row['errors']} errores"
+            )
+    finally:
+        server.shutdown()
+
+    if args.output:
+        write_results(
+            args.output, 'load', results,
+            database=connection.vendor, concurrency=args.concurrency, requests=args.requests,
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+"""
+Micro-benchmarks al estilo de pytest-benchmark (rondas calibradas, min,
+mediana, media, desviación, operaciones por segundo) para RequestSerializer,
+RequestFilter, generate_report y generate_single_report:
+
+    python -m benchmarks.micro --output micro.json
+    python -m benchmarks.micro -k serializer --rows 20000
+
+Usa la base de datos de DATABASE_URL. Si tiene menos de --rows solicitudes
+se completa con seed_benchmark_data dentro de una transacción que se
+revierte al terminar.
+"""
+import argparse
+import io
+import statistics
+import time
+from datetime import timedelta
+
+from benchmarks import setup_django, write_results
+
+
+class Benchmark:
+    """
+    Ejecuta una función en rondas. Cada ronda repite la llamada las veces
+    necesarias para durar al menos ``min_time`` (así las funciones rápidas
+    no quedan por debajo de la resolución del reloj) y se hacen rondas hasta
+    ``max_time`` segundos, con un mínimo de ``min_rounds``.
+    """
+    def __init__(self, min_rounds=5, min_time=0.005, max_time=1.0, warmup=1):
+        self.min_rounds = min_rounds
+        self.min_time = min_time
+        self.max_time = max_time
+        self.warmup = warmup
+
+    def calibrate(self, func):
+        iterations = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                func()
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.min_time or iterations >= 1000:
+                return iterations
+            iterations *= 10 if elapsed < self.min_time / 10 else 2
+
+    def __call__(self, name, func):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        for _ in range(self.warmup):
+            func()
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        iterations = self.calibrate(func)
+
+        rounds = []
+        deadline = time.perf_counter() + self.max_time
+        while len(rounds) < self.min_rounds or time.perf_counter() < deadline:
+            start = time.perf_counter()
+            for _ in range(iterations):
+                func()
+            rounds.append((time.perf_counter() - start) / iterations)
+
+        mean = statistics.fmean(rounds)
+        q1, _, q3 = statistics.quantiles(rounds, n=4) if len(rounds) > 1 else (rounds[0],) * 3
+        return {
+            'name': name,
+            'stats': {
+                'min': min(rounds),
+                'max': max(rounds),
+                'mean': mean,
+                'stddev': statistics.stdev(rounds) if len(rounds) > 1 else 0.0,
+                'median': statistics.median(rounds),
+                'iqr': q3 - q1,
+                'ops': 1 / mean,
+                'rounds': len(rounds),
+                'iterations': iterations,
+            },
+            'queries': len(queries.captured_queries),
+        }
+
+
+def benchmarks(rows):
+    """
+    Funciones a medir, con nombre. Se preparan fuera de la medición los
+    datos que no forman parte de lo que se mide.
+    """
+    from django.utils import timezone
+    from request.filters import RequestFilter
+    from request.models import Request
+    from request.reports import render_report, report_range
+    from request.serializers import RequestSerializer
+    from request.single_reports import render_single_report, single_report_context
+
+    end = timezone.localdate()
+    start = end - timedelta(days=30)
+    report_start, report_end = report_range(start, end)
+    requests = list(Request.objects.order_by('-created_at', '-id')[:rows])
+    single = Request.objects.select_related('department', 'technician').order_by('-created_at').first()
+    params = {'start_date': start.isoformat(), 'end_date': end.isoformat()}
+    queryset = Request.objects.order_by('-created_at', '-id')
+
+    return {
+        f'serializer_{rows}_rows': lambda: RequestSerializer(requests, many=True).data,
+        'filter_date_range_page': lambda: list(RequestFilter(params, queryset=queryset).qs[:50]),
+        'filter_search_page': lambda: list(RequestFilter({'q': 'solicitud prueba'}, queryset=queryset).qs[:50]),
+        'generate_report_30_days': lambda: render_report(report_start, report_end, io.BytesIO()),
+        'generate_single_report': lambda: render_single_report(single_report_context(single)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-k', dest='keyword', help='Sólo los benchmarks cuyo nombre contiene este texto.')
+    parser.add_argument('--rows', type=int, default=10000, help='Solicitudes mínimas en la base de datos.')
+    parser.add_argument('--serializer-rows', type=int, default=500)
+    parser.add_argument('--max-time', type=float, default=1.0, help='Segundos por benchmark.')
+    parser.add_argument('--output', help='Guarda los resultados en un archivo JSON.')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.management import call_command
+    from django.db import connection, transaction
+    from request.models import Request
+
+    bench = Benchmark(max_time=args.max_time)
+    results = []
+    with transaction.atomic():
+        missing = args.rows - Request.objects.count()
+        if missing > 0:
+            call_command('seed_benchmark_data', requests=missing, prefix='__benchmark', verbosity=0)
+        for name, func in benchmarks(args.serializer_rows).items():
+            if args.keyword and args.keyword not in name:
+                continue
+            result = bench(name, func)
+            results.append(result)
+            stats = result['stats']
+            print(
+                f"{name:<28} mediana {stats['median'] * 1000:9.3f} ms | min {stats['min'] * 1000:9.3f} ms | "
+                f"{stats['ops']:9.1f} op/s | {stats['rounds']:4d} rondas | {result['queries']} consultas"
+            )
+        transaction.set_rollback(True)
+
+    if args.output:
+        write_results(
+            args.output, 'micro', results,
+            database=connection.vendor, rows=args.rows, serializer_rows=args.serializer_rows,
+        )
+
+
+if __name__ == '__main__':
+    main()
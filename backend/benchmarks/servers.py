@@ -0,0 +1,164 @@
+"""
+Prueba de carga: throughput con peticiones concurrentes bajo uvicorn (ASGI,
+core.asgi) contra gunicorn (WSGI, core.wsgi), con las vistas síncronas de
+DRF y con las vistas async de /api/async/:
+
+    python -m benchmarks.servers --concurrency 50 --requests 2000 --workers 2
+
+Cada servidor se arranca en un puerto libre con la base de datos de
+DATABASE_URL (conviene cargar datos antes, p. ej. con insert_requests).
+El cliente es asyncio puro para que no sea el cuello de botella.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from benchmarks import percentiles, write_results
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PATHS = {
+    'sync': '/api/requests/?fields=id,subject,department_name,technician_full_name,created_at',
+    'async': '/api/async/requests/?fields=id,subject,department_name,technician_full_name,created_at',
+}
+
+
+def server_commands(port, workers, threads):
+    bind = f'127.0.0.1:{port}'
+    return {
+        'gunicorn': [
+            sys.executable, '-m', 'gunicorn', 'core.wsgi:application',
+            '--bind', bind, '--workers', str(workers), '--threads', str(threads),
+            '--log-level', 'warning',
+        ],
+        'uvicorn': [
+            sys.executable, '-m', 'uvicorn', 'core.asgi:application',
+            '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers),
+            '--log-level', 'warning', '--no-access-log',
+        ],
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def fetch(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(
+            f'GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n'
+            f'Accept: application/json\r\nConnection: close\r\n\r\n'.encode()
+        )
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    return int(response.split(b' ', 2)[1]) if response else 0
+
+
+async def wait_until_ready(url, timeout=30):
+    parts = urlsplit(url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if await fetch(parts.hostname, parts.port, parts.path or '/') == 200:
+                return
+        except OSError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f'El servidor no respondió en {timeout} s: {url}')
+
+
+async def load(url, concurrency, total):
+    """
+    ``total`` peticiones GET con ``concurrency`` clientes simultáneos.
+    """
+    parts = urlsplit(url)
+    path = f'{parts.path}?{parts.query}' if parts.query else parts.path
+    latencies = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def client():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                status = await fetch(parts.hostname, parts.port, path)
+            except OSError:
+                status = 0
+            latencies.append((time.perf_counter() - start) * 1000)
+            if status != 200:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    cuts = percentiles(latencies)
+    return {
+        'requests_per_second': total / elapsed,
+        'p50_ms': cuts[50],
+        'p95_ms': cuts[95],
+        'p99_ms': cuts[99],
+        'errors': errors,
+    }
+
+
+def run(server, variants, args):
+    port = free_port()
+    command = server_commands(port, args.workers, args.threads)[server]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR)
+    results = []
+    try:
+        base = f'http://127.0.0.1:{port}'
+        asyncio.run(wait_until_ready(f'{base}/api/departments/'))
+        for variant in variants:
+            url = base + PATHS[variant]
+            # Calentamiento: cachés de consultas y conexiones
+            asyncio.run(load(url, args.concurrency, args.concurrency * 2))
+            row = asyncio.run(load(url, args.concurrency, args.requests))
+            results.append({'name': f'{server}_{variant}', 'server': server, 'views': variant, **row})
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4, help='Hilos por worker de gunicorn.')
+    parser.add_argument('--output', help='Guarda los resultados en un archivo JSON.')
+    args = parser.parse_args()
+
+    report = []
+    scenarios = (('gunicorn', ('sync',)), ('uvicorn', ('sync', 'async')))
+    for server, variants in scenarios:
+        report.extend(run(server, variants, args))
+
+    for row in report:
+        print(
+            f"{row['server']:>8} {row['views']:>5}: {row['requests_per_second']:8.1f} req/s | "
+            f"p50 {row['p50_ms']:7.2f} ms | p95 {row['p95_ms']:7.2f} ms | "
+            f"p99 {row['p99_ms']:7.2f} ms | {row['errors']} errores"
+        )
+
+    if args.output:
+        write_results(
+            args.output, 'servers', report,
+            concurrency=args.concurrency, requests=args.requests, workers=args.workers, threads=args.threads,
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Compara la carga de las plantillas .docx en cada informe (DocxTemplate desde
+la ruta, implementación anterior) contra request.docx_templates (copia del
+documento ya analizado en caché del proceso):
+
+    python -m benchmarks.templates --iterations 50
+
+Se mide la preparación de la plantilla y el ciclo completo
+(preparar + render + save) del informe individual.
+"""
+import argparse
+import io
+import json
+import statistics
+import time
+
+from benchmarks import setup_django
+
+CONTEXT = {
+    'request': {
+        'id': 1,
+        'subject': 'Impresora atascada',
+        'description': 'La impresora del segundo piso no toma hojas.',
+        'note': 'Se limpió el rodillo.',
+        'created_at': '01 de enero del 2025',
+        'depardepartment_director': 'Ana Pérez',
+        'department_name': 'Sistemas',
+        'technician_full_name': 'José Rodríguez',
+    }
+}
+
+
+def legacy_load(name):
+    from docxtpl import DocxTemplate
+    from request import docx_templates
+    doc = DocxTemplate(docx_templates.template_path(name))
+    doc.init_docx()
+    return doc
+
+
+def cached_load(name):
+    from request import docx_templates
+    return docx_templates.load(name)
+
+
+VARIANTS = {
+    'legacy': legacy_load,
+    'cached': cached_load,
+}
+
+
+def _measure(function, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def _render(load, name):
+    doc = load(name)
+    doc.render(CONTEXT)
+    doc.save(io.BytesIO())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--output', help='Guarda los resultados en un archivo JSON.')
+    args = parser.parse_args()
+
+    setup_django()
+    from request import docx_templates
+    name = docx_templates.SINGLE_REPORT_TEMPLATE
+    docx_templates.warm_up(name)
+
+    report = []
+    for variant, load in VARIANTS.items():
+        report.append({
+            'variant': variant,
+            'load_ms': _measure(lambda: load(name), args.iterations),
+            'render_ms': _measure(lambda: _render(load, name), args.iterations),
+        })
+
+    legacy, cached = report
+    for row in report:
+        print(f"{row['variant']:>7}: carga {row['load_ms']:6.2f} ms | carga + render + save {row['render_ms']:6.2f} ms")
+    print(f"ahorro por informe: {legacy['render_ms'] - cached['render_ms']:.2f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# /api/requests/events/ (server-sent events) se atiende fuera de Django para
+# no ocupar un hilo por cliente conectado
+from request.sse import with_request_events  # noqa: E402
+
+application = with_request_events(django_application)
@@ -0,0 +1,54 @@
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from rest_framework import exceptions, serializers
+from rest_framework.renderers import JSONRenderer
+
+from .mixins import conditional_validators, patch_conditional_headers
+
+# Mismo renderizador que DRF para que el cuerpo sea idéntico al de las
+# vistas síncronas
+_renderer = JSONRenderer()
+# DRF da formato a las fechas con la zona horaria actual e isoformat
+_datetime = serializers.DateTimeField()
+
+
+def datetime_representation(value):
+    return _datetime.to_representation(value)
+
+
+def json_response(data, status=200):
+    return HttpResponse(_renderer.render(data), status=status, content_type=_renderer.media_type)
+
+
+def error_response(exc):
+    return json_response({'detail': exc.detail}, status=exc.status_code)
+
+
+def method_not_allowed(request):
+    """
+    405 como el de DRF para todo lo que no sea GET o HEAD. Los decoradores
+    de Django 4.2 (require_safe...) no aceptan vistas async.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        response = error_response(exceptions.MethodNotAllowed(request.method))
+        response['Allow'] = 'GET, HEAD'
+        return response
+    return None
+
+
+async def conditional(request, parts, moments, version_caches, respond):
+    """
+    GET condicional como ConditionalGetMixin: si el cliente ya tiene la
+    versión se responde 304 sin serializar; si no, ``await respond()``
+    genera la respuesta.
+    """
+    moments = list(moments)
+    for cache in version_caches:
+        version = await cache.aversion()
+        parts = [version, *parts]
+        moments.append(cache.changed_at(version))
+    etag, last_modified = conditional_validators(parts, moments, request.get_full_path(), _renderer.format)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = await respond()
+    return patch_conditional_headers(response, etag, last_modified)
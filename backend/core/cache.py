@@ -0,0 +1,160 @@
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import caches
+
+from .replicas import use_primary
+
+# Alias de CACHES para las tablas de consulta (departamentos, técnicos)
+LOOKUP_CACHE = 'lookups'
+
+_MISSING = object()
+
+_registry = {}
+
+
+class VersionedCache:
+    """
+    Caché de lectura con versión: las claves llevan el número de versión del
+    espacio de nombres, así invalidar es incrementar la versión en lugar de
+    borrar cada entrada. Las entradas viejas expiran solas por TIMEOUT.
+
+    Funciona con cualquier backend de Django; con LocMemCache (por defecto)
+    cada proceso tiene su copia, con Redis/Memcached la comparten.
+
+    Los valores se cargan siempre de la base de datos principal: leídos de
+    una réplica atrasada justo después de invalidar, quedarían viejos en la
+    caché para todos los clientes hasta el siguiente cambio.
+    """
+    def __init__(self, namespace, alias=LOOKUP_CACHE):
+        self.namespace = namespace
+        self.alias = alias
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        register(namespace, self)
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    @property
+    def version_key(self):
+        return f'{self.namespace}:version'
+
+    def version(self):
+        version = self.backend.get(self.version_key)
+        if version is None:
+            # Se parte de un valor basado en la hora para no reutilizar
+            # claves viejas si el backend perdió la versión
+            self.backend.add(self.version_key, time.time_ns(), timeout=None)
+            version = self.backend.get(self.version_key)
+        return version
+
+    async def aversion(self):
+        version = await self.backend.aget(self.version_key)
+        if version is None:
+            await self.backend.aadd(self.version_key, time.time_ns(), timeout=None)
+            version = await self.backend.aget(self.version_key)
+        return version
+
+    def _key(self, key, version=None):
+        return f'{self.namespace}:{version or self.version()}:{key}'
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_or_set(self, key, loader):
+        """
+        Devuelve el valor en caché o lo calcula con ``loader()`` y lo guarda.
+        """
+        cache_key = self._key(key)
+        value = self.backend.get(cache_key, _MISSING)
+        if value is not _MISSING:
+            self._count(hit=True)
+            return value
+        self._count(hit=False)
+        with use_primary():
+            value = loader()
+        self.backend.set(cache_key, value)
+        return value
+
+    async def aget_or_set(self, key, aloader):
+        """
+        Versión async de get_or_set; ``aloader`` es una corrutina.
+        """
+        cache_key = self._key(key, await self.aversion())
+        value = await self.backend.aget(cache_key, _MISSING)
+        if value is not _MISSING:
+            self._count(hit=True)
+            return value
+        self._count(hit=False)
+        with use_primary():
+            value = await aloader()
+        await self.backend.aset(cache_key, value)
+        return value
+
+    def refresh(self, key, loader):
+        """
+        Recalcula y guarda el valor sin esperar a que se invalide.
+        """
+        with use_primary():
+            value = loader()
+        self.backend.set(self._key(key), value)
+        return value
+
+    async def arefresh(self, key, aloader):
+        with use_primary():
+            value = await aloader()
+        await self.backend.aset(self._key(key, await self.aversion()), value)
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self.invalidations += 1
+        # La versión es la hora del cambio en nanosegundos (y siempre crece),
+        # así también sirve como fecha de última modificación
+        current = self.backend.get(self.version_key) or 0
+        self.backend.set(self.version_key, max(time.time_ns(), current + 1), timeout=None)
+
+    def changed_at(self, version=None):
+        """
+        Fecha aproximada de la última invalidación (o de la primera lectura
+        de la versión en este backend). Acepta una versión ya leída.
+        """
+        return datetime.fromtimestamp((version or self.version()) / 1e9, tz=dt_timezone.utc)
+
+    def stats(self):
+        with self._lock:
+            hits, misses, invalidations = self.hits, self.misses, self.invalidations
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 4) if total else None,
+            'invalidations': invalidations,
+        }
+
+
+def register(name, cache):
+    """
+    Registra una caché (cualquier objeto con ``stats()``) para cache_stats.
+    """
+    _registry[name] = cache
+
+
+def cache_stats():
+    """
+    Contadores de aciertos y fallos de cada caché en este proceso.
+    """
+    return {namespace: cache.stats() for namespace, cache in sorted(_registry.items())}
+
+
+def clear_lookup_caches():
+    caches[LOOKUP_CACHE].clear()
@@ -0,0 +1,321 @@
+import json
+import logging
+import re
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('instrumentation_timings', default=None)
+
+# Límites (segundos) del histograma de duración de peticiones
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Timings:
+    """
+    Mediciones de una petición: consultas SQL (cantidad y tiempo), tiempo de
+    la vista y tramos con nombre (``span``). Los tiempos están en segundos.
+    """
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.view_start = None
+        self.view_time = None
+        self.spans = {}
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+    def add_span(self, name, elapsed):
+        total, count = self.spans.get(name, (0.0, 0))
+        self.spans[name] = (total + elapsed, count + 1)
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+
+class _Span:
+    __slots__ = ('timings', 'name', 'start')
+
+    def __init__(self, timings, name):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.add_span(self.name, time.perf_counter() - self.start)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings.execute_wrapper(execute, sql, params, many, context)
+
+
+def install_query_wrapper(connection, **kwargs):
+    """
+    Deja el contador de consultas instalado en la conexión (una vez). Cuenta
+    para la petición del contexto actual: bajo ASGI las consultas corren en
+    otro hilo, con otra conexión, pero el contexto viaja con sync_to_async.
+    """
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+def span(name):
+    """
+    Mide un tramo con nombre dentro de la petición actual::
+
+        with span('chart'):
+            ...
+
+    Fuera de una petición instrumentada (o con la instrumentación apagada)
+    no hace nada.
+    """
+    timings = _current.get()
+    if timings is None:
+        return _NO_SPAN
+    return _Span(timings, name)
+
+
+def timed_iterator(iterable, name):
+    """
+    Atribuye a ``name`` el tiempo de obtener cada elemento; para consultas
+    perezosas que consume, por ejemplo, la plantilla del informe.
+    """
+    timings = _current.get()
+    if timings is None:
+        yield from iterable
+        return
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            timings.add_span(name, time.perf_counter() - start)
+            return
+        timings.add_span(name, time.perf_counter() - start)
+        yield item
+
+
+class Metrics:
+    """
+    Contadores e histogramas del proceso en formato de texto de Prometheus.
+    Con varios workers cada uno tiene los suyos (Prometheus los suma por
+    instancia).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}
+            self.durations = {}
+            self.queries = {}
+            self.db_time = {}
+            self.spans = {}
+
+    def observe(self, method, route, status, timings, elapsed):
+        with self._lock:
+            key = (method, route, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            buckets, total, count = self.durations.get(route, ([0] * len(DURATION_BUCKETS), 0.0, 0))
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if elapsed <= bound:
+                    buckets[i] += 1
+            self.durations[route] = (buckets, total + elapsed, count + 1)
+            self.queries[route] = self.queries.get(route, 0) + timings.queries
+            self.db_time[route] = self.db_time.get(route, 0.0) + timings.db_time
+            for name, (span_time, span_count) in timings.spans.items():
+                total, count = self.spans.get(name, (0.0, 0))
+                self.spans[name] = (total + span_time, count + span_count)
+
+    def render(self):
+        def labels(**values):
+            text = ','.join(f'{name}="{_escape(value)}"' for name, value in values.items())
+            return f'{{{text}}}'
+
+        with self._lock:
+            lines = [
+                '# HELP http_requests_total Peticiones atendidas.',
+                '# TYPE http_requests_total counter',
+            ]
+            for (method, route, status), count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{labels(method=method, route=route, status=status)} {count}')
+
+            lines += [
+                '# HELP http_request_duration_seconds Duración de las peticiones.',
+                '# TYPE http_request_duration_seconds histogram',
+            ]
+            for route, (buckets, total, count) in sorted(self.durations.items()):
+                for bound, bucket in zip(DURATION_BUCKETS, buckets):
+                    lines.append(f'http_request_duration_seconds_bucket{labels(route=route, le=bound)} {bucket}')
+                lines.append(f'http_request_duration_seconds_bucket{labels(route=route, le="+Inf")} {count}')
+                lines.append(f'http_request_duration_seconds_sum{labels(route=route)} {total}')
+                lines.append(f'http_request_duration_seconds_count{labels(route=route)} {count}')
+
+            lines += [
+                '# HELP db_queries_total Consultas SQL ejecutadas durante las peticiones.',
+                '# TYPE db_queries_total counter',
+            ]
+            for route, count in sorted(self.queries.items()):
+                lines.append(f'db_queries_total{labels(route=route)} {count}')
+            lines += [
+                '# HELP db_query_duration_seconds_total Tiempo en consultas SQL.',
+                '# TYPE db_query_duration_seconds_total counter',
+            ]
+            for route, total in sorted(self.db_time.items()):
+                lines.append(f'db_query_duration_seconds_total{labels(route=route)} {total}')
+
+            lines += [
+                '# HELP span_duration_seconds Tiempo de los tramos medidos con span().',
+                '# TYPE span_duration_seconds summary',
+            ]
+            for name, (total, count) in sorted(self.spans.items()):
+                lines.append(f'span_duration_seconds_sum{labels(span=name)} {total}')
+                lines.append(f'span_duration_seconds_count{labels(span=name)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+metrics = Metrics()
+
+
+def _metric_name(name):
+    # Server-Timing sólo admite tokens como nombre
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', name)
+
+
+def server_timing(timings, total):
+    entries = [
+        f'total;dur={total * 1000:.1f}',
+        f'db;dur={timings.db_time * 1000:.1f};desc="{timings.queries} consultas"',
+    ]
+    if timings.view_time is not None:
+        entries.append(f'view;dur={timings.view_time * 1000:.1f}')
+    for name, (elapsed, _) in timings.spans.items():
+        entries.append(f'{_metric_name(name)};dur={elapsed * 1000:.1f}')
+    return ', '.join(entries)
+
+
+def route_of(request):
+    # El nombre de la vista y no la ruta, para no crear una serie por id
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route
+
+
+class InstrumentationMiddleware:
+    """
+    Mide cada petición: consultas SQL (cantidad y tiempo, con un
+    execute_wrapper en cada conexión), tiempo de la vista y los tramos de
+    ``span()``. Agrega la cabecera Server-Timing, escribe una línea JSON en
+    el logger ``core.instrumentation`` y alimenta /metrics.
+
+    Con INSTRUMENTATION_ENABLED apagado Django la quita de la cadena
+    (MiddlewareNotUsed): no cuesta nada.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        connection_created.connect(install_query_wrapper, dispatch_uid='core.instrumentation')
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # Django pasaría un process_view síncrono por un hilo
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timings, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings)
+
+    def start(self, request):
+        timings = Timings()
+        request.timings = timings
+        token = _current.set(timings)
+        # Conexiones de este hilo abiertas antes de activar la instrumentación
+        for connection in connections.all(initialized_only=True):
+            install_query_wrapper(connection)
+        return timings, token
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.timings.view_start = time.perf_counter()
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        request.timings.view_start = time.perf_counter()
+
+    def finish(self, request, response, timings):
+        total = timings.elapsed()
+        if timings.view_start is not None:
+            timings.view_time = time.perf_counter() - timings.view_start
+        route = route_of(request)
+
+        response['Server-Timing'] = server_timing(timings, total)
+        metrics.observe(request.method, route, response.status_code, timings, total)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'route': route,
+            'status': response.status_code,
+            'duration_ms': round(total * 1000, 2),
+            'view_ms': round(timings.view_time * 1000, 2) if timings.view_time is not None else None,
+            'db_queries': timings.queries,
+            'db_ms': round(timings.db_time * 1000, 2),
+            'spans': {name: round(elapsed * 1000, 2) for name, (elapsed, _) in timings.spans.items()},
+        }, ensure_ascii=False))
+        return response
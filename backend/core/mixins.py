@@ -0,0 +1,143 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+def version_aggregates(fields, count=True):
+    """
+    Agregados que cambian con la colección: MAX de cada fecha, MAX(pk) y,
+    si ``count``, COUNT(*).
+    """
+    aggregates = {f'last_{name}': Max(name) for name in fields}
+    aggregates['last_pk'] = Max('pk')
+    if count:
+        aggregates['total'] = Count('pk')
+    return aggregates
+
+
+def summary_version(summary, fields):
+    return list(summary.values()), [summary[f'last_{name}'] for name in fields]
+
+
+def latest_queryset(queryset, ordering, fields, annotations=None):
+    """
+    pk y ``fields`` (más ``annotations``) de la fila más reciente según
+    ``ordering``; se lee con first() o afirst().
+    """
+    annotations = annotations or {}
+    return queryset.order_by(*ordering).annotate(**annotations).values_list('pk', *fields, *annotations)
+
+
+def latest_version(latest, fields):
+    latest = latest or (None,) * (len(fields) + 1)
+    return list(latest), list(latest[1:])
+
+
+def conditional_validators(parts, moments, full_path, renderer_format=''):
+    """
+    ETag (entre comillas) y timestamp de última modificación. La URL
+    completa y el formato entran en la ETag, así cada combinación de
+    filtros, página o ?fields= tiene la suya.
+    """
+    moments = [moment for moment in moments if moment is not None]
+    parts = [*parts, full_path, renderer_format]
+    etag = quote_etag(hashlib.sha256('|'.join(map(str, parts)).encode()).hexdigest()[:32])
+    last_modified = int(max(moments).timestamp()) if moments else None
+    return etag, last_modified
+
+
+def patch_conditional_headers(response, etag, last_modified):
+    if 200 <= response.status_code < 300 or response.status_code == 304:
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # El navegador guarda la respuesta pero la revalida en cada uso
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    GET condicional (ETag / Last-Modified) para list y retrieve de un ViewSet.
+
+    La versión de la colección se calcula con una sola consulta (agregados
+    MAX/COUNT, o la fila más reciente según ``conditional_latest``) más las
+    versiones de ``version_caches``, que las señales invalidan en cada alta,
+    cambio o baja. Esas versiones viven en la caché 'lookups': con la caché
+    local de cada proceso sólo sirven para datos que también salen de ella
+    (nombres de departamentos y técnicos); los cambios de la tabla tienen
+    que verse en la consulta. Si el cliente ya tiene esa versión se responde
+    304 Not Modified sin serializar nada.
+    """
+    # core.cache.VersionedCache invalidadas con cada cambio de los datos
+    # que aparecen en la respuesta
+    version_caches = ()
+    # Campos de fecha cuyo máximo es la última modificación
+    conditional_fields = ('created_at',)
+    # COUNT(*) detecta bajas hechas en otro proceso; en tablas grandes cuesta
+    # un recorrido completo y se puede desactivar
+    conditional_count = True
+    # En tablas grandes: orden con índice cuya primera fila es la más
+    # reciente. Reemplaza a los agregados (SQLite no usa índices para varios
+    # MAX en la misma consulta). Se busca en toda la tabla, sin los filtros:
+    # una fila que deja de cumplirlos (una solicitud que se cierra en
+    # ?status=open) no cambiaría la más reciente de la lista filtrada.
+    conditional_latest = None
+    # Fechas que se leen junto con la fila más reciente (subconsultas), por
+    # ejemplo la de la última baja, que esa fila no refleja
+    conditional_annotations = {}
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        if not self.conditional_latest:
+            queryset = self.filter_queryset(queryset)
+        parts, moments = self.collection_version(queryset)
+        etag, last_modified = self.conditional_headers(request, parts, moments)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return self.finalize_conditional(not_modified, etag, last_modified)
+        return self.finalize_conditional(super().list(request, *args, **kwargs), etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        moments = [getattr(instance, name) for name in self.conditional_fields]
+        etag, last_modified = self.conditional_headers(request, [instance.pk, *moments], moments)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return self.finalize_conditional(not_modified, etag, last_modified)
+        serializer = self.get_serializer(instance)
+        return self.finalize_conditional(Response(serializer.data), etag, last_modified)
+
+    def collection_version(self, queryset):
+        """
+        Valores que cambian cuando cambia la colección y fechas de última
+        modificación, en una sola consulta. Con ``conditional_latest``
+        ``queryset`` es la tabla entera.
+        """
+        if self.conditional_latest:
+            latest = latest_queryset(
+                queryset, self.conditional_latest, self.conditional_fields, self.conditional_annotations,
+            ).first()
+            return latest_version(latest, self.conditional_fields)
+
+        summary = queryset.order_by().aggregate(**version_aggregates(self.conditional_fields, self.conditional_count))
+        return summary_version(summary, self.conditional_fields)
+
+    def conditional_headers(self, request, parts, moments):
+        """
+        ETag y fecha de última modificación (timestamp) de la respuesta.
+        """
+        moments = list(moments)
+        for cache in self.version_caches:
+            version = cache.version()
+            parts = [version, *parts]
+            moments.append(cache.changed_at(version))
+        return conditional_validators(
+            parts, moments, request.get_full_path(), getattr(request.accepted_renderer, 'format', ''),
+        )
+
+    def finalize_conditional(self, response, etag, last_modified):
+        return patch_conditional_headers(response, etag, last_modified)
@@ -0,0 +1,99 @@
+import os
+import re
+
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def parse_range(header, size):
+    """
+    (inicio, fin) inclusivos de una cabecera Range de un solo rango
+    ("bytes=0-99", "bytes=100-", "bytes=-100"). None si la cabecera no se
+    entiende o pide varios rangos (se responde el archivo completo) y False
+    si el rango cae fuera del archivo (416).
+    """
+    match = _RANGE_RE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Sufijo: los últimos N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        return False
+    return start, min(end, size - 1)
+
+
+class RangeFile:
+    """
+    Archivo abierto en el inicio del rango que sólo deja leer ``length``
+    bytes. Conserva fileno(): con Content-Length fijado, gunicorn envía el
+    rango con sendfile desde la posición actual sin copiarlo a Python.
+    """
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def ranged_file_response(request, path, content_type, etag, filename=None, as_attachment=False):
+    """
+    FileResponse con ETag fuerte (If-None-Match) y peticiones Range de un
+    solo rango (206 / 416, con If-Range). El archivo no se lee en memoria:
+    bajo WSGI viaja con wsgi.file_wrapper.
+    """
+    etag = quote_etag(etag)
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    size = os.path.getsize(path)
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if request.headers.get('Range') and (if_range is None or if_range == etag):
+        byte_range = parse_range(request.headers['Range'], size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    file = open(path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type, as_attachment=as_attachment, filename=filename)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = FileResponse(
+            RangeFile(file, end - start + 1),
+            status=206, content_type=content_type, as_attachment=as_attachment, filename=filename,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = end - start + 1
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
@@ -0,0 +1,196 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, InterfaceError, OperationalError, connections
+
+logger = logging.getLogger(__name__)
+
+# Base de datos de las lecturas del contexto actual (None: la principal)
+_read_database = ContextVar('replica_read_database', default=None)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Cookie que deja a un cliente leyendo de la principal tras escribir. Los
+# clientes que no la reciben (el frontend, desde otro origen) envían la
+# cabecera en su lugar: las escrituras la devuelven con los segundos durante
+# los que hay que reenviarla.
+STICKY_COOKIE = 'read_primary'
+STICKY_HEADER = 'X-Read-Primary'
+
+
+class ReplicaPool:
+    """
+    Réplicas de REPLICA_DATABASES que se pueden usar. Una réplica que no
+    responde al conectar (o que falla en medio de una petición) se descarta
+    durante REPLICA_RETRY_SECONDS y las lecturas vuelven a la principal.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.unavailable = {}
+
+    def choose(self):
+        """
+        Alias de una réplica disponible con la conexión abierta, o None.
+        Dentro de una transacción de la principal no se usan (ReplicaRouter)
+        y no se llega a conectar.
+        """
+        if not settings.REPLICA_DATABASES or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            candidates = [
+                alias for alias in settings.REPLICA_DATABASES
+                if self.unavailable.get(alias, 0) <= now
+            ]
+        random.shuffle(candidates)
+        for alias in candidates:
+            try:
+                # No hace nada si la conexión de este hilo ya está abierta
+                connections[alias].ensure_connection()
+            except DatabaseError:
+                logger.warning('La réplica %s no responde; se lee de la principal', alias, exc_info=True)
+                self.mark_unavailable(alias)
+                continue
+            return alias
+        return None
+
+    def mark_unavailable(self, alias):
+        with self._lock:
+            self.unavailable[alias] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+        connections[alias].close()
+
+    def reset(self):
+        with self._lock:
+            self.unavailable.clear()
+
+
+replica_pool = ReplicaPool()
+
+
+@contextmanager
+def use_replica():
+    """
+    Lecturas del bloque en una réplica, si hay alguna disponible. Para
+    tareas fuera de las peticiones, como los informes del worker.
+    """
+    token = _read_database.set(replica_pool.choose())
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+@contextmanager
+def use_primary():
+    token = _read_database.set(None)
+    try:
+        yield
+    finally:
+        _read_database.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Envía las lecturas a la réplica elegida para el contexto actual
+    (ReplicaMiddleware o use_replica) y todas las escrituras a la principal.
+    Dentro de una transacción de la principal también se lee de ella: la
+    réplica no ve lo escrito en la transacción ni respeta sus bloqueos.
+    """
+    def db_for_read(self, model, **hints):
+        alias = _read_database.get()
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        # Explícito: sin router, un objeto leído de la réplica se guardaría en ella
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+class ReplicaMiddleware:
+    """
+    Las peticiones de lectura (GET, HEAD, OPTIONS) leen de una réplica; las
+    demás, de la principal. Tras una escritura el cliente recibe la cookie
+    STICKY_COOKIE y sigue leyendo de la principal durante
+    REPLICA_STICKY_SECONDS, para ver sus propios cambios aunque la réplica
+    vaya atrasada. La respuesta también lleva STICKY_HEADER (expuesta por
+    CORS) para los clientes de otro origen, que la reenvían ese tiempo.
+
+    Si la réplica falla en medio de una vista síncrona con un error de
+    conexión, se descarta y la vista se repite contra la principal.
+
+    Sin REPLICA_DATABASES Django la quita de la cadena (MiddlewareNotUsed).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = _read_database.set(self.read_database(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_database.reset(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        # Conecta con la réplica en el hilo en que corre el ORM async
+        token = _read_database.set(await sync_to_async(self.read_database)(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_database.reset(token)
+        return self.finish(request, response)
+
+    def read_database(self, request):
+        if request.method not in SAFE_METHODS:
+            return None
+        if STICKY_COOKIE in request.COOKIES or request.headers.get(STICKY_HEADER):
+            return None
+        return replica_pool.choose()
+
+    def finish(self, request, response):
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                STICKY_COOKIE, '1', max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite='Lax', secure=request.is_secure(),
+            )
+            response[STICKY_HEADER] = str(settings.REPLICA_STICKY_SECONDS)
+        return response
+
+    def process_exception(self, request, exception):
+        alias = _read_database.get()
+        match = request.resolver_match
+        if (
+            alias is None
+            or not isinstance(exception, (OperationalError, InterfaceError))
+            or match is None
+            or iscoroutinefunction(match.func)
+        ):
+            return None
+        logger.warning('Falló la lectura en la réplica %s; se repite en la principal', alias, exc_info=exception)
+        replica_pool.mark_unavailable(alias)
+        with use_primary():
+            return match.func(request, *match.args, **match.kwargs)
@@ -1,5 +1,6 @@
 from pathlib import Path
 import environ
+from corsheaders.defaults import default_headers
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -49,9 +50,13 @@ THIRD_PARTY_APPS = [
 INSTALLED_APPS = DJANGO_APPS + PROJECT_APPS + THIRD_PARTY_APPS
 
 MIDDLEWARE = [
+    # Primero, para medir también al resto de middlewares
+    'core.instrumentation.InstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.WhiteNoiseMiddleware',
+    # Antes de sesiones y autenticación, que también leen de la base de datos
+    'core.replicas.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -88,6 +93,38 @@ DATABASES = {
     'default': env.db('DATABASE_URL')
 }
 
+# Réplicas de sólo lectura (opcional, separadas por comas). Las peticiones
+# GET/HEAD y los informes del worker leen de ellas (core.replicas); las
+# escrituras van siempre a 'default'. Para probarlo en local basta una copia
+# de la base de datos: REPLICA_DATABASE_URL=sqlite:///replica.sqlite3. Con
+# PostgreSQL conviene limitar la espera al conectar: ?connect_timeout=2
+REPLICA_DATABASES = []
+for number, url in enumerate(env.list('REPLICA_DATABASE_URL', default=[]), start=1):
+    alias = f'replica_{number}'
+    DATABASES[alias] = env.db_url_config(url)
+    # En las pruebas la réplica es la misma base de datos de pruebas
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+
+# Segundos que un cliente sigue leyendo de la principal después de escribir
+# (debe superar el retraso habitual de la replicación).
+REPLICA_STICKY_SECONDS = env.int('REPLICA_STICKY_SECONDS', default=10)
+
+# Segundos sin usar una réplica que no respondió antes de volver a probarla.
+REPLICA_RETRY_SECONDS = env.int('REPLICA_RETRY_SECONDS', default=30)
+
+# 'lookups' guarda departamentos y técnicos (core.cache). Por defecto es
+# memoria local de cada proceso; con varios workers conviene un backend
+# compartido, por ejemplo LOOKUP_CACHE_URL=redis://localhost:6379/1
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+    'lookups': env.cache('LOOKUP_CACHE_URL', default='locmemcache://lookups'),
+}
+
+CACHES['lookups'].setdefault('TIMEOUT', env.int('LOOKUP_CACHE_TIMEOUT', default=300))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -131,6 +168,105 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Archivos generados (informes en cola)
+MEDIA_URL = 'media/'
+
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Carpeta de las plantillas .docx de los informes
+REPORT_TEMPLATES_DIR = env.str('REPORT_TEMPLATES_DIR', default=str(BASE_DIR / 'formato'))
+
+# Caché en disco de los informes .docx generados
+REPORT_CACHE_DIR = env.str('REPORT_CACHE_DIR', default=str(BASE_DIR / '.cache' / 'reports'))
+
+REPORT_CACHE_MAX_ENTRIES = env.int('REPORT_CACHE_MAX_ENTRIES', default=200)
+
+REPORT_CACHE_MAX_BYTES = env.int('REPORT_CACHE_MAX_BYTES', default=200 * 1024 * 1024)
+
+# Resolución del gráfico de los informes
+REPORT_CHART_DPI = env.int('REPORT_CHART_DPI', default=300)
+
+# Precarga matplotlib y las plantillas al iniciar la aplicación (útil con gunicorn --preload)
+REPORT_WARM_UP = env.bool('REPORT_WARM_UP', default=False)
+
+# Solicitudes de GET /api/requests/?paginate=false (lista sin paginar)
+REQUEST_LIST_UNPAGINATED_MAX = env.int('REQUEST_LIST_UNPAGINATED_MAX', default=5000)
+
+# Hilos con los que se generan los informes individuales por lote
+SINGLE_REPORT_WORKERS = env.int('SINGLE_REPORT_WORKERS', default=4)
+
+# Minutos que puede seguir un informe en proceso antes de darlo por perdido
+# (el worker que lo tomó se detuvo sin terminarlo)
+REPORT_JOB_TIMEOUT_MINUTES = env.int('REPORT_JOB_TIMEOUT_MINUTES', default=30)
+
+# Adjuntos de las solicitudes (request.attachments): contenido por hash
+# SHA-256, subidas por partes en curso y miniaturas
+ATTACHMENT_ROOT = env.str('ATTACHMENT_ROOT', default=str(MEDIA_ROOT / 'attachments'))
+
+ATTACHMENT_MAX_BYTES = env.int('ATTACHMENT_MAX_BYTES', default=50 * 1024 * 1024)
+
+# Tamaño máximo de cada parte de una subida
+ATTACHMENT_CHUNK_MAX_BYTES = env.int('ATTACHMENT_CHUNK_MAX_BYTES', default=8 * 1024 * 1024)
+
+# Horas sin actividad tras las que sweep_attachments descarta una subida
+ATTACHMENT_UPLOAD_TTL_HOURS = env.int('ATTACHMENT_UPLOAD_TTL_HOURS', default=24)
+
+# Lado mayor (px) de las miniaturas de imágenes
+ATTACHMENT_THUMBNAIL_SIZE = env.int('ATTACHMENT_THUMBNAIL_SIZE', default=320)
+
+# Hilos que generan miniaturas fuera de la petición. Con 0 sólo las genera
+# sweep_attachments
+ATTACHMENT_THUMBNAIL_WORKERS = env.int('ATTACHMENT_THUMBNAIL_WORKERS', default=1)
+
+# Asignación automática de técnicos (request.assignment): candidatos de
+# menor carga que se verifican en la base de datos antes de elegir
+ASSIGNMENT_CANDIDATES = env.int('ASSIGNMENT_CANDIDATES', default=3)
+
+# Afinidad por departamento: solicitudes abiertas de ventaja para un técnico
+# que ya atendió al departamento (0 la desactiva)
+ASSIGNMENT_AFFINITY_BONUS = env.int('ASSIGNMENT_AFFINITY_BONUS', default=0)
+
+# Caché de autenticación por token (user.authentication)
+TOKEN_CACHE_MAX_SIZE = env.int('TOKEN_CACHE_MAX_SIZE', default=10000)
+
+TOKEN_CACHE_TTL = env.int('TOKEN_CACHE_TTL', default=60)
+
+# Eventos de solicitudes (server-sent events en core/asgi.py). En producción
+# con varios workers: request.events.PostgresBackend (LISTEN/NOTIFY)
+REQUEST_EVENTS_BACKEND = env.str('REQUEST_EVENTS_BACKEND', default='request.events.InMemoryBackend')
+
+# Eventos pendientes por cliente antes de descartarlos y enviar "reset"
+REQUEST_EVENTS_QUEUE_SIZE = env.int('REQUEST_EVENTS_QUEUE_SIZE', default=100)
+
+# Segundos entre comentarios de keep-alive
+REQUEST_EVENTS_HEARTBEAT = env.int('REQUEST_EVENTS_HEARTBEAT', default=15)
+
+# Instrumentación por petición (core.instrumentation): consultas SQL,
+# tiempos, cabecera Server-Timing y una línea JSON por petición
+INSTRUMENTATION_ENABLED = env.bool('INSTRUMENTATION_ENABLED', default=False)
+
+# Expone /metrics en formato Prometheus (requiere INSTRUMENTATION_ENABLED).
+# Con token, el scraper debe enviar "Authorization: Bearer <token>".
+INSTRUMENTATION_METRICS = env.bool('INSTRUMENTATION_METRICS', default=False)
+
+INSTRUMENTATION_METRICS_TOKEN = env.str('INSTRUMENTATION_METRICS_TOKEN', default='')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {},
+}
+
+# Una línea JSON por petición en la consola, sólo con la instrumentación
+# activa; si no, el logger sólo deja pasar avisos y errores como el resto
+if INSTRUMENTATION_ENABLED:
+    LOGGING['loggers']['core.instrumentation'] = {'handlers': ['console'], 'level': 'INFO', 'propagate': False}
+else:
+    LOGGING['loggers']['core.instrumentation'] = {'level': 'WARNING'}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -138,6 +274,12 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CORS_ALLOWED_ORIGINS = env.list('CORS_ALLOWED_ORIGINS')
 
+# El frontend está en otro origen y no recibe la cookie read_primary
+# (SameSite=Lax): tras escribir lee la cabecera X-Read-Primary de la
+# respuesta y la reenvía para seguir leyendo de la principal (core.replicas)
+CORS_ALLOW_HEADERS = (*default_headers, 'x-read-primary')
+CORS_EXPOSE_HEADERS = ['X-Read-Primary']
+
 CSRF_TRUSTED_ORIGINS = env.list('CSRF_TRUSTED_ORIGINS')
 
 REST_FRAMEWORK = {
@@ -145,7 +287,7 @@ REST_FRAMEWORK = {
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'user.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -0,0 +1,223 @@
+import json
+import shutil
+import tempfile
+
+from asgiref.sync import async_to_sync
+from environ import Env
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from department.lookups import adepartment_names, department_names
+from department.models import Department
+from request.models import Request
+from .cache import clear_lookup_caches
+from .instrumentation import install_query_wrapper, metrics, span
+from .replicas import STICKY_COOKIE, STICKY_HEADER, replica_pool, use_replica
+
+REPLICA = 'replica_test'
+UNREACHABLE = 'replica_unreachable'
+
+
+def server_timing(response):
+    entries = {}
+    for entry in response['Server-Timing'].split(', '):
+        name, *params = entry.split(';')
+        entries[name] = dict(param.split('=', 1) for param in params)
+    return entries
+
+
+@override_settings(INSTRUMENTATION_ENABLED=True)
+class InstrumentationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name='Sistemas', director='Ana Pérez')
+        technician = User.objects.create_user(username='tecnico', first_name='José', last_name='Rodríguez')
+        Request.objects.create(
+            subject='Impresora', description='Sin papel', note='Urgente',
+            department=department, technician=technician,
+        )
+
+    def setUp(self):
+        clear_lookup_caches()
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_records_queries_view_time_and_logs(self):
+        with self.assertLogs('core.instrumentation', 'INFO') as logs, CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('request-list'))
+        timing = server_timing(response)
+        self.assertEqual(timing['db']['desc'], f'"{len(queries.captured_queries)} consultas"')
+        self.assertLessEqual(float(timing['view']['dur']), float(timing['total']['dur']))
+
+        line = json.loads(logs.records[0].getMessage())
+        self.assertEqual((line['route'], line['status']), ('request-list', 200))
+        self.assertEqual(line['db_queries'], len(queries.captured_queries))
+
+    def test_report_spans(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        today = timezone.localdate().isoformat()
+        with override_settings(REPORT_CACHE_DIR=cache_dir):
+            response = self.client.get(
+                reverse('request-generate-report'), {'start_date': today, 'end_date': today},
+            )
+        self.assertEqual(response.status_code, 200)
+        # "query" sólo aparece si la plantilla recorre las solicitudes
+        self.assertLessEqual({'aggregate', 'chart', 'render', 'save'}, set(server_timing(response)))
+
+    def test_async_views_are_instrumented(self):
+        # Bajo ASGI las consultas usan conexiones de otros hilos, que reciben
+        # el contador al conectarse; en las pruebas corren en el hilo
+        # principal, cuya conexión ya estaba abierta
+        install_query_wrapper(connection)
+        get = async_to_sync(self.async_client.get)
+        for name in ('department-list', 'async-department-list'):
+            timing = server_timing(get(reverse(name)))
+            self.assertIn('view', timing)
+            self.assertNotEqual(timing['db']['desc'], '"0 consultas"')
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('department-list'))
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+        with override_settings(INSTRUMENTATION_METRICS=True, INSTRUMENTATION_METRICS_TOKEN='secreto'):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 401)
+            response = self.client.get(reverse('metrics'), headers={'authorization': 'Bearer secreto'})
+        body = response.content.decode()
+        self.assertIn('http_requests_total{method="GET",route="department-list",status="200"} 1', body)
+        self.assertIn('http_request_duration_seconds_count{route="department-list"} 1', body)
+
+
+class InstrumentationDisabledTests(TestCase):
+    def test_no_headers_and_spans_are_noops(self):
+        response = self.client.get(reverse('department-list'))
+        self.assertNotIn('Server-Timing', response)
+        with span('chart') as current:
+            pass
+        self.assertFalse(hasattr(current, 'timings'))
+
+
+@override_settings(REPLICA_DATABASES=[REPLICA])
+class ReplicaTests(TransactionTestCase):
+    """
+    La réplica es un segundo archivo SQLite con su propia copia de la tabla
+    de departamentos, así se distingue de qué base de datos sale cada
+    lectura. TransactionTestCase: dentro de las transacciones de TestCase
+    el router siempre lee de la principal.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+        databases = connections.configure_settings({
+            'default': connections.settings['default'],
+            REPLICA: Env.db_url_config(f'sqlite:///{cls.directory}/replica.sqlite3'),
+            UNREACHABLE: Env.db_url_config(f'sqlite:///{cls.directory}/no-existe/replica.sqlite3'),
+        })
+        for alias in (REPLICA, UNREACHABLE):
+            connections.settings[alias] = databases[alias]
+
+    @classmethod
+    def tearDownClass(cls):
+        for alias in (REPLICA, UNREACHABLE):
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+        shutil.rmtree(cls.directory, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        clear_lookup_caches()
+        replica_pool.reset()
+        self.addCleanup(replica_pool.reset)
+        with connections[REPLICA].schema_editor() as editor:
+            if Department._meta.db_table in connections[REPLICA].introspection.table_names():
+                editor.delete_model(Department)
+            editor.create_model(Department)
+        Department.objects.create(pk=1, name='Principal', director='Ana Pérez')
+        Department.objects.using(REPLICA).create(pk=1, name='Réplica', director='Ana Pérez')
+
+    def department_name(self, **kwargs):
+        return self.client.get(reverse('department-detail', args=[1]), **kwargs).json()['name']
+
+    def test_reads_go_to_replica_and_writes_to_primary(self):
+        self.assertEqual(self.department_name(), 'Réplica')
+        response = self.client.post(reverse('department-list'), {'name': 'Compras', 'director': 'Luis Gil'})
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Department.objects.using('default').filter(name='Compras').exists())
+        self.assertFalse(Department.objects.using(REPLICA).filter(name='Compras').exists())
+
+    def test_client_reads_primary_after_writing(self):
+        self.client.post(reverse('department-list'), {'name': 'Compras', 'director': 'Luis Gil'})
+        self.assertIn(STICKY_COOKIE, self.client.cookies)
+        self.assertEqual(self.department_name(), 'Principal')
+
+        self.client.cookies.clear()
+        self.assertEqual(self.department_name(), 'Réplica')
+        self.assertEqual(self.department_name(headers={STICKY_HEADER: '1'}), 'Principal')
+
+    def test_cross_origin_client_can_send_the_sticky_header(self):
+        origin = 'http://frontend.example'
+        with override_settings(CORS_ALLOWED_ORIGINS=[origin]):
+            preflight = self.client.options(reverse('department-list'), headers={
+                'origin': origin,
+                'access-control-request-method': 'GET',
+                'access-control-request-headers': 'authorization, x-read-primary',
+            })
+            self.assertEqual(preflight.status_code, 200)
+            self.assertIn('x-read-primary', preflight['Access-Control-Allow-Headers'])
+
+            response = self.client.post(
+                reverse('department-list'), {'name': 'Compras', 'director': 'Luis Gil'}, headers={'origin': origin},
+            )
+            self.assertEqual(response[STICKY_HEADER], str(settings.REPLICA_STICKY_SECONDS))
+            self.assertIn(STICKY_HEADER, response['Access-Control-Expose-Headers'])
+
+    def test_token_is_read_from_primary(self):
+        user = User.objects.create_user(username='tecnico', is_staff=True)
+        token = Token.objects.create(user=user)
+        # La réplica no tiene el token (ni sus tablas): no hace falta repetir en la principal
+        with self.assertNoLogs('core.replicas', 'WARNING'):
+            name = self.department_name(headers={'authorization': f'Token {token.key}'})
+        self.assertEqual(name, 'Réplica')
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        with override_settings(REPLICA_DATABASES=[UNREACHABLE]), self.assertLogs('core.replicas', 'WARNING'):
+            self.assertEqual(self.department_name(), 'Principal')
+        self.assertIn(UNREACHABLE, replica_pool.unavailable)
+
+    def test_failed_replica_read_is_retried_on_primary(self):
+        with connections[REPLICA].schema_editor() as editor:
+            editor.delete_model(Department)
+        with self.assertLogs('core.replicas', 'WARNING'):
+            self.assertEqual(self.department_name(), 'Principal')
+        self.assertIn(REPLICA, replica_pool.unavailable)
+
+    def test_lookup_caches_load_from_primary(self):
+        # Sin la cookie el detalle se lee de la réplica, pero lo que queda
+        # en la caché de consultas sale de la principal
+        self.assertEqual(self.department_name(), 'Réplica')
+        response = self.client.get(reverse('department-list'))
+        self.assertEqual([department['name'] for department in response.json()], ['Principal'])
+        with use_replica():
+            self.assertEqual(department_names(require=2), {1: 'Principal'})
+            clear_lookup_caches()
+            self.assertEqual(async_to_sync(adepartment_names)(require=2), {1: 'Principal'})
+
+    def test_transactions_and_use_replica(self):
+        with use_replica():
+            self.assertEqual(Department.objects.get(pk=1).name, 'Réplica')
+            with transaction.atomic():
+                self.assertEqual(Department.objects.get(pk=1).name, 'Principal')
+            # Lo leído de la réplica se guarda en la principal
+            department = Department.objects.get(pk=1)
+            department.director = 'Luis Gil'
+            department.save()
+        self.assertEqual(Department.objects.get(pk=1).director, 'Luis Gil')
+        self.assertEqual(Department.objects.using(REPLICA).get(pk=1).director, 'Ana Pérez')
@@ -4,15 +4,28 @@ from rest_framework.routers import DefaultRouter
 from user.views import UserViewSet, CustomAuthToken
 from department.views import DepartmentViewSet
 from request.views import RequestViewSet
+from request.attachment_views import AttachmentUploadViewSet, RequestAttachmentViewSet
+from core.views import lookup_cache_stats, prometheus_metrics
+from department import async_views as department_async
+from request import async_views as request_async
 
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
 router.register(r'departments', DepartmentViewSet, basename='department')
 router.register(r'requests', RequestViewSet, basename='request')
+router.register(r'attachments', RequestAttachmentViewSet, basename='attachment')
+router.register(r'attachment-uploads', AttachmentUploadViewSet, basename='attachment-upload')
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
     path('api/login/', CustomAuthToken.as_view(), name='api_token_auth'),
+    path('api/cache/stats/', lookup_cache_stats, name='cache-stats'),
+    path('metrics', prometheus_metrics, name='metrics'),
+    # Lecturas frecuentes como vistas async (ORM async, sin hilos por petición bajo ASGI)
+    path('api/async/requests/', request_async.request_list, name='async-request-list'),
+    path('api/async/requests/stats/', request_async.request_stats, name='async-request-stats'),
+    path('api/async/requests/<int:pk>/', request_async.request_detail, name='async-request-detail'),
+    path('api/async/departments/', department_async.department_list, name='async-department-list'),
 ]
\ No newline at end of file
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .cache import cache_stats
+from .instrumentation import metrics
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def lookup_cache_stats(request):
+    """
+    Aciertos y fallos de las cachés de consulta del proceso que responde.
+    """
+    return Response(cache_stats())
+
+
+def prometheus_metrics(request):
+    """
+    Métricas del proceso en formato de texto de Prometheus. No existe si la
+    instrumentación o INSTRUMENTATION_METRICS están apagados.
+    """
+    if not (settings.INSTRUMENTATION_ENABLED and settings.INSTRUMENTATION_METRICS):
+        raise Http404
+    token = settings.INSTRUMENTATION_METRICS_TOKEN
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
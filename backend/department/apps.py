@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DepartmentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'department'
+
+    def ready(self):
+        from . import signals  # noqa: F401
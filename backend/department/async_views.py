@@ -0,0 +1,39 @@
+from core.async_views import conditional, datetime_representation, json_response, method_not_allowed
+from core.mixins import summary_version, version_aggregates
+from .lookups import adepartment_list
+from .views import DepartmentViewSet
+
+
+async def serialize_departments(queryset):
+    # Mismos datos que DepartmentSerializer: comparten la entrada de caché
+    return [
+        {
+            'id': department.id,
+            'name': department.name,
+            'director': department.director,
+            'created_at': datetime_representation(department.created_at),
+        }
+        async for department in queryset
+    ]
+
+
+async def department_list(request):
+    """
+    GET /api/async/departments/: mismo listado y ETag que
+    GET /api/departments/, servido desde la caché de consultas.
+    """
+    not_allowed = method_not_allowed(request)
+    if not_allowed:
+        return not_allowed
+
+    fields = DepartmentViewSet.conditional_fields
+    summary = await (
+        DepartmentViewSet.queryset.order_by()
+        .aaggregate(**version_aggregates(fields, DepartmentViewSet.conditional_count))
+    )
+
+    async def respond():
+        return json_response(await adepartment_list(serialize_departments))
+
+    parts, moments = summary_version(summary, fields)
+    return await conditional(request, parts, moments, DepartmentViewSet.version_caches, respond)
@@ -0,0 +1,57 @@
+from core.cache import VersionedCache
+
+from .models import Department
+
+departments_cache = VersionedCache('departments')
+
+
+def department_list(serialize):
+    """
+    Listado completo de departamentos ya serializado. ``serialize`` recibe
+    el queryset y devuelve los datos; sólo se llama si no están en caché.
+    """
+    return departments_cache.get_or_set(
+        'list',
+        lambda: list(serialize(Department.objects.all().order_by('name'))),
+    )
+
+
+async def adepartment_list(aserialize):
+    """
+    Versión async de department_list: ``aserialize`` es una corrutina que
+    debe producir los mismos datos que DepartmentSerializer (comparten la
+    entrada de caché).
+    """
+    return await departments_cache.aget_or_set(
+        'list',
+        lambda: aserialize(Department.objects.all().order_by('name')),
+    )
+
+
+def _load_names():
+    return dict(Department.objects.values_list('id', 'name'))
+
+
+def department_names(require=None):
+    """
+    Diccionario {id: nombre}. Si ``require`` no está (por ejemplo un
+    departamento creado en otro proceso) se recarga una vez.
+    """
+    names = departments_cache.get_or_set('names', _load_names)
+    if require is not None and require not in names:
+        names = departments_cache.refresh('names', _load_names)
+    return names
+
+
+async def _aload_names():
+    return {pk: name async for pk, name in Department.objects.values_list('id', 'name')}
+
+
+async def adepartment_names(require=None):
+    """
+    Versión async de department_names para las vistas ASGI.
+    """
+    names = await departments_cache.aget_or_set('names', _aload_names)
+    if require is not None and require not in names:
+        names = await departments_cache.arefresh('names', _aload_names)
+    return names
@@ -0,0 +1,10 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .lookups import departments_cache
+from .models import Department
+
+
+@receiver([post_save, post_delete], sender=Department)
+def invalidate_departments_cache(sender, instance, **kwargs):
+    departments_cache.invalidate()
@@ -1,3 +1,61 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from core.cache import cache_stats, clear_lookup_caches
+from .models import Department
+
+
+class DepartmentListCacheTests(TestCase):
+    url = reverse('department-list')
+
+    def setUp(self):
+        clear_lookup_caches()
+        self.addCleanup(clear_lookup_caches)
+        Department.objects.create(name='Sistemas', director='Ana Pérez')
+
+    def test_list_is_served_from_cache_until_a_change(self):
+        first = self.client.get(self.url).json()
+        # Sólo la consulta de versión para la ETag
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url).json(), first)
+
+        self.client.post(self.url, {'name': 'Compras', 'director': 'Luis Gómez'})
+        names = [item['name'] for item in self.client.get(self.url).json()]
+        self.assertEqual(names, ['Compras', 'Sistemas'])
+
+        Department.objects.get(name='Compras').delete()
+        self.assertEqual(len(self.client.get(self.url).json()), 1)
+
+    def test_stats_endpoint_reports_hits_and_misses(self):
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.assertEqual(self.client.get(reverse('cache-stats')).status_code, 401)
+        self.client.force_login(User.objects.create_user(username='usuario'))
+        self.assertEqual(self.client.get(reverse('cache-stats')).status_code, 403)
+        self.client.force_login(User.objects.create_user(username='admin', is_staff=True))
+        stats = self.client.get(reverse('cache-stats')).json()['departments']
+        self.assertGreaterEqual(stats['hits'], 1)
+        self.assertGreaterEqual(stats['misses'], 1)
+        self.assertEqual(stats, cache_stats()['departments'])
+
+
+class DepartmentAsyncListTests(TestCase):
+    def setUp(self):
+        clear_lookup_caches()
+        self.addCleanup(clear_lookup_caches)
+        Department.objects.create(name='Sistemas', director='Ana Pérez')
+        Department.objects.create(name='Compras', director='Luis Gómez')
+
+    async def test_matches_the_sync_view_and_shares_its_cache(self):
+        url = reverse('async-department-list')
+        before = cache_stats()['departments']
+        response = await self.async_client.get(url)
+        sync = await sync_to_async(self.client.get)(reverse('department-list'))
+        self.assertEqual(response.content, sync.content)
+        after = cache_stats()['departments']
+        self.assertEqual((after['misses'] - before['misses'], after['hits'] - before['hits']), (1, 1))
+
+        response = await self.async_client.get(url, headers={'if-none-match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
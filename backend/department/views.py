@@ -1,8 +1,19 @@
 from rest_framework import viewsets, permissions
+from rest_framework.response import Response
+from core.mixins import ConditionalGetMixin
+from .lookups import department_list, departments_cache
 from .models import Department
 from .serializers import DepartmentSerializer
 
-class DepartmentViewSet(viewsets.ModelViewSet):
+class DepartmentListCacheMixin:
+    def list(self, request, *args, **kwargs):
+        # Los departamentos casi no cambian: el listado sale de la caché y se
+        # invalida con cada alta, cambio o baja (department.signals)
+        return Response(department_list(lambda queryset: self.get_serializer(queryset, many=True).data))
+
+
+class DepartmentViewSet(ConditionalGetMixin, DepartmentListCacheMixin, viewsets.ModelViewSet):
     queryset = Department.objects.all().order_by('name')
     permission_classes = [permissions.AllowAny]
-    serializer_class = DepartmentSerializer
\ No newline at end of file
+    serializer_class = DepartmentSerializer
+    version_caches = (departments_cache,)
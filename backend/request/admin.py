@@ -1,4 +1,9 @@
 from django.contrib import admin
-from .models import Request
+from .models import AttachmentBlob, Request, ReportJob, RequestAttachment, RequestComment, RequestDailyStat
 
-admin.site.register(Request)
\ No newline at end of file
+admin.site.register(Request)
+admin.site.register(ReportJob)
+admin.site.register(RequestDailyStat)
+admin.site.register(RequestComment)
+admin.site.register(RequestAttachment)
+admin.site.register(AttachmentBlob)
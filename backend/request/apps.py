@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class RequestConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'request'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        from django.conf import settings
+        if settings.REPORT_WARM_UP:
+            from . import charts, docx_templates
+            charts.warm_up()
+            docx_templates.warm_up()
@@ -0,0 +1,193 @@
+import heapq
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Count, FilteredRelation, Q
+
+from user.lookups import technicians_cache
+from .models import OPEN_STATUSES, Request, RequestDailyStat
+
+# Clave del advisory lock de PostgreSQL que serializa las asignaciones
+ADVISORY_LOCK_KEY = 7_301_024
+
+# Serializa las asignaciones de los hilos de este proceso
+_process_lock = threading.Lock()
+
+
+class NoTechnicianAvailable(Exception):
+    pass
+
+
+class WorkloadIndex:
+    """
+    Carga de trabajo (solicitudes abiertas) de cada técnico activo
+    (is_staff, is_active) en un montículo mínimo. Se arma con una sola
+    consulta agregada la primera vez que se usa (o cuando cambia la versión
+    de technicians_cache: altas, bajas o cambios de técnicos) y las señales
+    de solicitudes lo mantienen con incrementos.
+
+    Las entradas del montículo no se corrigen en su lugar: cada cambio
+    agrega una entrada nueva y las que ya no coinciden con ``loads`` se
+    descartan al leer (invalidación perezosa).
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.loads = None
+        self.heap = []
+        # {departamento: técnicos que ya atendieron solicitudes suyas}
+        self.affinity = {}
+        self.version = None
+
+    def ensure(self):
+        version = technicians_cache.version()
+        with self._lock:
+            if self.loads is None or version != self.version:
+                self.rebuild(version)
+
+    def rebuild(self, version=None):
+        # Solicitudes abiertas en el JOIN (no en un FILTER del COUNT): sólo
+        # recorre el índice parcial de la cola, no el historial
+        rows = (
+            User.objects.filter(is_staff=True, is_active=True)
+            .annotate(open_requests=FilteredRelation(
+                'assigned_requests', condition=Q(assigned_requests__status__in=OPEN_STATUSES),
+            ))
+            .annotate(load=Count('open_requests'))
+            .values_list('pk', 'load')
+        )
+        affinity = {}
+        if settings.ASSIGNMENT_AFFINITY_BONUS:
+            pairs = RequestDailyStat.objects.values_list('department_id', 'technician_id').distinct()
+            for department_id, technician_id in pairs:
+                affinity.setdefault(department_id, set()).add(technician_id)
+        with self._lock:
+            self.loads = dict(rows)
+            self.heap = [(load, pk) for pk, load in self.loads.items()]
+            heapq.heapify(self.heap)
+            self.affinity = affinity
+            self.version = version
+
+    def invalidate(self):
+        with self._lock:
+            self.loads = None
+
+    def _push(self, technician_id):
+        heapq.heappush(self.heap, (self.loads[technician_id], technician_id))
+        # Compacta si las entradas obsoletas superan a las válidas
+        if len(self.heap) > 4 * len(self.loads) + 64:
+            self.heap = [(load, pk) for pk, load in self.loads.items()]
+            heapq.heapify(self.heap)
+
+    def add(self, technician_id, delta, department_id=None):
+        with self._lock:
+            if self.loads is None:
+                return
+            if department_id is not None and delta > 0:
+                self.affinity.setdefault(department_id, set()).add(technician_id)
+            if technician_id in self.loads:
+                self.loads[technician_id] = max(self.loads[technician_id] + delta, 0)
+                self._push(technician_id)
+
+    def set_loads(self, loads):
+        with self._lock:
+            if self.loads is None:
+                return
+            for technician_id, load in loads.items():
+                if technician_id in self.loads and self.loads[technician_id] != load:
+                    self.loads[technician_id] = load
+                    self._push(technician_id)
+
+    def smallest(self, count):
+        """
+        Los ``count`` técnicos con menos carga, en O(count · log n).
+        """
+        with self._lock:
+            found = []
+            while self.heap and len(found) < count:
+                load, technician_id = heapq.heappop(self.heap)
+                if self.loads.get(technician_id) == load and technician_id not in found:
+                    found.append(technician_id)
+            for technician_id in found:
+                heapq.heappush(self.heap, (self.loads[technician_id], technician_id))
+            return found
+
+    def department_candidates(self, department_id, count):
+        with self._lock:
+            technicians = [pk for pk in self.affinity.get(department_id, ()) if pk in self.loads]
+            return sorted(technicians, key=lambda pk: (self.loads[pk], pk))[:count]
+
+    def has_affinity(self, department_id, technician_id):
+        return technician_id in self.affinity.get(department_id, ())
+
+
+workload = WorkloadIndex()
+
+
+@contextmanager
+def assignment_lock():
+    """
+    Transacción en la que elegir técnicos y crear las solicitudes. El
+    bloqueo dura hasta el COMMIT, así la siguiente asignación ya cuenta las
+    solicitudes creadas: en PostgreSQL con pg_advisory_xact_lock (entre
+    procesos); en el resto, además del bloqueo del proceso,
+    choose_technicians bloquea las filas de los candidatos con
+    select_for_update si la base de datos lo soporta.
+    """
+    with _process_lock, transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [ADVISORY_LOCK_KEY])
+        yield
+
+
+def choose_technicians(department_ids):
+    """
+    Técnico para cada departamento de ``department_ids``, en orden. Se usa
+    dentro de assignment_lock().
+
+    Los candidatos salen del montículo (los de menor carga) y de los que ya
+    atendieron al departamento. Su carga se verifica con una consulta sobre
+    el índice parcial de la cola: el índice en memoria es una pista que
+    otros procesos pueden haber dejado atrás, y se corrige con lo leído.
+    Con afinidad, un técnico del departamento gana aunque tenga hasta
+    ASSIGNMENT_AFFINITY_BONUS solicitudes más que el de menor carga.
+    """
+    workload.ensure()
+    size = settings.ASSIGNMENT_CANDIDATES + len(department_ids) - 1
+    candidates = set(workload.smallest(size))
+    bonus = settings.ASSIGNMENT_AFFINITY_BONUS
+    if bonus:
+        for department_id in set(department_ids):
+            candidates.update(workload.department_candidates(department_id, settings.ASSIGNMENT_CANDIDATES))
+    if not candidates:
+        raise NoTechnicianAvailable("No hay técnicos activos para asignar la solicitud.")
+
+    if connection.vendor != 'postgresql' and connection.features.has_select_for_update:
+        list(User.objects.select_for_update().filter(pk__in=candidates).values_list('pk', flat=True))
+    counts = dict(
+        Request.objects.filter(technician_id__in=candidates, status__in=OPEN_STATUSES)
+        .values_list('technician_id')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    loads = {pk: counts.get(pk, 0) for pk in candidates}
+    workload.set_loads(loads)
+
+    chosen = []
+    for department_id in department_ids:
+        def score(pk):
+            affine = bonus and workload.has_affinity(department_id, pk)
+            return (loads[pk] - (bonus if affine else 0), not affine, loads[pk], pk)
+
+        technician_id = min(candidates, key=score)
+        # Las siguientes del mismo lote ya ven esta asignación
+        loads[technician_id] += 1
+        chosen.append(technician_id)
+    return chosen
+
+
+def assign_technician(department_id):
+    return choose_technicians([department_id])[0]
@@ -0,0 +1,58 @@
+from core.async_views import datetime_representation
+from department.lookups import adepartment_names
+from user.lookups import atechnician_names
+from .serializers import RequestSerializer
+
+
+class AsyncRequestSerializer:
+    """
+    Serializador de sólo lectura para las vistas async. Produce los mismos
+    datos que RequestSerializer (mismos campos, orden y formatos) sin pasar
+    por los campos de DRF, que son síncronos. Los nombres salen de la caché
+    de consultas, leída una vez por respuesta.
+    """
+    fields = RequestSerializer.Meta.fields
+    datetime_fields = ('created_at', 'updated_at', 'resolved_at', 'last_activity_at')
+
+    def __init__(self, fields=None):
+        if fields:
+            self.fields = [name for name in self.fields if name in fields]
+        self._department_names = None
+        self._technician_names = None
+
+    async def department_name(self, department_id):
+        if self._department_names is None or department_id not in self._department_names:
+            self._department_names = await adepartment_names(require=department_id)
+        return self._department_names.get(department_id)
+
+    async def technician_full_name(self, technician_id):
+        if technician_id is None:
+            return None
+        if self._technician_names is None or technician_id not in self._technician_names:
+            self._technician_names = await atechnician_names(require=technician_id)
+        return self._technician_names.get(technician_id)
+
+    async def to_representation(self, request):
+        data = {}
+        for name in self.fields:
+            if name == 'department':
+                data[name] = request.department_id
+            elif name == 'technician':
+                data[name] = request.technician_id
+            elif name == 'department_name':
+                data[name] = await self.department_name(request.department_id)
+            elif name == 'technician_full_name':
+                data[name] = await self.technician_full_name(request.technician_id)
+            elif name in self.datetime_fields:
+                data[name] = datetime_representation(getattr(request, name))
+            else:
+                data[name] = getattr(request, name)
+        return data
+
+    async def serialize(self, requests):
+        """
+        Lista de datos de un iterable (o iterable async, p. ej. aiterator).
+        """
+        if hasattr(requests, '__aiter__'):
+            return [await self.to_representation(request) async for request in requests]
+        return [await self.to_representation(request) for request in requests]
@@ -0,0 +1,104 @@
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django_filters.utils import translate_validation
+from rest_framework import exceptions
+from rest_framework.request import Request as DRFRequest
+
+from core.async_views import conditional, error_response, json_response, method_not_allowed
+from core.mixins import latest_queryset, latest_version
+from .async_serializers import AsyncRequestSerializer
+from .filters import RequestFilter
+from .models import Request
+from .pagination import RequestCursorPagination, unpaginated
+from .serializers import requested_fields
+from .stats import asummary
+from .views import RequestViewSet
+
+# Vistas de lectura para ASGI: consultas con el ORM async y serialización
+# sin pasar por DRF. Las respuestas son las mismas que las de RequestViewSet.
+
+
+def request_queryset(fields=None):
+    queryset = RequestViewSet.queryset.all()
+    if fields:
+        skipped = [name for name in RequestViewSet.deferrable_fields if name not in fields]
+        if skipped:
+            queryset = queryset.defer(*skipped)
+    return queryset
+
+
+async def request_list(request):
+    """
+    GET /api/async/requests/: mismos filtros, ?fields=, paginación
+    y ETag que GET /api/requests/.
+    """
+    not_allowed = method_not_allowed(request)
+    if not_allowed:
+        return not_allowed
+
+    fields = requested_fields(request)
+    filterset = RequestFilter(request.GET, queryset=request_queryset(fields), request=request)
+    if not filterset.is_valid():
+        return json_response(translate_validation(filterset.errors).detail, status=400)
+    queryset = filterset.qs
+
+    # Versión de toda la tabla, como ConditionalGetMixin con conditional_latest
+    conditional_fields = RequestViewSet.conditional_fields
+    latest = await latest_queryset(
+        Request.objects.all(), RequestViewSet.conditional_latest, conditional_fields, RequestViewSet.conditional_annotations,
+    ).afirst()
+
+    async def respond():
+        serializer = AsyncRequestSerializer(fields)
+        if unpaginated(request.GET):
+            rows = queryset[:settings.REQUEST_LIST_UNPAGINATED_MAX]
+            return json_response(await serializer.serialize(rows.aiterator()))
+        # La paginación por cursor de DRF es síncrona: sólo esta rama pasa
+        # por el pool de hilos
+        paginator = RequestCursorPagination()
+        page = await sync_to_async(paginator.paginate_queryset)(queryset, DRFRequest(request))
+        return json_response(paginator.get_paginated_response(await serializer.serialize(page)).data)
+
+    parts, moments = latest_version(latest, conditional_fields)
+    return await conditional(request, parts, moments, RequestViewSet.version_caches, respond)
+
+
+async def request_detail(request, pk):
+    not_allowed = method_not_allowed(request)
+    if not_allowed:
+        return not_allowed
+
+    fields = requested_fields(request)
+    try:
+        instance = await request_queryset(fields).aget(pk=pk)
+    except Request.DoesNotExist:
+        # Mismo mensaje que get_object_or_404 en la vista síncrona
+        return error_response(exceptions.NotFound(f'No {Request._meta.object_name} matches the given query.'))
+
+    async def respond():
+        return json_response(await AsyncRequestSerializer(fields).to_representation(instance))
+
+    moments = [getattr(instance, name) for name in RequestViewSet.conditional_fields]
+    return await conditional(request, [instance.pk, *moments], moments, RequestViewSet.version_caches, respond)
+
+
+async def request_stats(request):
+    not_allowed = method_not_allowed(request)
+    if not_allowed:
+        return not_allowed
+
+    start_date = request.GET.get('start_date')
+    end_date = request.GET.get('end_date')
+
+    if not start_date or not end_date:
+        return json_response({"error": "Parámetros start_date y end_date requeridos."}, status=400)
+
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except ValueError:
+        return json_response({"error": "Formato de fecha inválido. Usa YYYY-MM-DD."}, status=400)
+
+    return json_response(await asummary(start, end))
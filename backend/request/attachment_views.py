@@ -0,0 +1,129 @@
+import re
+
+from django.conf import settings
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from core.ranges import ranged_file_response
+from . import attachments
+from .models import AttachmentBlob, AttachmentUpload, RequestAttachment
+from .serializers import AttachmentUploadSerializer, RequestAttachmentSerializer
+
+_CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+|\*)$')
+
+
+class RequestAttachmentViewSet(
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Adjuntos de las solicitudes (?request=<id>). Borrar un adjunto no borra
+    el contenido: sweep_attachments lo elimina cuando nadie más lo usa.
+    """
+    queryset = RequestAttachment.objects.select_related('blob').order_by('created_at', 'id')
+    serializer_class = RequestAttachmentSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['request']
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        attachment = self.get_object()
+        blob = attachment.blob
+        # El contenido no cambia nunca: el hash sirve de ETag fuerte
+        return ranged_file_response(
+            request, attachments.blob_path(blob.sha256), blob.content_type, blob.sha256,
+            filename=attachment.filename, as_attachment=True,
+        )
+
+    @action(detail=True, methods=['get'])
+    def thumbnail(self, request, pk=None):
+        blob = self.get_object().blob
+        if blob.thumbnail != AttachmentBlob.READY:
+            return Response({"detail": "La miniatura no está disponible."}, status=status.HTTP_404_NOT_FOUND)
+        return ranged_file_response(
+            request, attachments.thumbnail_path(blob.sha256), 'image/jpeg', f'{blob.sha256}-thumbnail',
+        )
+
+
+class AttachmentUploadViewSet(
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    Subidas por partes y reanudables:
+
+    1. POST con request, filename, size y, opcionalmente, sha256. Si ese
+       contenido ya está guardado el adjunto se crea sin subir nada.
+    2. PATCH con cada parte en el cuerpo y ``Content-Range: bytes
+       inicio-fin/total``. Tras un corte, GET devuelve ``offset``, desde
+       donde se reanuda.
+    3. La parte que completa el archivo devuelve el adjunto creado.
+    """
+    queryset = AttachmentUpload.objects.all()
+    serializer_class = AttachmentUploadSerializer
+
+    def upload_response(self, upload=None, attachment=None, status_code=status.HTTP_200_OK):
+        context = self.get_serializer_context()
+        return Response({
+            'upload': AttachmentUploadSerializer(upload, context=context).data if upload else None,
+            'attachment': RequestAttachmentSerializer(attachment, context=context).data if attachment else None,
+        }, status=status_code)
+
+    def create(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        user = request.user if request.user.is_authenticated else None
+
+        if data.get('sha256'):
+            attachment = attachments.attach_existing(data['request'], data['filename'], data['sha256'], data['size'], user)
+            if attachment is not None:
+                return self.upload_response(attachment=attachment, status_code=status.HTTP_201_CREATED)
+
+        upload = attachments.start_upload(
+            data['request'], data['filename'], data['size'], user,
+            sha256=data.get('sha256', ''), content_type=data.get('content_type', ''),
+        )
+        return self.upload_response(upload, status_code=status.HTTP_201_CREATED)
+
+    def partial_update(self, request, pk=None):
+        upload = self.get_object()
+        match = _CONTENT_RANGE_RE.match(request.headers.get('Content-Range', ''))
+        if match is None:
+            return Response(
+                {"error": "Cabecera Content-Range requerida (bytes inicio-fin/total)."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        start, end, total = match.groups()
+        start, end = int(start), int(end)
+        length = end - start + 1
+        if length < 1 or (total != '*' and int(total) != upload.size):
+            return Response({"error": "Content-Range no es válido para esta subida."}, status=status.HTTP_400_BAD_REQUEST)
+        if length > settings.ATTACHMENT_CHUNK_MAX_BYTES:
+            return Response(
+                {"error": f"Cada parte admite como máximo {settings.ATTACHMENT_CHUNK_MAX_BYTES} bytes."},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        if request.headers.get('Content-Length') != str(length):
+            return Response({"error": "Content-Length no coincide con Content-Range."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            # El cuerpo se lee por bloques, sin pasar por los parsers de DRF
+            attachments.write_chunk(upload, request.stream, start, length)
+        except attachments.UploadConflict as e:
+            return Response({"error": str(e), "offset": e.offset}, status=status.HTTP_409_CONFLICT)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if upload.offset < upload.size:
+            return self.upload_response(upload)
+        try:
+            attachment = attachments.complete_upload(upload)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return self.upload_response(attachment=attachment, status_code=status.HTTP_201_CREATED)
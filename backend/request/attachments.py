@@ -0,0 +1,245 @@
+import hashlib
+import logging
+import mimetypes
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import AttachmentBlob, AttachmentUpload, RequestAttachment
+
+logger = logging.getLogger(__name__)
+
+# Bloques con los que se copia el cuerpo de la petición al disco y se
+# calcula el hash: el archivo nunca está entero en memoria
+BLOCK_SIZE = 64 * 1024
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class UploadConflict(Exception):
+    """
+    La parte no empieza donde termina lo recibido (otra petición avanzó la
+    subida o el cliente perdió la cuenta). ``offset`` es desde dónde seguir.
+    """
+    def __init__(self, offset):
+        super().__init__(f"La subida continúa en el byte {offset}.")
+        self.offset = offset
+
+
+def blob_path(sha256):
+    return os.path.join(settings.ATTACHMENT_ROOT, 'blobs', sha256[:2], sha256)
+
+
+def thumbnail_path(sha256):
+    return os.path.join(settings.ATTACHMENT_ROOT, 'thumbnails', sha256[:2], f'{sha256}.jpg')
+
+
+def upload_path(upload_id):
+    return os.path.join(settings.ATTACHMENT_ROOT, 'uploads', f'{upload_id}.part')
+
+
+def guess_content_type(filename, declared=''):
+    return declared or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while block := f.read(BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def attach_existing(request, filename, sha256, size, user=None):
+    """
+    Si el contenido ya está guardado crea el adjunto sin volver a subirlo;
+    si no, devuelve None.
+    """
+    blob = AttachmentBlob.objects.filter(sha256=sha256, size=size).first()
+    if blob is None:
+        return None
+    return RequestAttachment.objects.create(request=request, blob=blob, filename=filename, uploaded_by=user)
+
+
+def start_upload(request, filename, size, user=None, sha256='', content_type=''):
+    upload = AttachmentUpload.objects.create(
+        request=request,
+        filename=filename,
+        size=size,
+        sha256=sha256,
+        content_type=guess_content_type(filename, content_type),
+        uploaded_by=user,
+    )
+    path = upload_path(upload.pk)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, 'wb').close()
+    return upload
+
+
+def write_chunk(upload, stream, start, length):
+    """
+    Copia ``length`` bytes de ``stream`` al archivo de la subida desde
+    ``start`` y devuelve el nuevo offset. Si el cliente corta la conexión
+    se conserva lo recibido y la subida se reanuda desde ahí.
+    """
+    if start != upload.offset:
+        raise UploadConflict(upload.offset)
+    if start + length > upload.size:
+        raise ValueError("La parte excede el tamaño declarado del archivo.")
+
+    written = 0
+    with open(upload_path(upload.pk), 'r+b') as f:
+        # Descarta los restos de una parte anterior que no llegó a registrarse
+        f.truncate(start)
+        f.seek(start)
+        while written < length:
+            block = stream.read(min(BLOCK_SIZE, length - written))
+            if not block:
+                break
+            f.write(block)
+            written += len(block)
+
+    updated = AttachmentUpload.objects.filter(pk=upload.pk, offset=start).update(
+        offset=start + written,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        raise UploadConflict(AttachmentUpload.objects.values_list('offset', flat=True).get(pk=upload.pk))
+    upload.offset = start + written
+    return upload.offset
+
+
+def complete_upload(upload):
+    """
+    Verifica el SHA-256 del archivo recibido, lo guarda por contenido (si ya
+    existe se descarta la copia) y crea el adjunto. Las imágenes nuevas
+    reciben su miniatura al confirmar la transacción.
+    """
+    path = upload_path(upload.pk)
+    sha256 = file_sha256(path)
+    if upload.sha256 and sha256 != upload.sha256:
+        upload.delete()
+        raise ValueError("El contenido recibido no coincide con el SHA-256 declarado.")
+
+    with transaction.atomic():
+        is_image = upload.content_type.startswith('image/')
+        blob, created = AttachmentBlob.objects.get_or_create(
+            sha256=sha256,
+            defaults={
+                'size': upload.size,
+                'content_type': upload.content_type,
+                'thumbnail': AttachmentBlob.PENDING if is_image else AttachmentBlob.UNAVAILABLE,
+            },
+        )
+        target = blob_path(sha256)
+        if os.path.exists(target):
+            os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(path, target)
+        attachment = RequestAttachment.objects.create(
+            request_id=upload.request_id,
+            blob=blob,
+            filename=upload.filename,
+            uploaded_by_id=upload.uploaded_by_id,
+        )
+        upload.delete()
+        if created and blob.thumbnail == AttachmentBlob.PENDING:
+            transaction.on_commit(lambda: schedule_thumbnail(blob.pk))
+    return attachment
+
+
+def schedule_thumbnail(blob_id):
+    """
+    Genera la miniatura en un hilo aparte, fuera de la petición. Con
+    ATTACHMENT_THUMBNAIL_WORKERS = 0 queda pendiente para sweep_attachments.
+    """
+    global _executor
+    workers = settings.ATTACHMENT_THUMBNAIL_WORKERS
+    if workers <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='thumbnails')
+    return _executor.submit(_thumbnail_task, blob_id)
+
+
+def _thumbnail_task(blob_id):
+    try:
+        return generate_thumbnail(blob_id)
+    except Exception:
+        logger.exception("Error al generar la miniatura del adjunto %s", blob_id)
+    finally:
+        connections.close_all()
+
+
+def generate_thumbnail(blob_id):
+    """
+    Miniatura JPEG de ATTACHMENT_THUMBNAIL_SIZE px de lado mayor. Los
+    archivos que Pillow no reconoce como imagen quedan sin miniatura.
+    """
+    sha256 = AttachmentBlob.objects.values_list('sha256', flat=True).get(pk=blob_id)
+    size = settings.ATTACHMENT_THUMBNAIL_SIZE
+    target = thumbnail_path(sha256)
+    status = AttachmentBlob.UNAVAILABLE
+    try:
+        with Image.open(blob_path(sha256)) as image:
+            # Los JPEG se decodifican directamente a una escala reducida
+            image.draft('RGB', (size, size))
+            thumbnail = ImageOps.exif_transpose(image)
+            thumbnail.thumbnail((size, size))
+            if thumbnail.mode != 'RGB':
+                thumbnail = thumbnail.convert('RGB')
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                thumbnail.save(f, 'JPEG', quality=80)
+            os.replace(tmp_path, target)
+        status = AttachmentBlob.READY
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.info("Sin miniatura para %s: %s", sha256, e)
+    AttachmentBlob.objects.filter(pk=blob_id).update(thumbnail=status)
+    return status
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def sweep(now=None):
+    """
+    Descarta las subidas sin actividad desde hace ATTACHMENT_UPLOAD_TTL_HOURS,
+    borra los contenidos que ya no usa ningún adjunto y genera las miniaturas
+    pendientes. Devuelve cuántos elementos procesó de cada tipo.
+    """
+    cutoff = (now or timezone.now()) - timedelta(hours=settings.ATTACHMENT_UPLOAD_TTL_HOURS)
+    # post_delete borra el archivo .part de cada subida
+    uploads, _ = AttachmentUpload.objects.filter(updated_at__lt=cutoff).delete()
+
+    blobs = 0
+    orphans = AttachmentBlob.objects.filter(attachments__isnull=True, created_at__lt=cutoff)
+    for blob_id, sha256 in orphans.values_list('pk', 'sha256'):
+        # Vuelve a comprobar: pudo recibir un adjunto mientras tanto
+        deleted, _ = AttachmentBlob.objects.filter(pk=blob_id, attachments__isnull=True).delete()
+        if deleted:
+            _remove(blob_path(sha256))
+            _remove(thumbnail_path(sha256))
+            blobs += 1
+
+    pending = AttachmentBlob.objects.filter(thumbnail=AttachmentBlob.PENDING).order_by('created_at')
+    thumbnails = 0
+    for blob_id in pending.values_list('pk', flat=True):
+        generate_thumbnail(blob_id)
+        thumbnails += 1
+    return {'uploads': uploads, 'blobs': blobs, 'thumbnails': thumbnails}
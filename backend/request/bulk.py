@@ -0,0 +1,96 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .assignment import assignment_lock, choose_technicians
+from .models import Request
+from .signals import bulk_operation, requests_bulk_changed
+
+BATCH_SIZE = 500
+
+BULK_MAX_ITEMS = 10000
+
+UPDATABLE_FIELDS = ('subject', 'description', 'note', 'department', 'technician', 'status', 'priority', 'category')
+
+# Campos necesarios para mantener cachés, índices y acumulados al borrar
+DELETE_FIELDS = ('id', 'created_at', 'department_id', 'technician_id', 'status')
+
+
+def batches(items, size=BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def bulk_create_requests(items):
+    """
+    Crea las solicitudes validadas en lotes, cada lote en su propia transacción.
+    """
+    requests = [Request(**item) for item in items]
+    for request in requests:
+        # bulk_create no envía pre_save
+        request.sync_resolved_at()
+    created = []
+    for batch in batches(requests):
+        # Las que llegan sin técnico se asignan por carga de trabajo
+        unassigned = [request for request in batch if request.technician_id is None]
+        with assignment_lock() if unassigned else transaction.atomic():
+            if unassigned:
+                technicians = choose_technicians([request.department_id for request in unassigned])
+                for request, technician_id in zip(unassigned, technicians):
+                    request.technician_id = technician_id
+            Request.objects.bulk_create(batch)
+            requests_bulk_changed.send(sender=Request, created=batch)
+        created.extend(batch)
+    return created
+
+
+def bulk_update_requests(items):
+    """
+    Aplica los cambios validados (cada elemento trae su ``instance``) en lotes.
+    """
+    updated = []
+    for batch in batches(items):
+        previous = {}
+        instances = []
+        fields = {'updated_at', 'last_activity_at'}
+        now = timezone.now()
+        for item in batch:
+            instance = item['instance']
+            previous[instance.pk] = Request(
+                pk=instance.pk,
+                created_at=instance.created_at,
+                department_id=instance.department_id,
+                technician_id=instance.technician_id,
+                status=instance.status,
+            )
+            for name in UPDATABLE_FIELDS:
+                if name in item:
+                    setattr(instance, name, item[name])
+                    fields.add(name)
+            # bulk_update no pasa por save(): auto_now ni pre_save
+            instance.updated_at = now
+            instance.last_activity_at = now
+            if 'status' in item:
+                instance.sync_resolved_at()
+                fields.add('resolved_at')
+            instances.append(instance)
+        with transaction.atomic():
+            Request.objects.bulk_update(instances, sorted(fields))
+            requests_bulk_changed.send(sender=Request, updated=instances, previous=previous)
+        updated.extend(instances)
+    return updated
+
+
+def bulk_delete_requests(ids):
+    """
+    Borra las solicitudes en lotes. Devuelve los ids que no existían.
+    """
+    ids = list(dict.fromkeys(ids))
+    found = set()
+    for batch in batches(ids):
+        with transaction.atomic():
+            rows = list(Request.objects.filter(pk__in=batch).only(*DELETE_FIELDS))
+            with bulk_operation():
+                Request.objects.filter(pk__in=[row.pk for row in rows]).delete()
+            requests_bulk_changed.send(sender=Request, deleted=rows)
+        found.update(row.pk for row in rows)
+    return [pk for pk in ids if pk not in found]
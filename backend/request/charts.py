@@ -0,0 +1,60 @@
+import io
+from functools import lru_cache
+
+from django.conf import settings
+
+
+@lru_cache(maxsize=1)
+def _plotting():
+    # matplotlib se importa sólo cuando se genera el primer gráfico, así los
+    # workers que atienden el CRUD no pagan el costo de importarlo.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    return Figure, FigureCanvasAgg
+
+
+@lru_cache(maxsize=64)
+def _render_department_chart(labels, counts, dpi):
+    Figure, FigureCanvasAgg = _plotting()
+
+    # API orientada a objetos: sin estado global de pyplot, seguro entre
+    # hilos. Figura y canvas nuevos en cada gráfico; no se reutilizan.
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    positions = range(len(labels))
+    ax.bar(positions, counts, width=0.5, color='skyblue')
+    ax.set_title('Número de Solicitudes por Departamento')
+    ax.set_xlabel('Departamento')
+    ax.set_ylabel('Número de Solicitudes')
+    ax.set_xticks(positions)
+    ax.set_xticklabels(labels, rotation=45, ha='right')
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi)
+    # Rompe las referencias entre la figura y sus ejes para que se liberen
+    # antes; el canvas (con el buffer del renderer) se va con la figura
+    fig.clear()
+    return buffer.getvalue()
+
+
+def department_chart(counts, dpi=None):
+    """
+    Gráfico de barras (PNG en bytes) con la cantidad de solicitudes por
+    departamento. ``counts`` es una lista de pares (nombre, cantidad).
+
+    Los gráficos se memorizan por el vector de cantidades, así los informes
+    repetidos del mismo rango no vuelven a dibujarse.
+    """
+    labels = tuple(name for name, _ in counts)
+    values = tuple(total for _, total in counts)
+    return _render_department_chart(labels, values, dpi or settings.REPORT_CHART_DPI)
+
+
+def warm_up():
+    """
+    Importa matplotlib y dibuja un gráfico mínimo para que la primera petición
+    de informe no pague la inicialización (fuentes, caché de matplotlib).
+    """
+    _render_department_chart(('',), (0,), 10)
@@ -0,0 +1,34 @@
+from datetime import datetime
+from functools import lru_cache
+
+from django.utils import timezone
+
+# Nombres de los meses como los escribe strftime('%B') con el locale es_ES
+MONTHS = (
+    'enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio', 'julio',
+    'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre',
+)
+
+
+@lru_cache(maxsize=4096)
+def _format_day(day):
+    return f"{day.day:02d} de {MONTHS[day.month - 1]} del {day.year}"
+
+
+def spanish_date(value):
+    """
+    Fecha en el formato de los informes ("05 de marzo del 2025") sin usar
+    locale.setlocale, que es global al proceso. Los datetime con zona horaria
+    se pasan primero a la hora local.
+
+    Se memoriza por día: en un informe muchas filas comparten la fecha.
+    """
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        value = value.date()
+    return _format_day(value)
+
+
+def spanish_range(start, end):
+    return f"Desde el {spanish_date(start)} hasta el {spanish_date(end)}"
@@ -0,0 +1,88 @@
+import copy
+import hashlib
+import io
+import os
+import threading
+
+from django.conf import settings
+from docxtpl import DocxTemplate
+
+REPORT_TEMPLATE = 'formato_informe_grafica.docx'
+SINGLE_REPORT_TEMPLATE = 'formato_informe2.docx'
+
+
+class _Entry:
+    """
+    Plantilla ya leída y analizada. ``signature`` (mtime, tamaño) permite
+    detectar si el archivo cambió en disco.
+    """
+    def __init__(self, path, signature):
+        self.path = path
+        self.signature = signature
+        with open(path, 'rb') as f:
+            self.content = f.read()
+        self.hash = hashlib.sha256(self.content).hexdigest()
+        template = DocxTemplate(io.BytesIO(self.content))
+        template.init_docx()
+        self.document = template.docx
+        # python-docx crea objetos de forma perezosa al recorrer el
+        # documento: las copias se hacen de a una
+        self.lock = threading.Lock()
+
+    def copy(self):
+        template = DocxTemplate(io.BytesIO(self.content))
+        with self.lock:
+            template.docx = copy.deepcopy(self.document)
+        return template
+
+
+_entries = {}
+_lock = threading.Lock()
+
+
+def template_path(name):
+    """
+    Ruta absoluta de la plantilla, independiente del directorio de trabajo.
+    """
+    return os.path.join(settings.REPORT_TEMPLATES_DIR, name)
+
+
+def _entry(name):
+    path = template_path(name)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    entry = _entries.get(path)
+    if entry is None or entry.signature != signature:
+        with _lock:
+            entry = _entries.get(path)
+            if entry is None or entry.signature != signature:
+                entry = _Entry(path, signature)
+                _entries[path] = entry
+    return entry
+
+
+def load(name):
+    """
+    DocxTemplate listo para renderizar. Es una copia del documento analizado
+    en caché (sin volver a descomprimir ni analizar el .docx), así que cada
+    llamada puede modificarlo sin afectar a las demás.
+    """
+    return _entry(name).copy()
+
+
+def template_hash(name):
+    return _entry(name).hash
+
+
+def warm_up(*names):
+    """
+    Carga las plantillas en la caché del proceso. Sin argumentos, carga las
+    de los informes. Lanza FileNotFoundError si alguna no existe.
+    """
+    for name in names or (REPORT_TEMPLATE, SINGLE_REPORT_TEMPLATE):
+        _entry(name)
+
+
+def clear():
+    with _lock:
+        _entries.clear()
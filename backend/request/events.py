@@ -0,0 +1,191 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Evento enviado a un cliente cuya cola se llenó: debe recargar el listado
+RESET = {'type': 'reset'}
+
+
+def request_event(kind, request, previous=None):
+    """
+    Evento de una solicitud (created, updated o deleted). Lleva sólo lo
+    necesario para filtrar y avisar; el cliente pide el detalle al API.
+    ``previous`` es (departamento, técnico) antes del cambio, para que también
+    lo reciban quienes seguían el departamento o técnico anterior.
+    """
+    event = {
+        'type': kind,
+        'id': request.pk,
+        'department': request.department_id,
+        'technician': request.technician_id,
+        'created_at': request.created_at.isoformat() if request.created_at else None,
+    }
+    # Las bajas masivas cargan sólo las columnas necesarias
+    if 'subject' not in request.get_deferred_fields():
+        event['subject'] = request.subject
+    if previous and previous != (request.department_id, request.technician_id):
+        event['previous_department'], event['previous_technician'] = previous
+    return event
+
+
+class Subscription:
+    """
+    Cliente conectado. La cola es acotada: si el cliente no lee a tiempo se
+    descartan los eventos pendientes y se le envía RESET (contrapresión sin
+    que un cliente lento haga crecer la memoria del servidor).
+    """
+    def __init__(self, loop, departments=(), technicians=(), max_queue=100):
+        self.loop = loop
+        self.departments = set(departments)
+        self.technicians = set(technicians)
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.resetting = False
+
+    def matches(self, event):
+        if event['type'] == 'reset':
+            return True
+        if self.departments and not self.departments & {event.get('department'), event.get('previous_department')}:
+            return False
+        if self.technicians and not self.technicians & {event.get('technician'), event.get('previous_technician')}:
+            return False
+        return True
+
+    def deliver(self, event):
+        # Se ejecuta en el loop del cliente
+        if self.resetting:
+            if not self.queue.empty():
+                # El RESET sigue sin leerse: el cliente recargará igual
+                self.dropped += 1
+                return
+            self.resetting = False
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += self.queue.qsize() + 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESET)
+            self.resetting = True
+
+
+class Broker:
+    """
+    Pub/sub en proceso. ``publish`` se llama desde código síncrono (señales);
+    el backend decide cómo llega el evento a ``dispatch`` en cada proceso.
+    """
+    def __init__(self, backend_path=None):
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self.backend = import_string(backend_path or settings.REQUEST_EVENTS_BACKEND)(self)
+
+    def subscribe(self, departments=(), technicians=(), max_queue=None):
+        subscription = Subscription(
+            asyncio.get_running_loop(), departments, technicians,
+            max_queue or settings.REQUEST_EVENTS_QUEUE_SIZE,
+        )
+        with self._lock:
+            self._subscriptions.add(subscription)
+        self.backend.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event):
+        self.backend.publish(event)
+
+    def dispatch(self, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if subscription.matches(event):
+                try:
+                    subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+                except RuntimeError:
+                    # El loop del cliente ya se cerró
+                    self.unsubscribe(subscription)
+
+
+class InMemoryBackend:
+    """
+    Entrega directa dentro del proceso. Sirve para pruebas y para un solo
+    worker ASGI.
+    """
+    def __init__(self, broker):
+        self.broker = broker
+
+    def start(self):
+        pass
+
+    def publish(self, event):
+        self.broker.dispatch(event)
+
+
+class PostgresBackend:
+    """
+    LISTEN/NOTIFY de PostgreSQL: cada proceso ASGI escucha el canal en un
+    hilo con su propia conexión, así los eventos de cualquier worker llegan
+    a todos los clientes.
+    """
+    channel = 'request_events'
+    poll_timeout = 5
+
+    def __init__(self, broker):
+        self.broker = broker
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def publish(self, event):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, json.dumps(event)])
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, name='request-events-listener', daemon=True)
+                self._thread.start()
+
+    def _listen(self):
+        while True:
+            conn = None
+            try:
+                conn = connection.Database.connect(**connection.get_connection_params())
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN {self.channel}')
+                while True:
+                    if select.select([conn], [], [], self.poll_timeout) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self.broker.dispatch(json.loads(notify.payload))
+            except Exception:
+                logger.exception('Se perdió la conexión LISTEN de eventos; reintentando')
+                # Los clientes pueden haberse perdido eventos: que recarguen
+                self.broker.dispatch(RESET)
+                time.sleep(self.poll_timeout)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+@lru_cache(maxsize=1)
+def get_broker():
+    return Broker()
+
+
+def publish(event):
+    get_broker().publish(event)
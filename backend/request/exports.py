@@ -0,0 +1,205 @@
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+# Tamaño aproximado de cada bloque enviado al cliente
+CHUNK_SIZE = 64 * 1024
+
+EXPORT_COLUMNS = (
+    'id',
+    'subject',
+    'description',
+    'note',
+    'department_id',
+    'department__name',
+    'technician_id',
+    'technician__first_name',
+    'technician__last_name',
+    'created_at',
+)
+
+HEADERS = (
+    'id',
+    'subject',
+    'description',
+    'note',
+    'department',
+    'department_name',
+    'technician',
+    'technician_full_name',
+    'created_at',
+)
+
+
+def export_rows(queryset, chunk_size=2000):
+    """
+    Recorre las solicitudes con un cursor del lado del servidor (iterator)
+    sobre values(): la memoria no depende de la cantidad de filas.
+    """
+    rows = queryset.values(*EXPORT_COLUMNS).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield (
+            row['id'],
+            row['subject'],
+            row['description'],
+            row['note'],
+            row['department_id'],
+            row['department__name'],
+            row['technician_id'],
+            f"{row['technician__first_name']} {row['technician__last_name']}".strip(),
+            timezone.localtime(row['created_at']).isoformat(),
+        )
+
+
+def _buffered(pieces):
+    # Agrupa las piezas pequeñas en bloques de ~CHUNK_SIZE
+    buffer, size = [], 0
+    for piece in pieces:
+        buffer.append(piece)
+        size += len(piece)
+        if size >= CHUNK_SIZE:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    # BOM para que Excel detecte UTF-8
+    yield '\ufeff'.encode()
+    yield from _buffered(
+        writer.writerow(row).encode() for row in _with_header(rows)
+    )
+
+
+def stream_ndjson(rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    yield from _buffered(
+        (encoder.encode(dict(zip(HEADERS, row))) + '\n').encode() for row in rows
+    )
+
+
+def _with_header(rows):
+    yield HEADERS
+    yield from rows
+
+
+class _ZipSink:
+    """
+    Archivo de sólo escritura y sin seek: zipfile escribe con descriptores de
+    datos y aquí se acumulan los bytes hasta que el generador los entrega.
+    """
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks, self.size = [], 0
+        return data
+
+
+def stream_zip(files, compression=zipfile.ZIP_DEFLATED):
+    """
+    Genera un ZIP a medida que se producen sus archivos. ``files`` es un
+    iterable de pares (nombre, iterable de bytes).
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, 'w', compression=compression) as archive:
+        for name, chunks in files:
+            with archive.open(name, 'w', force_zip64=True) as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    if sink.size >= CHUNK_SIZE:
+                        yield sink.drain()
+            yield sink.drain()
+    yield sink.drain()
+
+
+XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Solicitudes" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+# Caracteres de control que no admite XML 1.0
+_INVALID_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+def _xlsx_cell(value):
+    if isinstance(value, int):
+        return f'<c><v>{value}</v></c>'
+    text = escape(_INVALID_XML.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_sheet(rows):
+    yield (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+    ).encode()
+    yield from _buffered(
+        ('<row>' + ''.join(_xlsx_cell(value) for value in row) + '</row>').encode()
+        for row in _with_header(rows)
+    )
+    yield b'</sheetData></worksheet>'
+
+
+def stream_xlsx(rows):
+    """
+    Hoja de cálculo mínima (una hoja, cadenas en línea) escrita en streaming,
+    sin construir el libro en memoria.
+    """
+    files = [(name, [content.encode()]) for name, content in XLSX_STATIC_PARTS.items()]
+    files.append(('xl/worksheets/sheet1.xml', _xlsx_sheet(rows)))
+    return stream_zip(files)
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson; charset=utf-8'),
+    'xlsx': (stream_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
@@ -2,15 +2,49 @@ import django_filters
 from django.utils.timezone import make_aware
 from datetime import datetime, time
 from .models import Request
+from .pagination import REQUEST_ORDERINGS
+from .search import search_requests
+
+class CharInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    pass
+
+
+class NumberInFilter(django_filters.BaseInFilter, django_filters.NumberFilter):
+    pass
+
 
 class RequestFilter(django_filters.FilterSet):
     start_date = django_filters.DateFilter(field_name='created_at', lookup_expr='gte')
     end_date = django_filters.DateFilter(method='filter_end_date')
+    q = django_filters.CharFilter(method='filter_search')
+    # Listas separadas por comas: ?status=open,in_progress&priority=3,4
+    status = CharInFilter(field_name='status', lookup_expr='in')
+    priority = NumberInFilter(field_name='priority', lookup_expr='in')
+    category = CharInFilter(field_name='category', lookup_expr='in')
+    # ?open=true: abiertas o en proceso (índices parciales)
+    open = django_filters.BooleanFilter(method='filter_open')
+    technician = django_filters.NumberFilter(field_name='technician_id')
+    # ?ordering=-last_activity_at: las de actividad más reciente primero
+    ordering = django_filters.ChoiceFilter(
+        choices=[(value, value) for value in REQUEST_ORDERINGS],
+        method='filter_ordering',
+    )
 
     def filter_end_date(self, queryset, name, value):
         end_of_day = datetime.combine(value, time.max)
         return queryset.filter(created_at__lte=make_aware(end_of_day))
 
+    def filter_search(self, queryset, name, value):
+        return search_requests(queryset, value)
+
+    def filter_open(self, queryset, name, value):
+        if value:
+            return queryset.filter(status__in=Request.OPEN_STATUSES)
+        return queryset.exclude(status__in=Request.OPEN_STATUSES)
+
+    def filter_ordering(self, queryset, name, value):
+        return queryset.order_by(*REQUEST_ORDERINGS[value])
+
     class Meta:
         model = Request
-        fields = ['start_date', 'end_date']
+        fields = ['start_date', 'end_date', 'q', 'status', 'priority', 'category', 'open', 'technician', 'ordering']
@@ -0,0 +1,78 @@
+import io
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+
+from core.replicas import use_replica
+from .models import ReportJob
+from .reports import report_range, render_report
+
+logger = logging.getLogger(__name__)
+
+
+def fail_stale_jobs():
+    """
+    Marca como fallidos los informes que llevan en proceso más de
+    REPORT_JOB_TIMEOUT_MINUTES: el worker que los tomó murió sin terminarlos
+    y nadie más los va a cerrar. No se vuelven a encolar porque un informe
+    que tumba al worker (por memoria, por ejemplo) lo haría una y otra vez;
+    el usuario puede pedirlo de nuevo.
+    """
+    now = timezone.now()
+    limit = now - timedelta(minutes=settings.REPORT_JOB_TIMEOUT_MINUTES)
+    failed = ReportJob.objects.filter(status=ReportJob.RUNNING, started_at__lt=limit).update(
+        status=ReportJob.FAILED,
+        error='El proceso que generaba el informe se detuvo antes de terminar.',
+        finished_at=now,
+    )
+    if failed:
+        logger.warning("%s informes en proceso superaron el tiempo límite y se marcan como fallidos", failed)
+    return failed
+
+
+def claim_next_job():
+    """
+    Toma el informe pendiente más antiguo y lo marca como en proceso.
+    Antes cierra los que quedaron en proceso de un worker caído.
+
+    La base de datos hace de cola: el UPDATE condicionado al estado garantiza
+    que dos workers no procesen el mismo informe, sin depender de
+    SELECT ... FOR UPDATE (que SQLite no soporta).
+    """
+    fail_stale_jobs()
+    pending = ReportJob.objects.filter(status=ReportJob.PENDING).order_by('created_at')
+    for job_id in pending.values_list('id', flat=True)[:10]:
+        claimed = ReportJob.objects.filter(pk=job_id, status=ReportJob.PENDING).update(
+            status=ReportJob.RUNNING,
+            started_at=timezone.now(),
+        )
+        if claimed:
+            return job_id
+    return None
+
+
+def run_report_job(job_id):
+    """
+    Genera el informe de un trabajo ya reclamado y guarda el resultado.
+    Se ejecuta dentro de los procesos del pool del worker. Las consultas
+    del informe van a una réplica si hay alguna configurada.
+    """
+    job = ReportJob.objects.get(pk=job_id)
+    try:
+        start, end = report_range(job.start_date, job.end_date)
+        buffer = io.BytesIO()
+        with use_replica():
+            render_report(start, end, buffer)
+        job.result.save(f"reporte_solicitudes_{job.pk}.docx", ContentFile(buffer.getvalue()), save=False)
+        job.status = ReportJob.DONE
+        job.error = ''
+    except Exception as e:
+        logger.exception("Error al generar el informe %s", job_id)
+        job.status = ReportJob.FAILED
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['result', 'status', 'error', 'finished_at'])
+    return job.status
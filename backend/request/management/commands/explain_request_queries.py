@@ -0,0 +1,181 @@
+import re
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from core.mixins import latest_queryset
+from department.models import Department
+from request.filters import RequestFilter
+from request.models import Request
+from request.reports import department_counts_queryset, report_queryset
+from request.sample_data import build_requests, insert_requests
+from request.search import index_requests, search_requests
+from request.views import RequestViewSet
+
+User = get_user_model()
+
+# SQLite sólo usa un índice parcial si la condición aparece con literales, y
+# Django siempre pasa los valores como parámetros
+PARTIAL_INDEX_QUERIES = {'abiertas por estado'}
+
+# Resultados de la búsqueda con los que se compara su tiempo: si todas las
+# filas coinciden, cuadruplicarlas no debe costar mucho más del cuádruple
+SEARCH_SCALING_ROWS = (1000, 4000)
+SEARCH_SCALING_TOLERANCE = 2
+
+
+class Command(BaseCommand):
+    """
+    Ejecuta EXPLAIN sobre las consultas de filtros e informes de solicitudes y
+    falla si alguna recorre la tabla request_request completa.
+
+    Si la tabla tiene menos filas que --rows, se completa con datos de prueba
+    dentro de una transacción que se revierte al terminar.
+
+    Un plan sin recorridos secuenciales no basta para la búsqueda de texto
+    (una subconsulta por fila tampoco los muestra): además se mide cómo
+    crece su tiempo con el número de resultados.
+    """
+    help = 'Verifica con EXPLAIN que las consultas de solicitudes usan índices.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=50000, help='Tamaño de la tabla con el que se evalúan los planes.')
+        parser.add_argument('--days', type=int, default=30, help='Días del rango de fechas consultado.')
+
+    def handle(self, *args, **options):
+        failures = []
+        with transaction.atomic():
+            self.fill_table(options['rows'])
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE request_request')
+
+            for name, queryset in self.queries(options['days']):
+                if name in PARTIAL_INDEX_QUERIES and connection.vendor != 'postgresql':
+                    self.stdout.write(f'[--] {name}: índice parcial, sólo se evalúa en PostgreSQL')
+                    continue
+                plan = queryset.explain()
+                scans = self.sequential_scans(plan)
+                if scans:
+                    failures.append(name)
+                    self.stdout.write(self.style.ERROR(f'[SCAN] {name}'))
+                else:
+                    self.stdout.write(self.style.SUCCESS(f'[OK] {name}'))
+                self.stdout.write(plan)
+                self.stdout.write('')
+
+            if not self.search_scales():
+                failures.append('búsqueda de texto (escala)')
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"Consultas con recorrido secuencial o que no escalan: {', '.join(failures)}")
+
+    def fill_table(self, rows):
+        missing = rows - Request.objects.count()
+        if missing <= 0:
+            return
+        departments = [
+            Department.objects.create(name=f'__explain_{i}', director='EXPLAIN')
+            for i in range(20)
+        ]
+        technicians = [
+            User.objects.create(username=f'__explain_{i}', is_staff=True)
+            for i in range(10)
+        ]
+        self.stdout.write(f'Insertando {missing} solicitudes temporales...')
+        insert_requests(missing, departments, technicians, days=3 * 365, seed=0)
+
+    def queries(self, days):
+        end = timezone.now()
+        start = end - timedelta(days=days)
+        params = {
+            'start_date': start.date().isoformat(),
+            'end_date': end.date().isoformat(),
+        }
+        filtered = RequestFilter(params, queryset=Request.objects.order_by('-created_at', '-id')).qs
+        department = Department.objects.order_by('pk').first()
+        technician = Request.objects.order_by().values_list('technician', flat=True).first()
+
+        return [
+            ('listado (primera página)', Request.objects.order_by('-created_at', '-id')[:50]),
+            ('listado por actividad reciente', Request.objects.order_by('-last_activity_at', '-id')[:50]),
+            ('versión del listado (ETag)', latest_queryset(
+                Request.objects.all(), RequestViewSet.conditional_latest,
+                RequestViewSet.conditional_fields, RequestViewSet.conditional_annotations,
+            )[:1]),
+            ('filtro start_date/end_date', filtered),
+            ('filtro por departamento y rango', filtered.filter(department=department)),
+            ('filtro por técnico y rango', filtered.filter(technician=technician)),
+            ('informe: filas del rango', report_queryset(start, end)),
+            ('informe: solicitudes por departamento', department_counts_queryset(start, end)),
+            ('búsqueda de texto (?q=)', search_requests(Request.objects.all(), 'impresora')),
+            ('cola de trabajo del técnico', Request.objects.filter(
+                technician=technician, status__in=Request.OPEN_STATUSES,
+            ).order_by('-priority', 'created_at', 'id')[:200]),
+            ('abiertas por estado', Request.objects.filter(
+                status__in=Request.OPEN_STATUSES,
+            ).values('status').annotate(total=Count('id')).order_by()),
+            ('resueltas en el rango', Request.objects.filter(
+                resolved_at__gte=start, resolved_at__lte=end,
+            ).values('resolved_at', 'created_at')),
+        ]
+
+    def search_scales(self):
+        """
+        Tiempo de la primera página de búsquedas en las que coinciden
+        SEARCH_SCALING_ROWS filas. Falla si crece más que linealmente.
+        """
+        department = Department.objects.order_by('pk').first()
+        technician = User.objects.filter(is_staff=True).order_by('pk').first()
+        timings = []
+        for count in SEARCH_SCALING_ROWS:
+            word = f'escala{"x" * len(timings)}z'
+            rows = list(build_requests(count, [department], [technician], seed=count))
+            for row in rows:
+                row.subject = f'{word} {row.subject}'
+            Request.objects.bulk_create(rows)
+            # En PostgreSQL el índice lo mantiene el trigger
+            index_requests(rows)
+
+            best = None
+            for _ in range(5):
+                start = time.perf_counter()
+                list(search_requests(Request.objects.all(), word)[:50])
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings.append(best)
+
+        (small, large), (fast, slow) = SEARCH_SCALING_ROWS, timings
+        limit = large / small * SEARCH_SCALING_TOLERANCE
+        ratio = slow / fast
+        message = (
+            f'búsqueda de texto: {small} resultados {fast * 1000:.1f} ms, '
+            f'{large} resultados {slow * 1000:.1f} ms (x{ratio:.1f}, máximo x{limit:.0f})'
+        )
+        if ratio > limit:
+            self.stdout.write(self.style.ERROR(f'[ESCALA] {message}'))
+            return False
+        self.stdout.write(self.style.SUCCESS(f'[OK] {message}'))
+        return True
+
+    def sequential_scans(self, plan):
+        table = Request._meta.db_table
+        scans = []
+        for line in plan.splitlines():
+            text = line.strip()
+            if connection.vendor == 'postgresql':
+                if f'Seq Scan on {table}' in text:
+                    scans.append(text)
+            elif connection.vendor == 'sqlite':
+                # "SCAN tabla USING INDEX ..." recorre un índice, no la tabla.
+                # En subconsultas Django usa alias (U0, U1...) en lugar del nombre.
+                match = re.search(r'\bSCAN (\S+)', text)
+                if match and 'USING' not in text and re.fullmatch(rf'{table}|U\d+', match.group(1)):
+                    scans.append(text)
+        return scans
@@ -0,0 +1,63 @@
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from request.jobs import claim_next_job
+from request.models import ReportJob
+from request.worker import init_worker, run_job
+
+
+class Command(BaseCommand):
+    """
+    Worker local de informes: toma los trabajos pendientes de la base de datos
+    y los genera en un pool de procesos, fuera del ciclo de la petición HTTP.
+    """
+    help = 'Procesa la cola de informes pendientes con un pool de procesos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2, help='Número de procesos del pool.')
+        parser.add_argument('--poll-interval', type=float, default=2.0, help='Segundos de espera cuando la cola está vacía.')
+        parser.add_argument('--once', action='store_true', help='Procesa los pendientes y termina.')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        poll_interval = options['poll_interval']
+
+        # Cada proceso del pool abre sus propias conexiones a la base de datos
+        connections.close_all()
+        context = multiprocessing.get_context('spawn')
+
+        self.stdout.write(self.style.SUCCESS(f'Worker de informes iniciado con {workers} procesos.'))
+        running = {}
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker) as pool:
+            while True:
+                while len(running) < workers:
+                    job_id = claim_next_job()
+                    if job_id is None:
+                        break
+                    running[pool.submit(run_job, job_id)] = job_id
+
+                if not running:
+                    if options['once']:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                done, _ = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = running.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        ReportJob.objects.filter(pk=job_id, status=ReportJob.RUNNING).update(
+                            status=ReportJob.FAILED,
+                            error=str(e),
+                            finished_at=timezone.now(),
+                        )
+                        self.stdout.write(self.style.ERROR(f'Informe {job_id}: error en el proceso ({e}).'))
+                    else:
+                        self.stdout.write(f'Informe {job_id}: {result}.')
@@ -0,0 +1,28 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from request import stats
+
+
+class Command(BaseCommand):
+    """
+    Recalcula los acumulados diarios de solicitudes (RequestDailyStat) a partir
+    de la tabla de solicitudes. Sirve para la carga inicial y para corregir
+    diferencias después de importaciones masivas.
+    """
+    help = 'Reconstruye los acumulados diarios de solicitudes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', help='Primer día a recalcular (YYYY-MM-DD).')
+        parser.add_argument('--end-date', help='Último día a recalcular (YYYY-MM-DD).')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start_date']) if options['start_date'] else None
+            end = date.fromisoformat(options['end_date']) if options['end_date'] else None
+        except ValueError:
+            raise CommandError('Formato de fecha inválido. Usa YYYY-MM-DD.')
+
+        rows = stats.rebuild(start, end)
+        self.stdout.write(self.style.SUCCESS(f'Acumulados reconstruidos: {rows} filas.'))
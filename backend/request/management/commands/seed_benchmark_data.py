@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from department.lookups import departments_cache
+from department.models import Department
+from request import report_cache
+from request.sample_data import insert_requests
+from user.lookups import technicians_cache
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Carga datos de prueba para los benchmarks: N departamentos, técnicos y
+    solicitudes insertados con bulk_create. Los departamentos y técnicos se
+    identifican con --prefix, así volver a ejecutarlo reutiliza los
+    existentes y sólo agrega solicitudes.
+    """
+    help = 'Genera departamentos, técnicos y solicitudes de prueba en lote.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--departments', type=int, default=20)
+        parser.add_argument('--technicians', type=int, default=10)
+        parser.add_argument('--requests', type=int, default=10000)
+        parser.add_argument('--days', type=int, default=365, help='Las solicitudes se reparten en los últimos N días.')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0, help='Semilla para que los datos sean reproducibles.')
+        parser.add_argument('--prefix', default='bench')
+
+    def handle(self, *args, **options):
+        if options['departments'] < 1 or options['technicians'] < 1:
+            raise CommandError('Se necesita al menos un departamento y un técnico.')
+
+        prefix = options['prefix']
+        with transaction.atomic():
+            departments = self.departments(prefix, options['departments'])
+            technicians = self.technicians(prefix, options['technicians'])
+        # bulk_create no envía post_save
+        departments_cache.invalidate()
+        technicians_cache.invalidate()
+        report_cache.invalidate()
+
+        insert_requests(
+            options['requests'], departments, technicians,
+            days=options['days'], batch_size=options['batch_size'], seed=options['seed'], notify=True,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Datos de prueba: {len(departments)} departamentos, {len(technicians)} técnicos, "
+            f"{options['requests']} solicitudes nuevas."
+        ))
+
+    def departments(self, prefix, count):
+        names = [f'{prefix} Departamento {i}' for i in range(count)]
+        existing = set(Department.objects.filter(name__in=names).values_list('name', flat=True))
+        Department.objects.bulk_create([
+            Department(name=name, director=f'Director {i}')
+            for i, name in enumerate(names) if name not in existing
+        ])
+        return list(Department.objects.filter(name__in=names).order_by('pk'))
+
+    def technicians(self, prefix, count):
+        usernames = [f'{prefix}_tecnico_{i}' for i in range(count)]
+        existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        password = make_password(None)
+        User.objects.bulk_create([
+            User(
+                username=username, password=password, is_staff=True,
+                first_name='Técnico', last_name=str(i),
+            )
+            for i, username in enumerate(usernames) if username not in existing
+        ])
+        return list(User.objects.filter(username__in=usernames).order_by('pk'))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from request import attachments
+
+
+class Command(BaseCommand):
+    """
+    Mantenimiento de los adjuntos: descarta las subidas abandonadas, borra
+    los contenidos que ya no usa ningún adjunto y genera las miniaturas que
+    quedaron pendientes (por ejemplo, si el proceso se reinició). Pensado
+    para ejecutarse periódicamente (cron).
+    """
+    help = 'Limpia subidas abandonadas y contenidos sin uso, y genera miniaturas pendientes.'
+
+    def handle(self, *args, **options):
+        result = attachments.sweep()
+        self.stdout.write(self.style.SUCCESS(
+            f"Subidas descartadas: {result['uploads']}. Contenidos borrados: {result['blobs']}. "
+            f"Miniaturas generadas: {result['thumbnails']}."
+        ))
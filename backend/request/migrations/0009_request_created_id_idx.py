@@ -0,0 +1,17 @@
+# Generated by Django 4.2.23 on 2026-10-17 18:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request', '0008_reportjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['created_at', 'id'], name='request_created_id_idx'),
+        ),
+    ]
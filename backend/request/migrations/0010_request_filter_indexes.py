@@ -0,0 +1,21 @@
+# Generated by Django 4.2.23 on 2026-10-17 18:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request', '0009_request_created_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['department', 'created_at'], name='request_dept_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['technician', 'created_at'], name='request_tech_created_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.contrib.postgres.indexes import BrinIndex
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class AddPostgresIndexConcurrently(AddIndexConcurrently):
+    """
+    Crea el índice sólo en PostgreSQL y sin bloquear la tabla. El índice no
+    forma parte del estado del modelo para que SQLite (desarrollo y pruebas)
+    no intente recrearlo al reconstruir la tabla.
+    """
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('request', '0010_request_filter_indexes'),
+    ]
+
+    operations = [
+        # Historial de solicitudes sólo crece: BRIN sobre created_at ocupa muy poco
+        AddPostgresIndexConcurrently(
+            model_name='request',
+            index=BrinIndex(fields=['created_at'], name='request_created_brin'),
+        ),
+    ]
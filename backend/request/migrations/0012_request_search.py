@@ -0,0 +1,71 @@
+from django.db import migrations
+
+POSTGRES_FORWARD = [
+    "ALTER TABLE request_request ADD COLUMN search_vector tsvector",
+    """
+    CREATE FUNCTION request_request_search_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('spanish', coalesce(NEW.subject, '')), 'A') ||
+            setweight(to_tsvector('spanish', coalesce(NEW.description, '')), 'B') ||
+            setweight(to_tsvector('spanish', coalesce(NEW.note, '')), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER request_request_search_trigger
+    BEFORE INSERT OR UPDATE OF subject, description, note ON request_request
+    FOR EACH ROW EXECUTE FUNCTION request_request_search_update()
+    """,
+    # Dispara el trigger para las solicitudes existentes
+    "UPDATE request_request SET subject = subject",
+    "CREATE INDEX request_search_gin ON request_request USING gin (search_vector)",
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS request_search_gin",
+    "DROP TRIGGER IF EXISTS request_request_search_trigger ON request_request",
+    "DROP FUNCTION IF EXISTS request_request_search_update()",
+    "ALTER TABLE request_request DROP COLUMN IF EXISTS search_vector",
+]
+
+# En SQLite el índice vive en una tabla FTS5 aparte, mantenida por señales
+# (los triggers se perderían cada vez que SQLite reconstruye la tabla).
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE request_request_fts USING fts5(
+        subject, description, note, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    INSERT INTO request_request_fts (rowid, subject, description, note)
+    SELECT id, subject, description, note FROM request_request
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TABLE IF EXISTS request_request_fts",
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        for sql in statements.get(vendor, []):
+            schema_editor.execute(sql)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request', '0011_request_created_at_brin'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}),
+            run({'postgresql': POSTGRES_BACKWARD, 'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.23 on 2026-10-17 18:26
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def backfill(apps, schema_editor):
+    Request = apps.get_model('request', 'Request')
+    RequestDailyStat = apps.get_model('request', 'RequestDailyStat')
+    rows = (
+        Request.objects
+        .annotate(day=TruncDate('created_at', tzinfo=timezone.get_current_timezone()))
+        .order_by()
+        .values('day', 'department_id', 'technician_id')
+        .annotate(total=Count('id'))
+    )
+    RequestDailyStat.objects.bulk_create(
+        [RequestDailyStat(**row) for row in rows.iterator()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('department', '0002_alter_department_director'),
+        ('request', '0012_request_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Día')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Solicitudes')),
+                ('department', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='department.department', verbose_name='Departamento')),
+                ('technician', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL, verbose_name='Técnico')),
+            ],
+            options={
+                'verbose_name': 'Estadística Diaria',
+                'verbose_name_plural': 'Estadísticas Diarias',
+                'ordering': ['day'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='requestdailystat',
+            constraint=models.UniqueConstraint(fields=('day', 'department', 'technician'), name='request_daily_stat_unique'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.23 on 2026-10-17 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request', '0013_requestdailystat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='request',
+            name='category',
+            field=models.CharField(choices=[('hardware', 'Hardware'), ('software', 'Software'), ('network', 'Redes'), ('other', 'Otra')], default='other', max_length=20, verbose_name='Categoría'),
+        ),
+        migrations.AddField(
+            model_name='request',
+            name='priority',
+            field=models.PositiveSmallIntegerField(choices=[(1, 'Baja'), (2, 'Media'), (3, 'Alta'), (4, 'Urgente')], default=2, verbose_name='Prioridad'),
+        ),
+        migrations.AddField(
+            model_name='request',
+            name='resolved_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Resolución'),
+        ),
+        migrations.AddField(
+            model_name='request',
+            name='status',
+            field=models.CharField(choices=[('open', 'Abierta'), ('in_progress', 'En proceso'), ('resolved', 'Resuelta'), ('closed', 'Cerrada')], default='open', max_length=20, verbose_name='Estado'),
+        ),
+        migrations.AddField(
+            model_name='request',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Última Modificación'),
+        ),
+        # Las solicitudes existentes no tienen historial de cambios
+        migrations.RunSQL(
+            'UPDATE request_request SET updated_at = created_at',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['updated_at', 'id'], name='request_updated_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(condition=models.Q(('status__in', ('open', 'in_progress'))), fields=['technician', '-priority', 'created_at', 'id'], name='request_open_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(condition=models.Q(('status__in', ('open', 'in_progress'))), fields=['status', 'department'], name='request_open_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(condition=models.Q(('resolved_at__isnull', False)), fields=['resolved_at', 'created_at'], name='request_resolved_idx'),
+        ),
+    ]
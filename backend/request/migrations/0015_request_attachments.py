@@ -0,0 +1,75 @@
+# Generated by Django 4.2.23 on 2026-10-17 19:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('request', '0014_request_status_priority_category'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttachmentBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Tamaño')),
+                ('content_type', models.CharField(max_length=100, verbose_name='Tipo de Contenido')),
+                ('thumbnail', models.CharField(choices=[('pending', 'Pendiente'), ('ready', 'Disponible'), ('unavailable', 'No disponible')], default='unavailable', max_length=12, verbose_name='Miniatura')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+            ],
+            options={
+                'verbose_name': 'Contenido de Adjunto',
+                'verbose_name_plural': 'Contenidos de Adjuntos',
+            },
+        ),
+        migrations.CreateModel(
+            name='RequestAttachment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=255, verbose_name='Nombre del Archivo')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('blob', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='attachments', to='request.attachmentblob', verbose_name='Contenido')),
+                ('request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to='request.request', verbose_name='Solicitud')),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attachments', to=settings.AUTH_USER_MODEL, verbose_name='Subido por')),
+            ],
+            options={
+                'verbose_name': 'Adjunto',
+                'verbose_name_plural': 'Adjuntos',
+                'ordering': ['created_at', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AttachmentUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=255, verbose_name='Nombre del Archivo')),
+                ('content_type', models.CharField(max_length=100, verbose_name='Tipo de Contenido')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Tamaño')),
+                ('sha256', models.CharField(blank=True, max_length=64, verbose_name='SHA-256 Esperado')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='Bytes Recibidos')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última Modificación')),
+                ('request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachment_uploads', to='request.request', verbose_name='Solicitud')),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='attachment_uploads', to=settings.AUTH_USER_MODEL, verbose_name='Subido por')),
+            ],
+            options={
+                'verbose_name': 'Subida de Adjunto',
+                'verbose_name_plural': 'Subidas de Adjuntos',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='attachmentblob',
+            index=models.Index(condition=models.Q(('thumbnail', 'pending')), fields=['created_at'], name='attachmentblob_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attachmentupload',
+            index=models.Index(fields=['updated_at'], name='attachmentupload_updated_idx'),
+        ),
+    ]
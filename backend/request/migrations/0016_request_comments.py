@@ -0,0 +1,64 @@
+# Generated by Django 4.2.23 on 2026-10-17 19:30
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('request', '0015_request_attachments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestComment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('body', models.TextField(verbose_name='Comentario')),
+                ('internal', models.BooleanField(default=False, verbose_name='Interno')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')),
+            ],
+            options={
+                'verbose_name': 'Comentario',
+                'verbose_name_plural': 'Comentarios',
+                'ordering': ['created_at', 'id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='request',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Comentarios'),
+        ),
+        migrations.AddField(
+            model_name='request',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Última Actividad'),
+        ),
+        # Sin comentarios previos, la última actividad es el último cambio
+        migrations.RunSQL(
+            'UPDATE request_request SET last_activity_at = updated_at',
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='request',
+            index=models.Index(fields=['last_activity_at', 'id'], name='request_activity_id_idx'),
+        ),
+        migrations.AddField(
+            model_name='requestcomment',
+            name='author',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='request_comments', to=settings.AUTH_USER_MODEL, verbose_name='Autor'),
+        ),
+        migrations.AddField(
+            model_name='requestcomment',
+            name='request',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='request.request', verbose_name='Solicitud'),
+        ),
+        migrations.AddIndex(
+            model_name='requestcomment',
+            index=models.Index(fields=['request', 'created_at', 'id'], name='comment_request_created_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.23 on 2026-10-17 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request', '0016_request_comments'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestDeletionMark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('deleted_at', models.DateTimeField(verbose_name='Última baja')),
+            ],
+            options={
+                'verbose_name': 'Marca de bajas',
+                'verbose_name_plural': 'Marcas de bajas',
+            },
+        ),
+    ]
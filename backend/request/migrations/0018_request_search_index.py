@@ -0,0 +1,25 @@
+# Generated by Django 4.2.23 on 2026-10-17 20:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('request', '0017_request_deletion_mark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestSearchIndex',
+            fields=[
+                ('request', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='request.request')),
+                ('document', models.TextField(db_column='request_request_fts')),
+            ],
+            options={
+                'db_table': 'request_request_fts',
+                'managed': False,
+            },
+        ),
+    ]
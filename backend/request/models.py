@@ -1,8 +1,51 @@
+import uuid
+
 from django.db import models
+from django.db.models import Subquery
+from django.utils import timezone
 from django.contrib.auth.models import User
 from department.models import Department
 
+# Estados de la cola de trabajo (índices parciales de Request)
+OPEN_STATUSES = ('open', 'in_progress')
+
+
 class Request(models.Model):
+    OPEN = 'open'
+    IN_PROGRESS = 'in_progress'
+    RESOLVED = 'resolved'
+    CLOSED = 'closed'
+    STATUS_CHOICES = [
+        (OPEN, 'Abierta'),
+        (IN_PROGRESS, 'En proceso'),
+        (RESOLVED, 'Resuelta'),
+        (CLOSED, 'Cerrada'),
+    ]
+    OPEN_STATUSES = OPEN_STATUSES
+
+    # Entero para ordenar la cola por prioridad
+    LOW = 1
+    MEDIUM = 2
+    HIGH = 3
+    URGENT = 4
+    PRIORITY_CHOICES = [
+        (LOW, 'Baja'),
+        (MEDIUM, 'Media'),
+        (HIGH, 'Alta'),
+        (URGENT, 'Urgente'),
+    ]
+
+    HARDWARE = 'hardware'
+    SOFTWARE = 'software'
+    NETWORK = 'network'
+    OTHER = 'other'
+    CATEGORY_CHOICES = [
+        (HARDWARE, 'Hardware'),
+        (SOFTWARE, 'Software'),
+        (NETWORK, 'Redes'),
+        (OTHER, 'Otra'),
+    ]
+
     subject = models.CharField(max_length=255, verbose_name='Asunto')
     description = models.TextField(verbose_name='Descripción')
     note = models.TextField(verbose_name='nota')
@@ -20,12 +63,331 @@ class Request(models.Model):
         related_name='assigned_requests',
         verbose_name='Técnico Asignado'
     )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=OPEN, verbose_name='Estado')
+    priority = models.PositiveSmallIntegerField(choices=PRIORITY_CHOICES, default=MEDIUM, verbose_name='Prioridad')
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, default=OTHER, verbose_name='Categoría')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
+    resolved_at = models.DateTimeField(null=True, blank=True, verbose_name='Fecha de Resolución')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Última Modificación')
+    # Desnormalizados: los mantienen las señales de RequestComment con F(),
+    # así el listado no cuenta ni ordena con agregados
+    comment_count = models.PositiveIntegerField(default=0, verbose_name='Comentarios')
+    last_activity_at = models.DateTimeField(default=timezone.now, verbose_name='Última Actividad')
     
     class Meta:
         verbose_name = 'Solicitud'
         verbose_name_plural = 'Solicitudes'
         ordering = ['-created_at']
+        indexes = [
+            # Paginación por cursor: ORDER BY created_at DESC, id DESC
+            models.Index(fields=['created_at', 'id'], name='request_created_id_idx'),
+            # Filtros e informes por departamento o técnico en un rango de fechas
+            models.Index(fields=['department', 'created_at'], name='request_dept_created_idx'),
+            models.Index(fields=['technician', 'created_at'], name='request_tech_created_idx'),
+            # ETag del listado (RequestViewSet.conditional_latest): la última
+            # solicitud modificada
+            models.Index(fields=['updated_at', 'id'], name='request_updated_id_idx'),
+            # ?ordering=-last_activity_at (actividad reciente)
+            models.Index(fields=['last_activity_at', 'id'], name='request_activity_id_idx'),
+            # Cola de trabajo de cada técnico. Parcial: sólo las abiertas, que
+            # son pocas frente al historial. Da las filas ya ordenadas (sin
+            # ordenar en memoria); las columnas se leen de la tabla, pero sólo
+            # las de las solicitudes abiertas del técnico
+            models.Index(
+                fields=['technician', '-priority', 'created_at', 'id'],
+                name='request_open_queue_idx',
+                condition=models.Q(status__in=OPEN_STATUSES),
+            ),
+            # Cantidad de abiertas por estado y departamento
+            models.Index(
+                fields=['status', 'department'],
+                name='request_open_status_idx',
+                condition=models.Q(status__in=OPEN_STATUSES),
+            ),
+            # Tiempo de resolución en un rango de fechas
+            models.Index(
+                fields=['resolved_at', 'created_at'],
+                name='request_resolved_idx',
+                condition=models.Q(resolved_at__isnull=False),
+            ),
+        ]
+
+    def __str__(self):
+        return self.subject
+
+    @property
+    def is_open(self):
+        return self.status in self.OPEN_STATUSES
+
+    def sync_resolved_at(self):
+        """
+        Fecha de resolución según el estado: se fija al resolver o cerrar y
+        se borra si la solicitud se reabre.
+        """
+        if self.is_open:
+            self.resolved_at = None
+        elif self.resolved_at is None:
+            self.resolved_at = timezone.now()
+
+
+class RequestDeletionMark(models.Model):
+    """
+    Fila única con la fecha de la última baja de solicitudes. Junto con la
+    solicitud modificada más recientemente forma la versión de las ETag del
+    listado: es estado de la base de datos, el mismo para todos los procesos.
+    """
+    deleted_at = models.DateTimeField(verbose_name='Última baja')
+
+    class Meta:
+        verbose_name = 'Marca de bajas'
+        verbose_name_plural = 'Marcas de bajas'
+
+    def __str__(self):
+        return f"Última baja: {self.deleted_at}"
+
+    @classmethod
+    def touch(cls):
+        cls.objects.update_or_create(pk=1, defaults={'deleted_at': timezone.now()})
+
+    @classmethod
+    def latest(cls):
+        """
+        Subconsulta con la fecha, para leerla en la misma consulta que la
+        última solicitud.
+        """
+        return Subquery(cls.objects.filter(pk=1).values('deleted_at')[:1])
+
+
+class RequestSearchIndex(models.Model):
+    """
+    Tabla virtual FTS5 de la búsqueda en SQLite (migración 0012, mantenida por
+    request.search). Sólo existe en SQLite; en PostgreSQL se busca por la
+    columna search_vector. ``document`` es la columna oculta con el nombre de
+    la tabla, la que reciben MATCH y bm25().
+    """
+    request = models.OneToOneField(
+        Request,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        related_name='search_index',
+    )
+    document = models.TextField(db_column='request_request_fts')
+
+    class Meta:
+        managed = False
+        db_table = 'request_request_fts'
+
+
+class RequestComment(models.Model):
+    request = models.ForeignKey(
+        Request,
+        on_delete=models.CASCADE,
+        related_name='comments',
+        verbose_name='Solicitud'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='request_comments',
+        verbose_name='Autor'
+    )
+    body = models.TextField(verbose_name='Comentario')
+    # Internos: sólo los ve el equipo de soporte
+    internal = models.BooleanField(default=False, verbose_name='Interno')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
+
+    class Meta:
+        verbose_name = 'Comentario'
+        verbose_name_plural = 'Comentarios'
+        ordering = ['created_at', 'id']
+        indexes = [
+            # Hilo de cada solicitud paginado por cursor
+            models.Index(fields=['request', 'created_at', 'id'], name='comment_request_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Comentario {self.pk} de la solicitud {self.request_id}"
+
+
+class ReportJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pendiente'),
+        (RUNNING, 'En proceso'),
+        (DONE, 'Completado'),
+        (FAILED, 'Fallido'),
+    ]
+
+    start_date = models.DateField(verbose_name='Fecha de Inicio')
+    end_date = models.DateField(verbose_name='Fecha de Fin')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, verbose_name='Estado')
+    result = models.FileField(upload_to='reports/', blank=True, verbose_name='Archivo')
+    error = models.TextField(blank=True, verbose_name='Error')
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='report_jobs',
+        verbose_name='Solicitado por'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='Fecha de Inicio del Proceso')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='Fecha de Finalización')
+
+    class Meta:
+        verbose_name = 'Informe en Cola'
+        verbose_name_plural = 'Informes en Cola'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='reportjob_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Informe {self.start_date} - {self.end_date} ({self.status})"
+
+
+class RequestDailyStat(models.Model):
+    day = models.DateField(verbose_name='Día')
+    department = models.ForeignKey(
+        Department,
+        on_delete=models.CASCADE,
+        related_name='daily_stats',
+        verbose_name='Departamento'
+    )
+    technician = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='daily_stats',
+        verbose_name='Técnico'
+    )
+    total = models.PositiveIntegerField(default=0, verbose_name='Solicitudes')
+
+    class Meta:
+        verbose_name = 'Estadística Diaria'
+        verbose_name_plural = 'Estadísticas Diarias'
+        ordering = ['day']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'department', 'technician'], name='request_daily_stat_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.department_id}/{self.technician_id}: {self.total}"
+
+
+class AttachmentBlob(models.Model):
+    """
+    Contenido de un adjunto, guardado una sola vez por hash SHA-256 en
+    ATTACHMENT_ROOT (request.attachments). Varios adjuntos pueden apuntar
+    al mismo archivo.
+    """
+    PENDING = 'pending'
+    READY = 'ready'
+    UNAVAILABLE = 'unavailable'
+    THUMBNAIL_CHOICES = [
+        (PENDING, 'Pendiente'),
+        (READY, 'Disponible'),
+        (UNAVAILABLE, 'No disponible'),
+    ]
+
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name='SHA-256')
+    size = models.PositiveBigIntegerField(verbose_name='Tamaño')
+    content_type = models.CharField(max_length=100, verbose_name='Tipo de Contenido')
+    thumbnail = models.CharField(
+        max_length=12, choices=THUMBNAIL_CHOICES, default=UNAVAILABLE, verbose_name='Miniatura'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
+
+    class Meta:
+        verbose_name = 'Contenido de Adjunto'
+        verbose_name_plural = 'Contenidos de Adjuntos'
+        indexes = [
+            # Miniaturas pendientes (sweep_attachments)
+            models.Index(
+                fields=['created_at'],
+                name='attachmentblob_pending_idx',
+                condition=models.Q(thumbnail='pending'),
+            ),
+        ]
+
+    def __str__(self):
+        return self.sha256
+
+
+class RequestAttachment(models.Model):
+    request = models.ForeignKey(
+        Request,
+        on_delete=models.CASCADE,
+        related_name='attachments',
+        verbose_name='Solicitud'
+    )
+    blob = models.ForeignKey(
+        AttachmentBlob,
+        on_delete=models.PROTECT,
+        related_name='attachments',
+        verbose_name='Contenido'
+    )
+    filename = models.CharField(max_length=255, verbose_name='Nombre del Archivo')
+    uploaded_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='attachments',
+        verbose_name='Subido por'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
+
+    class Meta:
+        verbose_name = 'Adjunto'
+        verbose_name_plural = 'Adjuntos'
+        ordering = ['created_at', 'id']
+
+    def __str__(self):
+        return self.filename
+
+
+class AttachmentUpload(models.Model):
+    """
+    Subida por partes en curso. Los bytes recibidos están en
+    ATTACHMENT_ROOT/uploads/<id>.part; ``offset`` es desde dónde se reanuda.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    request = models.ForeignKey(
+        Request,
+        on_delete=models.CASCADE,
+        related_name='attachment_uploads',
+        verbose_name='Solicitud'
+    )
+    filename = models.CharField(max_length=255, verbose_name='Nombre del Archivo')
+    content_type = models.CharField(max_length=100, verbose_name='Tipo de Contenido')
+    size = models.PositiveBigIntegerField(verbose_name='Tamaño')
+    sha256 = models.CharField(max_length=64, blank=True, verbose_name='SHA-256 Esperado')
+    offset = models.PositiveBigIntegerField(default=0, verbose_name='Bytes Recibidos')
+    uploaded_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='attachment_uploads',
+        verbose_name='Subido por'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Creación')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Última Modificación')
+
+    class Meta:
+        verbose_name = 'Subida de Adjunto'
+        verbose_name_plural = 'Subidas de Adjuntos'
+        indexes = [
+            models.Index(fields=['updated_at'], name='attachmentupload_updated_idx'),
+        ]
 
     def __str__(self):
-        return self.subject
\ No newline at end of file
+        return f"{self.filename} ({self.offset}/{self.size})"
@@ -0,0 +1,67 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+# Órdenes del listado de solicitudes (?ordering=), cada uno con su índice
+REQUEST_ORDERINGS = {
+    '-created_at': ('-created_at', '-id'),
+    '-last_activity_at': ('-last_activity_at', '-id'),
+}
+
+# Con ?q= (request.search) y sin ?ordering=, por relevancia
+SEARCH_ORDERING = ('-search_rank', '-created_at', '-id')
+
+
+# ?paginate=false: lista sin paginar para el panel actual del frontend, que
+# espera un array. Tiene como máximo REQUEST_LIST_UNPAGINATED_MAX solicitudes.
+UNPAGINATED_QUERY_PARAM = 'paginate'
+
+
+def request_ordering(params):
+    return REQUEST_ORDERINGS.get(params.get('ordering'), REQUEST_ORDERINGS['-created_at'])
+
+
+def unpaginated(params):
+    return params.get(UNPAGINATED_QUERY_PARAM) == 'false'
+
+
+class RequestCursorPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) ordenada por fecha de creación e id, o
+    por última actividad con ?ordering=-last_activity_at. Las búsquedas
+    (?q=) sin ?ordering= se paginan por relevancia.
+
+    Con ?paginate=false se devuelve un array con las primeras
+    REQUEST_LIST_UNPAGINATED_MAX solicitudes, sin cursores.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.unpaginated = unpaginated(request.query_params)
+        if self.unpaginated:
+            return list(queryset[:settings.REQUEST_LIST_UNPAGINATED_MAX])
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.unpaginated:
+            return Response(data)
+        return super().get_paginated_response(data)
+
+    def get_ordering(self, request, queryset, view):
+        if 'ordering' not in request.query_params and 'search_rank' in queryset.query.annotations:
+            return SEARCH_ORDERING
+        return request_ordering(request.query_params)
+
+
+class CommentCursorPagination(CursorPagination):
+    """
+    Hilo de comentarios de una solicitud, del más antiguo al más reciente.
+    Siempre paginado.
+    """
+    ordering = ('created_at', 'id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
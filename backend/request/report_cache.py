@@ -0,0 +1,129 @@
+import hashlib
+import os
+import secrets
+import tempfile
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from . import docx_templates
+from .models import Request
+
+def data_version(start, end):
+    """
+    Versión de los datos del rango: fecha de la última solicitud y cantidad.
+    """
+    summary = Request.objects.filter(created_at__range=(start, end)).aggregate(
+        last=Max('created_at'),
+        total=Count('id'),
+    )
+    last = summary['last'].isoformat() if summary['last'] else ''
+    return f"{last}:{summary['total']}"
+
+
+def report_key(start, end):
+    """
+    Clave del informe: plantilla + rango + versión de los datos.
+    """
+    parts = [docx_templates.template_hash(docx_templates.REPORT_TEMPLATE), start.isoformat(), end.isoformat(), data_version(start, end)]
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()
+
+
+def _cache_dir():
+    return settings.REPORT_CACHE_DIR
+
+
+def _entry_prefix(key, start, end):
+    # El rango va en el nombre para poder invalidar sin índice aparte
+    return f"{timezone.localtime(start):%Y%m%d}_{timezone.localtime(end):%Y%m%d}_{key}_"
+
+
+def _entries():
+    try:
+        with os.scandir(_cache_dir()) as it:
+            return [entry for entry in it if entry.is_file() and entry.name.endswith('.docx')]
+    except FileNotFoundError:
+        return []
+
+
+def get(key, start, end):
+    """
+    Devuelve (ruta, etag) del informe en caché o None. Actualiza la fecha de
+    acceso (LRU).
+
+    El ETag incluye un identificador propio de cada archivo generado: si la
+    entrada se invalida y se vuelve a generar, el ETag cambia aunque la clave
+    sea la misma.
+    """
+    prefix = _entry_prefix(key, start, end)
+    for entry in _entries():
+        if entry.name.startswith(prefix):
+            try:
+                os.utime(entry.path)
+            except FileNotFoundError:
+                return None
+            return entry.path, f"{key}-{entry.name[len(prefix):-len('.docx')]}"
+    return None
+
+
+def put(key, start, end, content):
+    """
+    Guarda el informe de forma atómica, aplica los límites de la caché y
+    devuelve (ruta, etag).
+    """
+    os.makedirs(_cache_dir(), exist_ok=True)
+    nonce = secrets.token_hex(4)
+    path = os.path.join(_cache_dir(), f"{_entry_prefix(key, start, end)}{nonce}.docx")
+    fd, tmp_path = tempfile.mkstemp(dir=_cache_dir(), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    evict()
+    return path, f"{key}-{nonce}"
+
+
+def evict():
+    """
+    Elimina los informes menos usados hasta respetar el número máximo de
+    entradas y el tamaño total permitido.
+    """
+    entries = []
+    for entry in _entries():
+        try:
+            stat = entry.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, entry.path))
+    entries.sort()
+
+    total_size = sum(size for _, size, _ in entries)
+    count = len(entries)
+    for _, size, path in entries:
+        if count <= settings.REPORT_CACHE_MAX_ENTRIES and total_size <= settings.REPORT_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        count -= 1
+        total_size -= size
+
+
+def invalidate(*moments):
+    """
+    Elimina los informes cuyo rango incluye alguno de los ``moments``; sin
+    argumentos, vacía la caché.
+    """
+    days = {timezone.localtime(moment).strftime('%Y%m%d') for moment in moments}
+    for entry in _entries():
+        start, end = entry.name.split('_', 2)[:2]
+        if not moments or any(start <= day <= end for day in days):
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,79 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import Request
+from .signals import requests_bulk_changed
+
+
+@contextmanager
+def explicit_created_at():
+    """
+    Desactiva temporalmente auto_now_add en Request.created_at para poder
+    insertar solicitudes con fechas en el pasado.
+    """
+    field = Request._meta.get_field('created_at')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def build_requests(count, departments, technicians, days=365, seed=None):
+    """
+    Genera ``count`` solicitudes sin guardar, repartidas entre los
+    departamentos y técnicos dados y en los últimos ``days`` días.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    span = days * 24 * 60 * 60
+    statuses = [value for value, _ in Request.STATUS_CHOICES]
+    priorities = [value for value, _ in Request.PRIORITY_CHOICES]
+    categories = [value for value, _ in Request.CATEGORY_CHOICES]
+    for i in range(count):
+        created_at = now - timedelta(seconds=rng.randrange(span))
+        # La mayoría ya resueltas o cerradas, como en producción
+        status = rng.choices(statuses, weights=(1, 1, 4, 4))[0]
+        resolved_at = None
+        if status not in Request.OPEN_STATUSES:
+            resolved_at = min(now, created_at + timedelta(seconds=rng.randrange(1, 5 * 24 * 60 * 60)))
+        yield Request(
+            subject=f'Solicitud de prueba {i}',
+            description='Descripción generada para pruebas de rendimiento.',
+            note='Nota generada.',
+            department=rng.choice(departments),
+            technician=rng.choice(technicians),
+            status=status,
+            priority=rng.choice(priorities),
+            category=rng.choice(categories),
+            created_at=created_at,
+            resolved_at=resolved_at,
+            last_activity_at=resolved_at or created_at,
+        )
+
+
+def insert_requests(count, departments, technicians, days=365, batch_size=5000, seed=None, notify=False):
+    """
+    Inserta ``count`` solicitudes con bulk_create en lotes. Con ``notify``
+    cada lote envía requests_bulk_changed como request.bulk (acumulados,
+    índice de búsqueda y cachés al día).
+    """
+    rows = build_requests(count, departments, technicians, days=days, seed=seed)
+
+    def insert(batch):
+        Request.objects.bulk_create(batch)
+        if notify:
+            requests_bulk_changed.send(sender=Request, created=batch)
+
+    with explicit_created_at():
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                insert(batch)
+                batch = []
+        if batch:
+            insert(batch)
@@ -0,0 +1,102 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connection
+from django.db.models import F, FloatField, Func, Lookup, Value
+from django.db.models.expressions import RawSQL
+
+from .models import RequestSearchIndex
+
+FTS_TABLE = RequestSearchIndex._meta.db_table
+
+# Pesos de asunto, descripción y nota para bm25 en SQLite (A, B, C en PostgreSQL)
+FTS_WEIGHTS = (10.0, 4.0, 1.0)
+
+
+def search_requests(queryset, q):
+    """
+    Filtra las solicitudes por texto en asunto, descripción y nota, y las
+    ordena por relevancia (anotada como ``search_rank``).
+
+    En PostgreSQL usa la columna tsvector indexada con GIN (configuración
+    'spanish'); en SQLite, la tabla virtual FTS5.
+    """
+    if connection.vendor == 'postgresql':
+        return _search_postgresql(queryset, q)
+    return _search_sqlite(queryset, q)
+
+
+def _search_postgresql(queryset, q):
+    table = queryset.model._meta.db_table
+    vector = RawSQL(f'"{table}"."search_vector"', [], output_field=SearchVectorField())
+    query = SearchQuery(q, config='spanish', search_type='websearch')
+    return (
+        queryset
+        .alias(search_vector=vector)
+        .filter(search_vector=query)
+        .annotate(search_rank=SearchRank(vector, query))
+        .order_by('-search_rank', '-created_at', '-id')
+    )
+
+
+def fts_query(q):
+    # Cada palabra se busca como prefijo y todas deben aparecer; las comillas
+    # evitan que la sintaxis de FTS5 (OR, NEAR, "-"...) llegue desde el usuario.
+    words = re.findall(r'\w+', q)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+class Match(Lookup):
+    """
+    ``document__match``: la consulta FTS5 sobre la columna oculta de la tabla.
+    """
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+RequestSearchIndex._meta.get_field('document').register_lookup(Match)
+
+
+def _search_sqlite(queryset, q):
+    # Un INNER JOIN con la tabla FTS5: SQLite ejecuta el MATCH una sola vez y
+    # busca cada solicitud por su id. Con bm25 en una subconsulta por fila el
+    # costo crecía con el cuadrado de los resultados.
+    match = fts_query(q)
+    if not match:
+        return queryset.none()
+    rank = Func(
+        F('search_index__document'), *(Value(weight) for weight in FTS_WEIGHTS),
+        function='bm25', template='-%(function)s(%(expressions)s)', output_field=FloatField(),
+    )
+    return (
+        queryset
+        .filter(search_index__document__match=match)
+        .annotate(search_rank=rank)
+        .order_by('-search_rank', '-created_at', '-id')
+    )
+
+
+def index_requests(requests):
+    """
+    Actualiza el índice FTS5 de SQLite. En PostgreSQL lo hace el trigger.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    rows = [(r.pk, r.subject, r.description, r.note) for r in requests]
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, subject, description, note) VALUES (%s, %s, %s, %s)',
+            rows,
+        )
+
+
+def unindex_requests(ids):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(pk,) for pk in ids])
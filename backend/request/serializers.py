@@ -1,10 +1,50 @@
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Request
+from department.lookups import department_names
+from department.models import Department
+from user.lookups import technician_names
+from .models import AttachmentUpload, Request, ReportJob, RequestAttachment, RequestComment
+from .single_reports import SINGLE_REPORTS_MAX_ITEMS
+
+class SparseFieldsetMixin:
+    """
+    Permite pedir sólo algunos campos con ``?fields=id,subject,...`` en las
+    lecturas. Las escrituras siempre usan todos los campos.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = requested_fields(self.context.get('request'))
+        if requested:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+
+def requested_fields(request):
+    """
+    Campos de ``?fields=`` o None. Acepta la petición de DRF o la de Django
+    (vistas async).
+    """
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None
+    fields = getattr(request, 'query_params', request.GET).get('fields')
+    if not fields:
+        return None
+    return {name.strip() for name in fields.split(',') if name.strip()}
+
 
-class RequestSerializer(serializers.ModelSerializer):
-    department_name = serializers.CharField(source='department.name', read_only=True)
+class RequestSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # Los nombres salen de la caché de consultas, sin JOIN por fila
+    department_name = serializers.SerializerMethodField()
     # technician_username = serializers.CharField(source='technician.username', read_only=True)
     technician_full_name = serializers.SerializerMethodField()
+
+    # Diccionarios de nombres leídos una vez por respuesta
+    _department_names = None
+    _technician_names = None
         
     class Meta:
         model = Request
@@ -17,16 +57,285 @@ class RequestSerializer(serializers.ModelSerializer):
             'department_name',
             'technician',
             'technician_full_name',
-            'created_at'
+            'status',
+            'priority',
+            'category',
+            'created_at',
+            'updated_at',
+            'resolved_at',
+            'comment_count',
+            'last_activity_at',
         ]
         read_only_fields = [
             'id',
             'created_at',
+            'updated_at',
+            'resolved_at',
+            'comment_count',
+            'last_activity_at',
             'department_name',
             'technician_full_name'
         ]
+        # Sin técnico, RequestViewSet asigna el de menor carga (request.assignment)
+        extra_kwargs = {'technician': {'required': False}}
         
+    def get_department_name(self, obj):
+        if self._department_names is None or obj.department_id not in self._department_names:
+            self._department_names = department_names(require=obj.department_id)
+        return self._department_names.get(obj.department_id)
+
     def get_technician_full_name(self, obj):
-        if obj.technician:
-            return f"{obj.technician.first_name} {obj.technician.last_name}".strip()
-        return None 
\ No newline at end of file
+        if obj.technician_id is None:
+            return None
+        if self._technician_names is None or obj.technician_id not in self._technician_names:
+            self._technician_names = technician_names(require=obj.technician_id)
+        return self._technician_names.get(obj.technician_id)
+
+class RequestCommentSerializer(serializers.ModelSerializer):
+    author_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RequestComment
+        fields = [
+            'id',
+            'request',
+            'author',
+            'author_name',
+            'body',
+            'internal',
+            'created_at',
+        ]
+        read_only_fields = ['id', 'request', 'author', 'author_name', 'created_at']
+
+    def get_author_name(self, obj):
+        if obj.author is None:
+            return None
+        return f"{obj.author.first_name} {obj.author.last_name}".strip() or obj.author.username
+
+    def validate_internal(self, value):
+        request = self.context.get('request')
+        if value and not (request and request.user.is_staff):
+            raise serializers.ValidationError("Sólo el equipo de soporte puede escribir comentarios internos.")
+        return value
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        fields = [
+            'id',
+            'start_date',
+            'end_date',
+            'status',
+            'error',
+            'created_at',
+            'started_at',
+            'finished_at',
+            'download_url',
+        ]
+        read_only_fields = [
+            'id',
+            'status',
+            'error',
+            'created_at',
+            'started_at',
+            'finished_at',
+            'download_url',
+        ]
+
+    def validate(self, data):
+        if data['start_date'] > data['end_date']:
+            raise serializers.ValidationError("La fecha de inicio no puede ser posterior a la fecha de fin.")
+        return data
+
+    def get_download_url(self, obj):
+        if obj.status != ReportJob.DONE:
+            return None
+        url = reverse('request-report-job-download', kwargs={'job_id': obj.pk})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+
+class BulkRequestListSerializer(serializers.ListSerializer):
+    """
+    Valida una lista de solicitudes resolviendo todos los departamentos,
+    técnicos (y solicitudes, al actualizar) con una consulta in_bulk por
+    modelo. Los errores se devuelven por elemento, en el mismo orden. Al
+    actualizar, cada solicitud puede aparecer una sola vez.
+    """
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise serializers.ValidationError("Se esperaba una lista de solicitudes.")
+        if not data:
+            raise serializers.ValidationError("La lista de solicitudes está vacía.")
+        if self.max_length is not None and len(data) > self.max_length:
+            raise serializers.ValidationError(f"Se permiten como máximo {self.max_length} solicitudes por petición.")
+
+        validated, errors = [], []
+        for item in data:
+            try:
+                validated.append(self.child.run_validation(item))
+                errors.append({})
+            except serializers.ValidationError as exc:
+                validated.append(None)
+                errors.append(exc.detail)
+
+        departments = Department.objects.in_bulk({item['department'] for item in validated if item and 'department' in item})
+        technicians = User.objects.in_bulk({item['technician'] for item in validated if item and 'technician' in item})
+        existing = {}
+        seen = set()
+        if self.partial:
+            existing = Request.objects.in_bulk({item['id'] for item in validated if item and 'id' in item})
+
+        for index, item in enumerate(validated):
+            if item is None:
+                continue
+            item_errors = errors[index]
+            if 'department' in item:
+                item['department'] = departments.get(item['department'])
+                if item['department'] is None:
+                    item_errors['department'] = ["El departamento no existe."]
+            if 'technician' in item:
+                item['technician'] = technicians.get(item['technician'])
+                if item['technician'] is None:
+                    item_errors['technician'] = ["El técnico no existe."]
+            if self.partial:
+                item['instance'] = existing.get(item.get('id'))
+                if item['instance'] is None:
+                    item_errors['id'] = ["La solicitud no existe."]
+                elif item['id'] in seen:
+                    item_errors['id'] = ["La solicitud aparece más de una vez en la lista."]
+                seen.add(item['id'])
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return validated
+
+
+class BulkRequestSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+    # Los ids se resuelven en bloque en BulkRequestListSerializer
+    department = serializers.IntegerField()
+    # Opcional al crear: se asigna por carga de trabajo
+    technician = serializers.IntegerField(required=False)
+
+    class Meta:
+        model = Request
+        fields = [
+            'id',
+            'subject',
+            'description',
+            'note',
+            'department',
+            'technician',
+            'status',
+            'priority',
+            'category',
+        ]
+        list_serializer_class = BulkRequestListSerializer
+
+    def validate(self, data):
+        if self.parent.partial:
+            if 'id' not in data:
+                raise serializers.ValidationError({'id': ["El id es obligatorio para actualizar."]})
+        elif 'id' in data:
+            raise serializers.ValidationError({'id': ["El id lo asigna el sistema; no se indica al crear."]})
+        return data
+
+
+class BulkDeleteSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=10000)
+
+
+class SingleReportsSerializer(serializers.Serializer):
+    OUTPUT_CHOICES = ('merged', 'zip')
+
+    ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, max_length=SINGLE_REPORTS_MAX_ITEMS)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    output = serializers.ChoiceField(choices=OUTPUT_CHOICES, default='zip')
+
+    def validate(self, data):
+        if 'ids' not in data and not ('start_date' in data and 'end_date' in data):
+            raise serializers.ValidationError("Indica una lista de ids o un rango con start_date y end_date.")
+        if 'ids' not in data and data['start_date'] > data['end_date']:
+            raise serializers.ValidationError("La fecha de inicio no puede ser posterior a la fecha de fin.")
+        return data
+
+
+class RequestAttachmentSerializer(serializers.ModelSerializer):
+    size = serializers.IntegerField(source='blob.size', read_only=True)
+    content_type = serializers.CharField(source='blob.content_type', read_only=True)
+    sha256 = serializers.CharField(source='blob.sha256', read_only=True)
+    download_url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RequestAttachment
+        fields = [
+            'id',
+            'request',
+            'filename',
+            'size',
+            'content_type',
+            'sha256',
+            'uploaded_by',
+            'created_at',
+            'download_url',
+            'thumbnail_url',
+        ]
+        read_only_fields = fields
+
+    def _url(self, name, obj):
+        url = reverse(name, args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
+    def get_download_url(self, obj):
+        return self._url('attachment-download', obj)
+
+    def get_thumbnail_url(self, obj):
+        if obj.blob.thumbnail != obj.blob.READY:
+            return None
+        return self._url('attachment-thumbnail', obj)
+
+
+class AttachmentUploadSerializer(serializers.ModelSerializer):
+    sha256 = serializers.RegexField(r'^[0-9a-fA-F]{64}$', required=False, allow_blank=True)
+    content_type = serializers.CharField(max_length=100, required=False, allow_blank=True)
+
+    class Meta:
+        model = AttachmentUpload
+        fields = [
+            'id',
+            'request',
+            'filename',
+            'content_type',
+            'size',
+            'sha256',
+            'offset',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = ['id', 'offset', 'created_at', 'updated_at']
+
+    def validate_filename(self, value):
+        # Sólo el nombre: el cliente puede mandar la ruta completa
+        name = os.path.basename(value.replace('\\', '/')).strip()
+        if not name:
+            raise serializers.ValidationError("El nombre del archivo no es válido.")
+        return name
+
+    def validate_size(self, value):
+        if value < 1:
+            raise serializers.ValidationError("El archivo está vacío.")
+        if value > settings.ATTACHMENT_MAX_BYTES:
+            raise serializers.ValidationError(
+                f"El archivo supera el máximo de {settings.ATTACHMENT_MAX_BYTES} bytes."
+            )
+        return value
+
+    def validate_sha256(self, value):
+        return value.lower()
@@ -0,0 +1,265 @@
+import os
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver, Signal
+from django.utils import timezone
+
+from department.models import Department
+from . import attachments, events, report_cache, search, stats
+from .assignment import workload
+from .models import AttachmentUpload, Request, RequestComment, RequestDeletionMark
+
+# Enviada por las operaciones masivas (request.bulk), que no disparan
+# post_save/post_delete por cada solicitud. Argumentos: created, updated,
+# previous ({pk: solicitud antes del cambio}) y deleted.
+requests_bulk_changed = Signal()
+
+_bulk_operation = ContextVar('request_bulk_operation', default=False)
+
+
+@contextmanager
+def bulk_operation():
+    """
+    Silencia los receptores por solicitud mientras una operación masiva
+    (que luego envía requests_bulk_changed) borra filas con QuerySet.delete().
+    """
+    token = _bulk_operation.set(True)
+    try:
+        yield
+    finally:
+        _bulk_operation.reset(token)
+
+
+@receiver([post_save, post_delete], sender=Request)
+def invalidate_report_cache(sender, instance, **kwargs):
+    if _bulk_operation.get():
+        return
+    report_cache.invalidate(instance.created_at)
+
+
+@receiver(post_delete, sender=Request)
+def mark_deletion(sender, instance, **kwargs):
+    # Las ETag del listado (RequestViewSet) leen esta fecha
+    if _bulk_operation.get():
+        return
+    RequestDeletionMark.touch()
+
+
+@receiver([post_save, post_delete], sender=Department)
+def clear_report_cache(sender, instance, **kwargs):
+    # Los departamentos aparecen en el gráfico de todos los informes
+    report_cache.invalidate()
+
+
+@receiver(post_save, sender=Request)
+def index_request(sender, instance, **kwargs):
+    search.index_requests([instance])
+
+
+@receiver(post_delete, sender=Request)
+def unindex_request(sender, instance, **kwargs):
+    if _bulk_operation.get():
+        return
+    search.unindex_requests([instance.pk])
+
+
+@receiver(post_delete, sender=AttachmentUpload)
+def remove_upload_file(sender, instance, **kwargs):
+    # Subidas completadas, descartadas o borradas junto con su solicitud
+    try:
+        os.remove(attachments.upload_path(instance.pk))
+    except FileNotFoundError:
+        pass
+
+
+@receiver(pre_save, sender=Request)
+def stamp_resolved_at(sender, instance, **kwargs):
+    instance.sync_resolved_at()
+
+
+@receiver(pre_save, sender=Request)
+def stamp_last_activity(sender, instance, **kwargs):
+    if instance.pk:
+        instance.last_activity_at = timezone.now()
+
+
+@receiver(post_save, sender=RequestComment)
+def count_comment(sender, instance, created, **kwargs):
+    if not created:
+        return
+    # UPDATE atómico: comentarios simultáneos no se pisan el contador
+    # updated_at: el contador aparece en el listado y su ETag sale de ahí
+    Request.objects.filter(pk=instance.request_id).update(
+        comment_count=F('comment_count') + 1,
+        last_activity_at=instance.created_at,
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(post_delete, sender=RequestComment)
+def discount_comment(sender, instance, origin=None, **kwargs):
+    # Borrados en cascada con su solicitud: no hay contador que corregir
+    if isinstance(origin, Request) or getattr(origin, 'model', None) is Request:
+        return
+    Request.objects.filter(pk=instance.request_id).update(
+        comment_count=F('comment_count') - 1,
+        updated_at=timezone.now(),
+    )
+
+
+@receiver(pre_save, sender=Request)
+def remember_stat_key(sender, instance, **kwargs):
+    # Clave anterior del acumulado diario, para moverlo si cambia el
+    # departamento o el técnico
+    instance._previous_stat_key = None
+    instance._previous_workload = None
+    if instance.pk:
+        previous = (
+            Request.objects.filter(pk=instance.pk)
+            .values_list('created_at', 'department_id', 'technician_id', 'status')
+            .first()
+        )
+        if previous:
+            instance._previous_stat_key = stats.stat_key(*previous[:3])
+            # Técnico y si contaba como abierta, para la carga de trabajo
+            instance._previous_workload = (previous[2], previous[3] in Request.OPEN_STATUSES)
+
+
+@receiver(post_save, sender=Request)
+def update_daily_stats(sender, instance, created, **kwargs):
+    changes = Counter()
+    previous = getattr(instance, '_previous_stat_key', None)
+    if previous:
+        changes[previous] -= 1
+    changes[stats.request_key(instance)] += 1
+    stats.apply(changes)
+
+
+@receiver(post_delete, sender=Request)
+def discount_daily_stats(sender, instance, **kwargs):
+    if _bulk_operation.get():
+        return
+    stats.apply(Counter({stats.request_key(instance): -1}))
+
+
+@receiver(requests_bulk_changed, sender=Request)
+def sync_bulk_changes(sender, created=(), updated=(), previous=None, deleted=(), **kwargs):
+    previous = previous or {}
+    changes = Counter()
+    moments = []
+    for request in created:
+        changes[stats.request_key(request)] += 1
+        moments.append(request.created_at)
+    for request in updated:
+        old = previous.get(request.pk)
+        if old is not None:
+            changes[stats.request_key(old)] -= 1
+        changes[stats.request_key(request)] += 1
+        moments.append(request.created_at)
+    for request in deleted:
+        changes[stats.request_key(request)] -= 1
+        moments.append(request.created_at)
+
+    stats.apply(changes)
+    search.index_requests([*created, *updated])
+    search.unindex_requests([request.pk for request in deleted])
+    if moments:
+        report_cache.invalidate(*moments)
+    if deleted:
+        RequestDeletionMark.touch()
+
+
+def _workload_changes(previous, current):
+    # previous/current: (técnico, abierta) antes y después del cambio
+    changes = Counter()
+    if previous and previous[1]:
+        changes[previous[0]] -= 1
+    if current and current[1]:
+        changes[current[0]] += 1
+    return changes
+
+
+def _apply_workload(changes, departments=None):
+    departments = departments or {}
+    for technician_id, delta in changes.items():
+        if delta:
+            workload.add(technician_id, delta, departments.get(technician_id))
+
+
+@receiver(post_save, sender=Request)
+def update_workload(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_workload', None)
+    changes = _workload_changes(previous, (instance.technician_id, instance.is_open))
+    _apply_workload(changes, {instance.technician_id: instance.department_id})
+
+
+@receiver(post_delete, sender=Request)
+def discount_workload(sender, instance, **kwargs):
+    if _bulk_operation.get():
+        return
+    if instance.is_open:
+        workload.add(instance.technician_id, -1)
+
+
+@receiver(requests_bulk_changed, sender=Request)
+def sync_bulk_workload(sender, created=(), updated=(), previous=None, deleted=(), **kwargs):
+    previous = previous or {}
+    changes = Counter()
+    for request in created:
+        changes.update(_workload_changes(None, (request.technician_id, request.is_open)))
+    for request in updated:
+        old = previous.get(request.pk)
+        changes.update(_workload_changes(
+            (old.technician_id, old.is_open) if old is not None else None,
+            (request.technician_id, request.is_open),
+        ))
+    for request in deleted:
+        changes.update(_workload_changes((request.technician_id, request.is_open), None))
+    _apply_workload(changes, {request.technician_id: request.department_id for request in created})
+
+
+# Con más cambios que esto en una operación masiva se envía un solo RESET
+BULK_EVENTS_LIMIT = 100
+
+
+def _publish(*events_to_send):
+    # Sólo se avisa a los clientes cuando el cambio ya está confirmado
+    def send():
+        for event in events_to_send:
+            events.publish(event)
+    transaction.on_commit(send)
+
+
+@receiver(post_save, sender=Request)
+def publish_saved_request(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_stat_key', None)
+    previous = previous[1:] if previous else None
+    _publish(events.request_event('created' if created else 'updated', instance, previous))
+
+
+@receiver(post_delete, sender=Request)
+def publish_deleted_request(sender, instance, **kwargs):
+    if _bulk_operation.get():
+        return
+    _publish(events.request_event('deleted', instance))
+
+
+@receiver(requests_bulk_changed, sender=Request)
+def publish_bulk_changes(sender, created=(), updated=(), previous=None, deleted=(), **kwargs):
+    if len(created) + len(updated) + len(deleted) > BULK_EVENTS_LIMIT:
+        _publish(events.RESET)
+        return
+    previous = previous or {}
+    _publish(
+        *(events.request_event('created', request) for request in created),
+        *(
+            events.request_event('updated', request, stats.request_key(previous[request.pk])[1:] if request.pk in previous else None)
+            for request in updated
+        ),
+        *(events.request_event('deleted', request) for request in deleted),
+    )
@@ -0,0 +1,102 @@
+import io
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from docx import Document
+from docxcompose.composer import Composer
+
+from . import docx_templates
+from .dates import spanish_date
+from .exports import stream_zip
+from .models import Request
+
+# Límite de solicitudes por lote
+SINGLE_REPORTS_MAX_ITEMS = 1000
+
+
+def single_report_context(report_request):
+    """
+    Contexto de la plantilla formato_informe2.docx para una solicitud.
+    """
+    return {
+        'request': {
+            'id': report_request.id,
+            'subject': report_request.subject,
+            'description': report_request.description,
+            'note': report_request.note,
+            'created_at': spanish_date(report_request.created_at),
+            'depardepartment_director': report_request.department.director,
+            'department_name': report_request.department.name if report_request.department else 'N/A',
+            'technician_full_name': f"{report_request.technician.first_name} {report_request.technician.last_name}".strip() if report_request.technician else 'N/A',
+        }
+    }
+
+
+def single_reports_requests(ids=None, start=None, end=None, limit=None):
+    """
+    Solicitudes del lote en una sola consulta con departamento y técnico.
+    Con ``ids`` se respeta el orden recibido y se omiten los que no existen.
+    Con un rango se devuelven como mucho ``limit`` solicitudes.
+    """
+    queryset = Request.objects.select_related('department', 'technician')
+    if ids:
+        found = queryset.in_bulk(ids)
+        return [found[pk] for pk in dict.fromkeys(ids) if pk in found]
+    return list(queryset.filter(created_at__range=(start, end)).order_by('created_at', 'id')[:limit])
+
+
+def render_single_report(context, template=docx_templates.SINGLE_REPORT_TEMPLATE):
+    """
+    Renderiza una solicitud y devuelve el .docx en bytes.
+    """
+    doc = docx_templates.load(template)
+    doc.render(context)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def render_single_reports(contexts, template=None, workers=None):
+    """
+    Genera los documentos en un pool de hilos, en el mismo orden que
+    ``contexts``. Como mucho hay 2 * workers documentos en memoria a la vez.
+    """
+    template = template or docx_templates.SINGLE_REPORT_TEMPLATE
+    workers = workers or settings.SINGLE_REPORT_WORKERS
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for context in contexts:
+            pending.append(pool.submit(render_single_report, context, template))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def merge_single_reports(documents):
+    """
+    Une los documentos en un solo .docx, cada solicitud en una página nueva.
+    """
+    documents = iter(documents)
+    composer = Composer(Document(io.BytesIO(next(documents))))
+    for content in documents:
+        composer.doc.add_page_break()
+        composer.append(Document(io.BytesIO(content)))
+    buffer = io.BytesIO()
+    composer.save(buffer)
+    return buffer.getvalue()
+
+
+def zip_single_reports(requests, contexts, template=None, workers=None):
+    """
+    ZIP en streaming con un .docx por solicitud. Los .docx ya están
+    comprimidos, así que se guardan sin volver a comprimir.
+    """
+    documents = render_single_reports(contexts, template=template, workers=workers)
+    files = (
+        (f"informe_solicitud_{report_request.id}.docx", [content])
+        for report_request, content in zip(requests, documents)
+    )
+    return stream_zip(files, compression=zipfile.ZIP_STORED)
@@ -0,0 +1,148 @@
+import asyncio
+import itertools
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+
+from user.authentication import CachedTokenAuthentication
+from .events import get_broker
+
+EVENTS_PATH = '/api/requests/events/'
+
+
+def _ids(values):
+    ids = set()
+    for value in values:
+        for part in value.split(','):
+            if part.strip().isdigit():
+                ids.add(int(part))
+    return ids
+
+
+def _origin_headers(scope):
+    # EventSource desde el frontend: el CORS de Django no pasa por aquí
+    origin = dict(scope['headers']).get(b'origin', b'').decode()
+    if origin and origin in settings.CORS_ALLOWED_ORIGINS:
+        return [(b'access-control-allow-origin', origin.encode()), (b'vary', b'Origin')]
+    return []
+
+
+def _authenticate(scope, query):
+    """
+    Token por ?token= (EventSource no permite enviar cabeceras) o por la
+    cabecera Authorization. Sólo el personal (técnicos) recibe eventos.
+    """
+    key = (query.get('token') or [''])[0]
+    header = dict(scope['headers']).get(b'authorization', b'').decode()
+    if not key and header.startswith('Token '):
+        key = header[len('Token '):].strip()
+    if not key:
+        return None, 401
+    try:
+        user, _ = CachedTokenAuthentication().authenticate_credentials(key)
+    except AuthenticationFailed:
+        return None, 401
+    if not user.is_staff:
+        return user, 403
+    return user, 200
+
+
+def format_event(event, event_id):
+    data = json.dumps(event, ensure_ascii=False)
+    return f"id: {event_id}\nevent: {event['type']}\ndata: {data}\n\n".encode()
+
+
+async def _send_error(send, scope, status, message):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), *_origin_headers(scope)],
+    })
+    await send({'type': 'http.response.body', 'body': json.dumps({'detail': message}).encode()})
+
+
+async def _wait_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+async def request_events(scope, receive, send):
+    """
+    Server-sent events con las altas, cambios y bajas de solicitudes.
+    Filtros opcionales: ?department=1,2 y ?technician=3. Cada
+    REQUEST_EVENTS_HEARTBEAT segundos se envía un comentario para mantener
+    viva la conexión a través de proxies.
+    """
+    if scope['method'] != 'GET':
+        await _send_error(send, scope, 405, 'Método no permitido.')
+        return
+
+    query = parse_qs(scope.get('query_string', b'').decode())
+    user, status = await sync_to_async(_authenticate)(scope, query)
+    if status == 401:
+        await _send_error(send, scope, 401, 'Token inválido o ausente.')
+        return
+    if status == 403:
+        await _send_error(send, scope, 403, 'No tienes permisos para recibir eventos.')
+        return
+
+    broker = get_broker()
+    subscription = broker.subscribe(
+        departments=_ids(query.get('department', [])),
+        technicians=_ids(query.get('technician', [])),
+    )
+    disconnected = asyncio.ensure_future(_wait_disconnect(receive))
+    next_event = None
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                # nginx no debe acumular la respuesta
+                (b'x-accel-buffering', b'no'),
+                *_origin_headers(scope),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': b'retry: 5000\n\n', 'more_body': True})
+
+        event_ids = itertools.count(1)
+        while not disconnected.done():
+            next_event = asyncio.ensure_future(subscription.queue.get())
+            await asyncio.wait(
+                {next_event, disconnected},
+                timeout=settings.REQUEST_EVENTS_HEARTBEAT,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if next_event.done():
+                body = format_event(next_event.result(), next(event_ids))
+            else:
+                # Cancelar Queue.get no pierde eventos: siguen en la cola
+                next_event.cancel()
+                body = b': ping\n\n'
+            if not disconnected.done():
+                await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+    finally:
+        broker.unsubscribe(subscription)
+        disconnected.cancel()
+        if next_event is not None:
+            next_event.cancel()
+
+
+def with_request_events(application):
+    """
+    Envuelve la aplicación ASGI de Django: EVENTS_PATH lo atiende
+    request_events y el resto sigue a Django.
+    """
+    async def router(scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] == EVENTS_PATH:
+            await request_events(scope, receive, send)
+        else:
+            await application(scope, receive, send)
+    return router
@@ -0,0 +1,179 @@
+from datetime import datetime, time
+
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.timezone import make_aware
+
+from .models import Request, RequestDailyStat
+
+
+def stat_key(created_at, department_id, technician_id):
+    return (timezone.localtime(created_at).date(), department_id, technician_id)
+
+
+def request_key(request):
+    return stat_key(request.created_at, request.department_id, request.technician_id)
+
+
+def apply(changes):
+    """
+    Aplica a los acumulados diarios un Counter {(día, departamento, técnico): delta}.
+    """
+    for (day, department_id, technician_id), delta in changes.items():
+        if delta == 0:
+            continue
+        rows = RequestDailyStat.objects.filter(day=day, department_id=department_id, technician_id=technician_id)
+        if rows.update(total=F('total') + delta):
+            if delta < 0:
+                rows.filter(total__lte=0).delete()
+            continue
+        if delta < 0:
+            continue
+        try:
+            with transaction.atomic():
+                RequestDailyStat.objects.create(
+                    day=day, department_id=department_id, technician_id=technician_id, total=delta,
+                )
+        except IntegrityError:
+            # Otro proceso creó la fila al mismo tiempo
+            rows.update(total=F('total') + delta)
+
+
+def rebuild(start=None, end=None):
+    """
+    Recalcula los acumulados (de todo el historial o de un rango de días) con
+    un único GROUP BY sobre las solicitudes. Devuelve la cantidad de filas.
+    """
+    requests = Request.objects.all()
+    stats = RequestDailyStat.objects.all()
+    if start:
+        requests = requests.filter(created_at__gte=make_aware(datetime.combine(start, time.min)))
+        stats = stats.filter(day__gte=start)
+    if end:
+        requests = requests.filter(created_at__lte=make_aware(datetime.combine(end, time.max)))
+        stats = stats.filter(day__lte=end)
+
+    rows = (
+        requests
+        .annotate(day=TruncDate('created_at', tzinfo=timezone.get_current_timezone()))
+        .order_by()
+        .values('day', 'department_id', 'technician_id')
+        .annotate(total=Count('id'))
+    )
+    with transaction.atomic():
+        stats.delete()
+        created = RequestDailyStat.objects.bulk_create(
+            [RequestDailyStat(**row) for row in rows.iterator()],
+            batch_size=1000,
+        )
+    return len(created)
+
+
+def _summary_queries(start, end):
+    stats = RequestDailyStat.objects.filter(day__range=(start, end)).order_by()
+    by_department = (
+        stats.values('department', name=F('department__name'))
+        .annotate(total=Sum('total'))
+        .order_by('name')
+    )
+    by_technician = (
+        stats.values(
+            'technician',
+            first_name=F('technician__first_name'),
+            last_name=F('technician__last_name'),
+        )
+        .annotate(total=Sum('total'))
+        .order_by('-total', 'technician')
+    )
+    by_day = stats.values('day').annotate(total=Sum('total')).order_by('day')
+    return stats, by_department, by_technician, by_day
+
+
+def _summary(start, end, total, by_department, by_technician, by_day):
+    return {
+        'start_date': start,
+        'end_date': end,
+        'total': total or 0,
+        'by_department': [
+            {'department': row['department'], 'department_name': row['name'], 'total': row['total']}
+            for row in by_department
+        ],
+        'by_technician': [
+            {
+                'technician': row['technician'],
+                'technician_full_name': f"{row['first_name']} {row['last_name']}".strip(),
+                'total': row['total'],
+            }
+            for row in by_technician
+        ],
+        'by_day': list(by_day),
+    }
+
+
+def summary(start, end):
+    """
+    Métricas del rango calculadas sólo con los acumulados diarios.
+    """
+    stats, by_department, by_technician, by_day = _summary_queries(start, end)
+    return _summary(
+        start, end, stats.aggregate(total=Sum('total'))['total'],
+        by_department, by_technician, by_day,
+    )
+
+
+async def asummary(start, end):
+    """
+    Versión async de summary (mismas consultas con el ORM async).
+    """
+    stats, by_department, by_technician, by_day = _summary_queries(start, end)
+    return _summary(
+        start, end, (await stats.aaggregate(total=Sum('total')))['total'],
+        [row async for row in by_department],
+        [row async for row in by_technician],
+        [row async for row in by_day],
+    )
+
+
+def open_counts():
+    """
+    Solicitudes abiertas y en proceso, por estado (índice parcial
+    request_open_status_idx).
+    """
+    rows = (
+        Request.objects.filter(status__in=Request.OPEN_STATUSES)
+        .values('status')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    by_status = dict.fromkeys(Request.OPEN_STATUSES, 0)
+    by_status.update((row['status'], row['total']) for row in rows)
+    return {'total': sum(by_status.values()), 'by_status': by_status}
+
+
+def resolution_summary(start, end):
+    """
+    Solicitudes resueltas en el rango y tiempo promedio de resolución en
+    horas, con un solo agregado (índice parcial request_resolved_idx).
+    """
+    summary = (
+        Request.objects
+        .filter(
+            resolved_at__gte=make_aware(datetime.combine(start, time.min)),
+            resolved_at__lte=make_aware(datetime.combine(end, time.max)),
+        )
+        .aggregate(
+            resolved=Count('id'),
+            average=Avg(
+                ExpressionWrapper(F('resolved_at') - F('created_at'), output_field=DurationField())
+            ),
+        )
+    )
+    average = summary['average']
+    return {
+        'start_date': start,
+        'end_date': end,
+        'resolved': summary['resolved'],
+        'average_resolution_hours': round(average.total_seconds() / 3600, 2) if average is not None else None,
+    }
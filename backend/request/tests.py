@@ -1,3 +1,1283 @@
-from django.test import TestCase
+import asyncio
+import hashlib
+import io
+import json
+import locale
+import os
+import shutil
+import tempfile
+import tracemalloc
+import zipfile
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from PIL import Image
+
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count, Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.cache import cache_stats, clear_lookup_caches
+from department.lookups import department_names
+from department.models import Department
+from user.lookups import technician_names
+from .jobs import claim_next_job, run_report_job
+from .models import (
+    AttachmentBlob, AttachmentUpload, Request, ReportJob, RequestAttachment, RequestComment, RequestDailyStat,
+    RequestDeletionMark,
+)
+from . import assignment, attachments, charts, docx_templates, report_cache, stats
+from .dates import spanish_date, spanish_range
+from .reports import iter_report_items, department_counts
+from .sample_data import insert_requests
+from .events import Subscription, get_broker
+from .pagination import RequestCursorPagination
+from .search import search_requests
+from .sse import EVENTS_PATH, request_events
+from .serializers import RequestSerializer
+
+
+class RequestTestMixin:
+    @classmethod
+    def setUpTestData(cls):
+        cls.sistemas = Department.objects.create(name='Sistemas', director='Ana Pérez')
+        cls.compras = Department.objects.create(name='Compras', director='Luis Gómez')
+        cls.rrhh = Department.objects.create(name='RRHH', director='Marta Díaz')
+        cls.technician = User.objects.create_user(
+            username='tecnico', password='clave-segura-123',
+            first_name='José', last_name='Rodríguez', is_staff=True,
+        )
+        cls.warm_lookup_caches()
+
+    @staticmethod
+    def warm_lookup_caches():
+        # La caché de consultas es del proceso: se reinicia y se precarga
+        # como la tendría un servidor en marcha
+        clear_lookup_caches()
+        department_names()
+        technician_names()
+
+    def use_temp_dir(self, setting):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        override = override_settings(**{setting: path})
+        override.enable()
+        self.addCleanup(override.disable)
+        return path
+
+    def create_requests(self, count, department=None):
+        Request.objects.bulk_create([
+            Request(
+                subject=f'Solicitud {i}',
+                description='Equipo sin conexión',
+                note='Revisado',
+                department=department or self.sistemas,
+                technician=self.technician,
+            )
+            for i in range(count)
+        ])
+
+
+class ReportQueryTests(RequestTestMixin, TestCase):
+    def setUp(self):
+        self.use_temp_dir('REPORT_CACHE_DIR')
+        today = timezone.localdate().isoformat()
+        self.params = {'start_date': today, 'end_date': today}
+
+    def report_query_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('request-generate-report'), self.params)
+            b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_report_query_count_does_not_grow_with_rows(self):
+        self.create_requests(2)
+        few = self.report_query_count()
+        self.create_requests(40, department=self.compras)
+        many = self.report_query_count()
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, 3)
+
+    def test_report_items_and_counts(self):
+        self.create_requests(3)
+        self.create_requests(1, department=self.compras)
+        start = timezone.now() - timedelta(days=1)
+        end = timezone.now() + timedelta(days=1)
+
+        with self.assertNumQueries(1):
+            items = list(iter_report_items(start, end))
+        self.assertEqual(len(items), 4)
+        self.assertEqual(items[0]['technician_full_name'], 'José Rodríguez')
+
+        with self.assertNumQueries(1):
+            counts = department_counts(start, end)
+        self.assertEqual(counts, [('Compras', 1), ('RRHH', 0), ('Sistemas', 3)])
+
+
+class ReportJobTests(RequestTestMixin, TestCase):
+    def setUp(self):
+        self.use_temp_dir('MEDIA_ROOT')
+        self.today = timezone.localdate().isoformat()
+
+    def test_queue_and_download_report(self):
+        self.create_requests(3)
+        response = self.client.post(
+            reverse('request-report-jobs'),
+            {'start_date': self.today, 'end_date': self.today},
+        )
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data['id']
+        self.assertEqual(response.data['status'], ReportJob.PENDING)
+
+        download_url = reverse('request-report-job-download', kwargs={'job_id': job_id})
+        self.assertEqual(self.client.get(download_url).status_code, 409)
+
+        self.assertEqual(claim_next_job(), job_id)
+        self.assertIsNone(claim_next_job())
+        self.assertEqual(run_report_job(job_id), ReportJob.DONE)
+
+        response = self.client.get(reverse('request-report-job', kwargs={'job_id': job_id}))
+        self.assertEqual(response.data['status'], ReportJob.DONE)
+        self.assertTrue(response.data['download_url'].endswith(download_url))
+
+        response = self.client.get(download_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'PK'))
+
+    def test_rejects_inverted_range(self):
+        response = self.client.post(
+            reverse('request-report-jobs'),
+            {'start_date': '2025-07-02', 'end_date': '2025-07-01'},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ReportJob.objects.exists())
+
+    def test_fails_jobs_left_running_by_a_dead_worker(self):
+        now = timezone.now()
+        stale = ReportJob.objects.create(
+            start_date=self.today, end_date=self.today, status=ReportJob.RUNNING,
+            started_at=now - timedelta(minutes=31),
+        )
+        recent = ReportJob.objects.create(
+            start_date=self.today, end_date=self.today, status=ReportJob.RUNNING,
+            started_at=now - timedelta(minutes=5),
+        )
+        with override_settings(REPORT_JOB_TIMEOUT_MINUTES=30):
+            self.assertIsNone(claim_next_job())
+
+        response = self.client.get(reverse('request-report-job', kwargs={'job_id': stale.pk}))
+        self.assertEqual(response.data['status'], ReportJob.FAILED)
+        stale.refresh_from_db()
+        self.assertTrue(stale.error)
+        self.assertIsNotNone(stale.finished_at)
+        recent.refresh_from_db()
+        self.assertEqual(recent.status, ReportJob.RUNNING)
+
+
+class ReportCacheTests(RequestTestMixin, TestCase):
+    def setUp(self):
+        self.cache_dir = self.use_temp_dir('REPORT_CACHE_DIR')
+        today = timezone.localdate().isoformat()
+        self.url = reverse('request-generate-report')
+        self.params = {'start_date': today, 'end_date': today}
+
+    def get_report(self, **headers):
+        response = self.client.get(self.url, self.params, headers=headers)
+        if response.status_code == 200:
+            b''.join(response.streaming_content)
+        return response
+
+    def test_serves_cached_report_with_etag(self):
+        self.create_requests(2)
+        first = self.get_report()
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+
+        with patch('request.views.render_report') as render:
+            second = self.get_report()
+            not_modified = self.get_report(if_none_match=etag)
+        render.assert_not_called()
+        self.assertEqual(second['ETag'], etag)
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_request_changes_invalidate_report(self):
+        self.create_requests(1)
+        etag = self.get_report()['ETag']
+
+        request = Request.objects.get()
+        request.note = 'Cambio de nota'
+        request.save()
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+        response = self.get_report(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_regenerates_report_evicted_before_opening(self):
+        self.create_requests(1)
+        etag = self.get_report()['ETag']
+        evicted = os.path.join(self.cache_dir, 'expulsado.docx')
+
+        with patch('request.views.report_cache.get', return_value=(evicted, etag.strip('"'))):
+            response = self.client.get(self.url, self.params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'PK'))
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_evicts_least_recently_used(self):
+        start, end = timezone.now(), timezone.now()
+        with override_settings(REPORT_CACHE_MAX_ENTRIES=2):
+            for key in ('a', 'b', 'c'):
+                report_cache.put(key, start, end, b'docx')
+                os.utime(report_cache.get(key, start, end)[0], (0, {'a': 1, 'b': 3, 'c': 2}[key]))
+        self.assertIsNone(report_cache.get('a', start, end))
+        self.assertIsNotNone(report_cache.get('b', start, end))
+        self.assertIsNotNone(report_cache.get('c', start, end))
+
+
+class DepartmentChartTests(TestCase):
+    def test_renders_png_and_memoizes_by_counts(self):
+        counts = [('Compras', 1), ('Sistemas', 3)]
+        png = charts.department_chart(counts, dpi=50)
+        self.assertTrue(png.startswith(b'\x89PNG'))
+        self.assertIs(charts.department_chart(list(counts), dpi=50), png)
+        self.assertIsNot(charts.department_chart([('Compras', 2), ('Sistemas', 3)], dpi=50), png)
+
+
+class RequestListTests(RequestTestMixin, TestCase):
+    url = reverse('request-list')
+
+    def test_list_is_paginated_by_default(self):
+        self.create_requests(3)
+        data = self.client.get(self.url).json()
+        self.assertEqual(len(data['results']), 3)
+        self.assertIsNone(data['next'])
+
+    def test_unpaginated_flag_returns_a_capped_array(self):
+        self.create_requests(3)
+        with override_settings(REQUEST_LIST_UNPAGINATED_MAX=2):
+            data = self.client.get(self.url, {'paginate': 'false'}).json()
+            async_data = async_to_sync(self.async_client.get)(reverse('async-request-list'), {'paginate': 'false'}).json()
+        self.assertEqual(len(data), 2)
+        self.assertEqual(async_data, data)
+
+    def test_cursor_pagination_walks_every_row_once(self):
+        self.create_requests(7)
+        seen = []
+        url = f'{self.url}?page_size=3'
+        while url:
+            # versión para la ETag + la página
+            with self.assertNumQueries(2):
+                data = self.client.get(url).json()
+            seen.extend(item['id'] for item in data['results'])
+            url = data['next']
+        self.assertEqual(seen, list(Request.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+
+    def test_sparse_fieldset_skips_text_columns(self):
+        self.create_requests(2)
+        with CaptureQueriesContext(connection) as ctx:
+            data = self.client.get(self.url, {'fields': 'id,subject,department_name'}).json()
+        self.assertEqual(set(data['results'][0]), {'id', 'subject', 'department_name'})
+        self.assertEqual(len(ctx.captured_queries), 2)
+        self.assertNotIn('"description"', ctx.captured_queries[-1]['sql'])
+
+    def test_first_page_is_bounded_as_table_grows(self):
+        # El tiempo se mide en benchmarks/: aquí, que la página no crece
+        # con la tabla (mismas consultas y un LIMIT fijo)
+        for rows in (60, 600):
+            self.create_requests(rows - Request.objects.count())
+            with CaptureQueriesContext(connection) as ctx:
+                data = self.client.get(self.url, {'fields': 'id,subject,created_at'}).json()
+            self.assertEqual(len(data['results']), RequestCursorPagination.page_size)
+            self.assertEqual(len(ctx.captured_queries), 2)
+            self.assertIn(f'LIMIT {RequestCursorPagination.page_size + 1}', ctx.captured_queries[-1]['sql'])
+
+
+class RequestStatusTests(RequestTestMixin, TestCase):
+    def create(self, **extra):
+        return Request.objects.create(
+            subject='Impresora', description='Sin papel', note='Revisado',
+            department=self.sistemas, technician=self.technician, **extra,
+        )
+
+    def test_resolved_at_follows_status(self):
+        request = self.create()
+        self.assertEqual((request.status, request.priority, request.resolved_at), ('open', Request.MEDIUM, None))
+
+        request.status = Request.RESOLVED
+        request.save()
+        resolved_at = request.resolved_at
+        self.assertIsNotNone(resolved_at)
+
+        # Cerrar una resuelta conserva la fecha; reabrir la borra
+        request.status = Request.CLOSED
+        request.save()
+        self.assertEqual(request.resolved_at, resolved_at)
+        request.status = Request.IN_PROGRESS
+        request.save()
+        self.assertIsNone(request.resolved_at)
+
+    def test_bulk_update_stamps_resolved_at(self):
+        request = self.create()
+        response = self.client.patch(
+            reverse('request-bulk'), [{'id': request.pk, 'status': 'resolved'}], content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.json()[0]['resolved_at'])
+        request.refresh_from_db()
+        self.assertGreater(request.updated_at, request.created_at)
+
+    def test_filters(self):
+        self.create(priority=Request.URGENT, category=Request.NETWORK)
+        self.create(status=Request.IN_PROGRESS, category=Request.HARDWARE)
+        self.create(status=Request.CLOSED)
+        url = reverse('request-list')
+
+        def total(**params):
+            return len(self.client.get(url, params).json()['results'])
+
+        self.assertEqual(total(open='true'), 2)
+        self.assertEqual(total(open='false'), 1)
+        self.assertEqual(total(status='open,closed'), 2)
+        self.assertEqual(total(priority='3,4'), 1)
+        self.assertEqual(total(category='network', technician=self.technician.pk), 1)
+
+    def test_metrics_use_aggregates(self):
+        now = timezone.now()
+        self.create()
+        self.create(status=Request.IN_PROGRESS)
+        for hours in (2, 4):
+            request = self.create(status=Request.RESOLVED)
+            Request.objects.filter(pk=request.pk).update(created_at=now - timedelta(hours=hours), resolved_at=now)
+
+        # abiertas por estado + resueltas y promedio
+        with self.assertNumQueries(2):
+            data = self.client.get(reverse('request-metrics')).json()
+        self.assertEqual(data['open'], {'total': 2, 'by_status': {'open': 1, 'in_progress': 1}})
+        self.assertEqual(data['resolution']['resolved'], 2)
+        self.assertEqual(data['resolution']['average_resolution_hours'], 3.0)
+
+        old = (now - timedelta(days=90)).date().isoformat()
+        data = self.client.get(reverse('request-metrics'), {'start_date': old, 'end_date': old}).json()
+        self.assertEqual((data['resolution']['resolved'], data['resolution']['average_resolution_hours']), (0, None))
+        response = self.client.get(reverse('request-metrics'), {'start_date': 'ayer'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_queue_orders_by_priority_then_age(self):
+        low = self.create(priority=Request.LOW)
+        urgent = self.create(priority=Request.URGENT)
+        older = self.create(priority=Request.HIGH)
+        newer = self.create(priority=Request.HIGH)
+        self.create(priority=Request.URGENT, status=Request.RESOLVED)
+        Request.objects.filter(pk=older.pk).update(created_at=timezone.now() - timedelta(days=1))
+
+        url = reverse('request-queue')
+        data = self.client.get(url, {'technician': self.technician.pk}).json()
+        self.assertEqual([item['id'] for item in data], [urgent.pk, older.pk, newer.pk, low.pk])
+
+        self.assertEqual(self.client.get(url).status_code, 400)
+        self.client.force_login(self.technician)
+        self.assertEqual(len(self.client.get(url).json()), 4)
+
+
+class CommentTests(RequestTestMixin, TestCase):
+    def setUp(self):
+        self.create_requests(2)
+        self.older, self.newer = Request.objects.order_by('created_at', 'id')
+        Request.objects.filter(pk=self.older.pk).update(
+            created_at=timezone.now() - timedelta(days=3), last_activity_at=timezone.now() - timedelta(days=3),
+        )
+        self.employee = User.objects.create_user(username='empleado', password='clave-segura-123')
+        self.url = reverse('request-comments', args=[self.older.pk])
+
+    def comment(self, user, body, internal=False):
+        self.client.force_login(user)
+        return self.client.post(self.url, {'body': body, 'internal': internal}, content_type='application/json')
+
+    def test_internal_comments_are_staff_only(self):
+        self.assertEqual(self.comment(self.technician, 'Cambiar el tóner', internal=True).status_code, 201)
+        self.assertEqual(self.comment(self.employee, '¿Hay novedades?').status_code, 201)
+        self.assertEqual(self.comment(self.employee, 'Interno', internal=True).status_code, 400)
+
+        self.client.force_login(self.employee)
+        self.assertEqual([c['body'] for c in self.client.get(self.url).json()['results']], ['¿Hay novedades?'])
+        self.client.force_login(self.technician)
+        data = self.client.get(self.url, {'page_size': 1}).json()
+        self.assertEqual(data['results'][0]['author_name'], 'José Rodríguez')
+        self.assertEqual(self.client.get(data['next']).json()['results'][0]['author_name'], 'empleado')
+
+    def test_counters_are_denormalized(self):
+        for i in range(3):
+            self.comment(self.technician, f'Avance {i}')
+        last = RequestComment.objects.latest('created_at', 'id')
+        self.older.refresh_from_db()
+        self.assertEqual((self.older.comment_count, self.older.last_activity_at), (3, last.created_at))
+
+        response = self.client.delete(reverse('request-comment', args=[self.older.pk, last.pk]))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(Request.objects.get(pk=self.older.pk).comment_count, 2)
+        self.client.force_login(self.employee)
+        first = RequestComment.objects.earliest('created_at', 'id')
+        self.assertEqual(self.client.delete(reverse('request-comment', args=[self.older.pk, first.pk])).status_code, 403)
+
+        # El listado lee los contadores sin agregar: mismas consultas que antes
+        self.client.logout()
+        self.warm_lookup_caches()
+        with self.assertNumQueries(2):
+            data = self.client.get(reverse('request-list'), {'page_size': 10}).json()
+        self.assertEqual({item['id']: item['comment_count'] for item in data['results']}, {self.older.pk: 2, self.newer.pk: 0})
+
+        self.older.delete()
+        self.assertFalse(RequestComment.objects.exists())
+
+    def test_ordering_by_last_activity(self):
+        url = reverse('request-list')
+        params = {'ordering': '-last_activity_at'}
+        self.assertEqual([item['id'] for item in self.client.get(url, params).json()['results']], [self.newer.pk, self.older.pk])
+
+        self.comment(self.technician, 'Retomada')
+        self.assertEqual([item['id'] for item in self.client.get(url, params).json()['results']], [self.older.pk, self.newer.pk])
+        data = self.client.get(url, {**params, 'page_size': 1}).json()
+        self.assertEqual(data['results'][0]['id'], self.older.pk)
+        self.assertEqual(self.client.get(data['next']).json()['results'][0]['id'], self.newer.pk)
+        self.assertEqual(self.client.get(url, {'ordering': 'subject'}).status_code, 400)
+
+
+@override_settings(ATTACHMENT_THUMBNAIL_WORKERS=0, ATTACHMENT_CHUNK_MAX_BYTES=1024)
+class AttachmentTests(RequestTestMixin, TestCase):
+    uploads_url = reverse('attachment-upload-list')
+
+    def setUp(self):
+        self.root = self.use_temp_dir('ATTACHMENT_ROOT')
+        self.request = Request.objects.create(
+            subject='Pantalla azul', description='Ver captura', note='',
+            department=self.sistemas, technician=self.technician,
+        )
+        self.client.force_login(self.technician)
+
+    def start(self, content, filename='registro.log', **extra):
+        data = {'request': self.request.pk, 'filename': filename, 'size': len(content), **extra}
+        return self.client.post(self.uploads_url, data, content_type='application/json')
+
+    def send(self, upload_id, content, start, end=None):
+        end = len(content) - 1 if end is None else end
+        return self.client.generic(
+            'PATCH', reverse('attachment-upload-detail', args=[upload_id]), content[start:end + 1],
+            content_type='application/offset+octet-stream',
+            headers={'content-range': f'bytes {start}-{end}/{len(content)}'},
+        )
+
+    def upload(self, content, filename='registro.log'):
+        upload = self.start(content, filename).json()['upload']
+        for start in range(0, len(content), 1024):
+            response = self.send(upload['id'], content, start, min(start + 1023, len(content) - 1))
+        self.assertEqual(response.status_code, 201)
+        return response.json()['attachment']
+
+    def test_chunked_upload_resumes_from_offset(self):
+        content = os.urandom(1500)
+        upload_id = self.start(content, sha256=hashlib.sha256(content).hexdigest()).json()['upload']['id']
+
+        self.assertEqual(self.send(upload_id, content, 0, 999).json()['upload']['offset'], 1000)
+        # Reintento de una parte ya recibida: el servidor indica dónde seguir
+        response = self.send(upload_id, content, 0, 499)
+        self.assertEqual((response.status_code, response.json()['offset']), (409, 1000))
+        self.assertEqual(self.send(upload_id, content, 1000, 1499).status_code, 201)
+
+        attachment = RequestAttachment.objects.get()
+        self.assertEqual(attachment.blob.sha256, hashlib.sha256(content).hexdigest())
+        with open(attachments.blob_path(attachment.blob.sha256), 'rb') as f:
+            self.assertEqual(f.read(), content)
+        self.assertFalse(AttachmentUpload.objects.exists())
+        self.assertEqual(os.listdir(os.path.join(self.root, 'uploads')), [])
+
+    def test_oversized_chunk_and_hash_mismatch_are_rejected(self):
+        content = os.urandom(1500)
+        upload_id = self.start(content, sha256='0' * 64).json()['upload']['id']
+        self.assertEqual(self.send(upload_id, content, 0).status_code, 413)
+        self.send(upload_id, content, 0, 999)
+        response = self.send(upload_id, content, 1000)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(AttachmentUpload.objects.exists())
+        self.assertFalse(AttachmentBlob.objects.exists())
+
+    def test_duplicates_are_stored_once(self):
+        content = b'Traceback (most recent call last)\n' * 20
+        first = self.upload(content)
+        second = self.upload(content, filename='otra_vez.log')
+        # Con el hash declarado ni siquiera se sube
+        response = self.start(content, filename='copia.log', sha256=hashlib.sha256(content).hexdigest())
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(response.json()['upload'])
+
+        self.assertEqual(RequestAttachment.objects.count(), 3)
+        self.assertEqual(AttachmentBlob.objects.count(), 1)
+        self.assertEqual(first['sha256'], second['sha256'])
+        self.assertEqual(response.json()['attachment']['filename'], 'copia.log')
+
+    def test_download_supports_ranges(self):
+        content = bytes(range(256)) * 4
+        url = self.upload(content)['download_url']
+
+        response = self.client.get(url)
+        self.assertEqual((response.status_code, response['Accept-Ranges']), (200, 'bytes'))
+        self.assertEqual(b''.join(response.streaming_content), content)
+        self.assertIn('attachment; filename="registro.log"', response['Content-Disposition'])
+
+        response = self.client.get(url, headers={'range': 'bytes=10-19'})
+        self.assertEqual((response.status_code, response['Content-Range']), (206, 'bytes 10-19/1024'))
+        self.assertEqual(b''.join(response.streaming_content), content[10:20])
+        response = self.client.get(url, headers={'range': 'bytes=-4'})
+        self.assertEqual(b''.join(response.streaming_content), content[-4:])
+        self.assertEqual(self.client.get(url, headers={'range': 'bytes=2000-'}).status_code, 416)
+
+        etag = response['ETag']
+        self.assertEqual(self.client.get(url, headers={'if-none-match': etag}).status_code, 304)
+        # If-Range con otra versión: archivo completo
+        response = self.client.get(url, headers={'range': 'bytes=0-9', 'if-range': '"otra"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_thumbnails_and_sweep(self):
+        buffer = io.BytesIO()
+        Image.new('RGB', (1200, 800), 'steelblue').save(buffer, 'PNG')
+        with self.captureOnCommitCallbacks(execute=True):
+            attachment = self.upload(buffer.getvalue(), filename='captura.png')
+        self.assertIsNone(attachment['thumbnail_url'])
+        self.upload(b'sin miniatura', filename='nota.txt')
+        stale = self.start(b'abandonada', filename='a_medias.log').json()['upload']['id']
+        AttachmentUpload.objects.filter(pk=stale).update(updated_at=timezone.now() - timedelta(days=2))
+        AttachmentBlob.objects.update(created_at=timezone.now() - timedelta(days=2))
+        self.client.delete(reverse('attachment-detail', args=[RequestAttachment.objects.get(filename='nota.txt').pk]))
+
+        out = io.StringIO()
+        call_command('sweep_attachments', stdout=out)
+        self.assertIn('Subidas descartadas: 1. Contenidos borrados: 1. Miniaturas generadas: 1.', out.getvalue())
+        self.assertFalse(os.path.exists(attachments.upload_path(stale)))
+
+        data = self.client.get(reverse('attachment-list'), {'request': self.request.pk}).json()
+        self.assertEqual([item['filename'] for item in data], ['captura.png'])
+        response = self.client.get(data[0]['thumbnail_url'])
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        with Image.open(io.BytesIO(b''.join(response.streaming_content))) as thumbnail:
+            self.assertEqual(thumbnail.size, (320, 213))
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        self.assertEqual(self.start(b'x').status_code, 401)
+
+
+class QueryPlanTests(TestCase):
+    def test_filter_and_report_queries_use_indexes(self):
+        out = io.StringIO()
+        call_command('explain_request_queries', rows=3000, stdout=out)
+        self.assertNotIn('[SCAN]', out.getvalue())
+        self.assertIn('[OK] búsqueda de texto:', out.getvalue())
+        self.assertEqual(Request.objects.count(), 0)
+
+
+class SeedBenchmarkDataTests(TestCase):
+    def test_seeds_in_bulk_and_keeps_derived_data_in_sync(self):
+        clear_lookup_caches()
+        self.addCleanup(clear_lookup_caches)
+        technician_names()
+        call_command('seed_benchmark_data', departments=3, technicians=2, requests=40, batch_size=15, stdout=io.StringIO())
+        call_command('seed_benchmark_data', departments=3, technicians=2, requests=10, stdout=io.StringIO())
+
+        self.assertEqual(Department.objects.filter(name__startswith='bench ').count(), 3)
+        self.assertEqual(User.objects.filter(username__startswith='bench_', is_staff=True).count(), 2)
+        self.assertEqual(Request.objects.count(), 50)
+        self.assertEqual(RequestDailyStat.objects.aggregate(total=Sum('total'))['total'], 50)
+        self.assertEqual(search_requests(Request.objects.all(), 'solicitud').count(), 50)
+        self.assertIn('Técnico 1', technician_names().values())
+
+
+class RequestSearchTests(RequestTestMixin, TestCase):
+    def create_request(self, subject, description='Sin detalles', note=''):
+        return Request.objects.create(
+            subject=subject, description=description, note=note,
+            department=self.sistemas, technician=self.technician,
+        )
+
+    def search(self, q):
+        return [r.subject for r in search_requests(Request.objects.all(), q)]
+
+    def test_ranks_subject_matches_first(self):
+        self.create_request('Cambio de tóner', note='La impresora del pasillo')
+        self.create_request('Impresora atascada')
+        self.create_request('Sin internet', description='El router no enciende')
+        self.assertEqual(self.search('impresora'), ['Impresora atascada', 'Cambio de tóner'])
+        self.assertEqual(self.search('toner'), ['Cambio de tóner'])
+        self.assertEqual(self.search('"OR" -'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        request = self.create_request('Monitor dañado')
+        request.subject = 'Teclado dañado'
+        request.save()
+        self.assertEqual(self.search('monitor'), [])
+        self.assertEqual(self.search('teclado'), ['Teclado dañado'])
+        request.delete()
+        self.assertEqual(self.search('teclado'), [])
+
+    def test_list_endpoint_accepts_q(self):
+        self.create_request('Correo sin sincronizar')
+        self.create_request('Silla rota')
+        data = self.client.get(reverse('request-list'), {'q': 'correo'}).json()
+        self.assertEqual([item['subject'] for item in data['results']], ['Correo sin sincronizar'])
+
+    def test_match_runs_once_and_pages_keep_relevance(self):
+        # La menos relevante es la más reciente: el orden por fecha sería otro
+        self.create_request('Impresora sin red', description='La impresora no imprime')
+        self.create_request('Impresora atascada')
+        self.create_request('Cambio de tóner', note='La impresora del pasillo')
+        queryset = search_requests(Request.objects.all(), 'impresora')
+        if connection.vendor == 'sqlite':
+            # Una sola búsqueda FTS5 unida a la tabla, no una por fila
+            self.assertEqual(str(queryset.query).count('MATCH'), 1)
+        expected = [r.subject for r in queryset]
+        self.assertEqual(expected[-1], 'Cambio de tóner')
+        # También dentro de otra consulta (alias reetiquetados)
+        self.assertEqual(Request.objects.filter(id__in=queryset.values('id')).count(), 3)
+
+        subjects = []
+        url = f"{reverse('request-list')}?q=impresora&page_size=1"
+        while url:
+            data = self.client.get(url).json()
+            subjects.extend(item['subject'] for item in data['results'])
+            url = data['next']
+        self.assertEqual(subjects, expected)
+
+
+class DailyStatsTests(RequestTestMixin, TestCase):
+    def create_request(self, department):
+        return Request.objects.create(
+            subject='Impresora', description='Sin tóner', note='',
+            department=department, technician=self.technician,
+        )
+
+    def totals(self):
+        return sorted(RequestDailyStat.objects.values_list('department__name', 'total'))
+
+    def test_signals_keep_rollups_in_sync(self):
+        first = self.create_request(self.sistemas)
+        self.create_request(self.sistemas)
+        self.assertEqual(self.totals(), [('Sistemas', 2)])
+
+        first.department = self.compras
+        first.save()
+        self.assertEqual(self.totals(), [('Compras', 1), ('Sistemas', 1)])
+
+        first.delete()
+        self.assertEqual(self.totals(), [('Sistemas', 1)])
+
+    def test_rebuild_matches_incremental_counts(self):
+        self.create_request(self.sistemas)
+        self.create_requests(4, department=self.compras)
+        stats.rebuild()
+        self.assertEqual(self.totals(), [('Compras', 4), ('Sistemas', 1)])
+
+    def test_stats_endpoint_reads_only_rollups(self):
+        self.create_requests(3)
+        self.create_requests(2, department=self.rrhh)
+        call_command('rebuild_request_stats', stdout=io.StringIO())
+        today = timezone.localdate().isoformat()
+
+        with self.assertNumQueries(4):
+            data = self.client.get(reverse('request-stats'), {'start_date': today, 'end_date': today}).json()
+        self.assertEqual(data['total'], 5)
+        self.assertEqual(
+            [(row['department_name'], row['total']) for row in data['by_department']],
+            [('RRHH', 2), ('Sistemas', 3)],
+        )
+        self.assertEqual(data['by_technician'][0]['technician_full_name'], 'José Rodríguez')
+        self.assertEqual(data['by_day'], [{'day': today, 'total': 5}])
+
+
+class AssignmentTests(RequestTestMixin, TestCase):
+    def setUp(self):
+        assignment.workload.invalidate()
+        self.addCleanup(assignment.workload.invalidate)
+        self.other = User.objects.create_user(username='tecnico2', is_staff=True)
+        User.objects.create_user(username='inactivo', is_staff=True, is_active=False)
+        User.objects.create_user(username='empleado')
+        self.create_requests(2)
+        self.warm_lookup_caches()
+
+    def post(self, department=None):
+        data = {
+            'subject': 'Sin red', 'description': 'No conecta', 'note': 'Pendiente',
+            'department': (department or self.sistemas).pk,
+        }
+        response = self.client.post(reverse('request-list'), data, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()['technician']
+
+    def test_picks_least_loaded_active_staff(self):
+        Request.objects.create(
+            subject='Resuelta', description='', note='', department=self.sistemas,
+            technician=self.other, status=Request.RESOLVED,
+        )
+        # tecnico tiene 2 abiertas; tecnico2 sólo una resuelta
+        self.assertEqual([self.post() for _ in range(3)], [self.other.pk, self.other.pk, self.technician.pk])
+        self.assertEqual(assignment.workload.loads, {self.technician.pk: 3, self.other.pk: 2})
+
+        # Cerrar una solicitud libera carga sin reconstruir el índice
+        request = Request.objects.filter(technician=self.technician).first()
+        self.client.patch(reverse('request-detail', args=[request.pk]), {'status': 'closed'}, content_type='application/json')
+        self.assertEqual(assignment.workload.loads[self.technician.pk], 2)
+
+    def test_stale_index_is_corrected(self):
+        self.post()
+        # Cambios que no pasan por las señales (otro proceso, UPDATE directo)
+        Request.objects.filter(technician=self.technician).update(status=Request.CLOSED)
+        self.assertEqual(self.post(), self.technician.pk)
+        self.assertEqual(assignment.workload.loads[self.technician.pk], 1)
+
+    def test_bulk_create_balances_load(self):
+        items = [
+            {'subject': f'Importada {i}', 'description': 'Hoja', 'note': 'Migración', 'department': self.sistemas.pk}
+            for i in range(6)
+        ]
+        response = self.client.post(reverse('request-bulk'), items, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        loads = Request.objects.filter(status=Request.OPEN).values('technician').annotate(total=Count('id'))
+        self.assertEqual(sorted(row['total'] for row in loads), [4, 4])
+
+    @override_settings(ASSIGNMENT_AFFINITY_BONUS=2)
+    def test_department_affinity(self):
+        stats.rebuild()
+        # tecnico ya atendió a Sistemas: gana con hasta 2 abiertas de más
+        self.assertEqual(self.post(), self.technician.pk)
+        self.assertEqual(self.post(), self.other.pk)
+        self.assertEqual(self.post(self.compras), self.other.pk)
+
+    def test_without_technicians(self):
+        User.objects.filter(is_staff=True).update(is_staff=False)
+        self.warm_lookup_caches()
+        data = {'subject': 'x', 'description': 'x', 'note': 'x', 'department': self.sistemas.pk}
+        response = self.client.post(reverse('request-list'), data, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('technician', response.json())
+
+
+class ConcurrentAssignmentTests(TransactionTestCase):
+    def test_concurrent_creates_stay_balanced(self):
+        assignment.workload.invalidate()
+        self.addCleanup(assignment.workload.invalidate)
+        department = Department.objects.create(name='Sistemas', director='Ana Pérez')
+        technicians = [User.objects.create_user(username=f'tecnico{i}', is_staff=True) for i in range(3)]
+
+        def create(i):
+            try:
+                with assignment.assignment_lock():
+                    Request.objects.create(
+                        subject=f'Solicitud {i}', description='', note='', department=department,
+                        technician_id=assignment.assign_technician(department.pk),
+                    )
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            list(pool.map(create, range(30)))
+        totals = Request.objects.values('technician').annotate(total=Count('id'))
+        self.assertEqual(sorted(row['total'] for row in totals), [10, 10, 10])
+        self.assertEqual(set(assignment.workload.loads), {technician.pk for technician in technicians})
+
+
+class BulkEndpointTests(RequestTestMixin, TestCase):
+    url = reverse('request-bulk')
+
+    def item(self, i, **extra):
+        return {
+            'subject': f'Importada {i}', 'description': 'Desde la hoja de cálculo', 'note': 'Migración',
+            'department': self.sistemas.pk, 'technician': self.technician.pk, **extra,
+        }
+
+    def test_bulk_create_uses_fixed_queries(self):
+        self.client.post(self.url, [self.item(0)], content_type='application/json')
+        with CaptureQueriesContext(connection) as small:
+            response = self.client.post(self.url, [self.item(i) for i in range(3)], content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post(self.url, [self.item(i) for i in range(300)], content_type='application/json')
+        self.assertEqual(len(response.json()), 300)
+        # SQLite parte los INSERT por el límite de parámetros; nunca es una consulta por elemento
+        fields = [field for field in Request._meta.concrete_fields if not field.primary_key]
+        batches = -(-300 // connection.ops.bulk_batch_size(fields, [None] * 300))
+        self.assertLessEqual(len(large.captured_queries), len(small.captured_queries) + batches - 1)
+        self.assertEqual(RequestDailyStat.objects.get().total, 304)
+        self.assertEqual(len(search_requests(Request.objects.all(), 'importada')), 304)
+
+    def test_reports_errors_per_item_without_writing(self):
+        items = [self.item(0), self.item(1, department=999), self.item(2, subject='')]
+        response = self.client.post(self.url, items, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()
+        self.assertEqual(errors[0], {})
+        self.assertIn('department', errors[1])
+        self.assertIn('subject', errors[2])
+        self.assertFalse(Request.objects.exists())
+
+    def test_rejects_ids_on_create_and_repeated_ids_on_update(self):
+        response = self.client.post(self.url, [self.item(0, id=999)], content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('id', response.json()[0])
+        self.assertFalse(Request.objects.exists())
+
+        self.create_requests(1)
+        pk = Request.objects.get().pk
+        changes = [{'id': pk, 'note': 'Primera'}, {'id': pk, 'note': 'Segunda'}]
+        response = self.client.patch(self.url, changes, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()[1], {'id': ['La solicitud aparece más de una vez en la lista.']})
+        self.assertNotIn(Request.objects.get().note, ('Primera', 'Segunda'))
+
+    def test_bulk_update_and_delete(self):
+        self.create_requests(3)
+        stats.rebuild()
+        ids = list(Request.objects.values_list('id', flat=True))
+
+        changes = [{'id': pk, 'department': self.compras.pk} for pk in ids[:2]] + [{'id': 999, 'note': 'x'}]
+        response = self.client.patch(self.url, changes, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()[2], {'id': ['La solicitud no existe.']})
+
+        response = self.client.patch(self.url, changes[:2], content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Request.objects.filter(department=self.compras).count(), 2)
+        self.assertEqual(sorted(RequestDailyStat.objects.values_list('department__name', 'total')), [('Compras', 2), ('Sistemas', 1)])
+
+        response = self.client.delete(self.url, {'ids': ids[:2] + [999]}, content_type='application/json')
+        self.assertEqual(response.json(), {'deleted': 2, 'missing': [999]})
+        self.assertEqual(list(RequestDailyStat.objects.values_list('department__name', 'total')), [('Sistemas', 1)])
+
+
+class ExportTests(RequestTestMixin, TestCase):
+    url = reverse('request-export')
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_csv_and_ndjson_honour_filters(self):
+        self.create_requests(2)
+        content = self.export(start_date=timezone.localdate().isoformat()).decode('utf-8-sig')
+        lines = content.splitlines()
+        self.assertEqual(lines[0], 'id,subject,description,note,department,department_name,technician,technician_full_name,created_at')
+        self.assertEqual(len(lines), 3)
+        self.assertIn('José Rodríguez', lines[1])
+
+        self.assertEqual(self.export(export_format='ndjson', start_date='2000-01-01', end_date='2000-01-02'), b'')
+        rows = self.export(export_format='ndjson').splitlines()
+        self.assertEqual(json.loads(rows[0])['department_name'], 'Sistemas')
+
+    def test_xlsx_is_a_valid_workbook(self):
+        self.create_requests(3)
+        archive = zipfile.ZipFile(io.BytesIO(self.export(export_format='xlsx')))
+        self.assertIsNone(archive.testzip())
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row>'), 4)
+
+    def test_rejects_unknown_format(self):
+        response = self.client.get(self.url, {'export_format': 'pdf'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_streaming_keeps_memory_bounded(self):
+        insert_requests(200000, [self.sistemas, self.compras], [self.technician], batch_size=10000, seed=1)
+        response = self.client.get(self.url, {'export_format': 'csv'})
+
+        tracemalloc.start()
+        try:
+            total = 0
+            for chunk in response.streaming_content:
+                total += len(chunk)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertGreater(total, 200000 * 50)
+        self.assertLess(peak, 10 * 1024 * 1024)
+
+
+class SingleReportsTests(RequestTestMixin, TestCase):
+    url = reverse('request-single-reports')
+
+    def setUp(self):
+        self.client.force_login(self.technician)
+
+    def post(self, **data):
+        return self.client.post(self.url, data, content_type='application/json')
+
+    def test_zip_has_one_document_per_request_in_order(self):
+        self.create_requests(3)
+        ids = list(Request.objects.order_by('-id').values_list('id', flat=True))
+        with self.assertNumQueries(3):
+            # sesión, usuario y una sola consulta de solicitudes
+            response = self.post(ids=ids + [999999])
+        self.assertEqual(response.status_code, 200)
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(archive.namelist(), [f'informe_solicitud_{pk}.docx' for pk in ids])
+        document = zipfile.ZipFile(io.BytesIO(archive.read(archive.namelist()[0])))
+        self.assertIn('Ana Pérez', document.read('word/document.xml').decode())
+
+    def test_merged_document_contains_every_request(self):
+        self.create_requests(2)
+        Request.objects.filter(subject='Solicitud 1').update(description='Pantalla rota')
+        today = timezone.localdate().isoformat()
+        response = self.post(start_date=today, end_date=today, output='merged')
+        self.assertEqual(response.status_code, 200)
+        body = zipfile.ZipFile(io.BytesIO(response.content)).read('word/document.xml').decode()
+        self.assertIn('Equipo sin conexión', body)
+        self.assertIn('Pantalla rota', body)
+
+    def test_validation(self):
+        self.assertEqual(self.post(output='zip').status_code, 400)
+        self.assertEqual(self.post(start_date='2024-02-01', end_date='2024-01-01').status_code, 400)
+        self.assertEqual(self.post(ids=[999999]).status_code, 404)
+        self.client.logout()
+        self.assertEqual(self.post(ids=[1]).status_code, 403)
+
+    def test_range_over_the_limit(self):
+        self.create_requests(3)
+        today = timezone.localdate().isoformat()
+        with patch('request.views.SINGLE_REPORTS_MAX_ITEMS', 2), patch('request.views.render_single_reports') as render:
+            response = self.post(start_date=today, end_date=today)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('2', response.data['detail'])
+        render.assert_not_called()
+        with patch('request.views.SINGLE_REPORTS_MAX_ITEMS', 3):
+            self.assertEqual(self.post(start_date=today, end_date=today).status_code, 200)
+
+
+class DocxTemplateRegistryTests(TestCase):
+    def setUp(self):
+        self.addCleanup(docx_templates.clear)
+
+    def test_resolves_templates_independently_of_cwd(self):
+        cwd = os.getcwd()
+        self.addCleanup(os.chdir, cwd)
+        os.chdir(tempfile.gettempdir())
+        doc = docx_templates.load(docx_templates.SINGLE_REPORT_TEMPLATE)
+        self.assertIn('request.description', doc.get_xml())
+
+    def test_copies_do_not_share_rendered_state(self):
+        first = docx_templates.load(docx_templates.SINGLE_REPORT_TEMPLATE)
+        first.render({'request': {'description': 'Impresora atascada'}})
+        second = docx_templates.load(docx_templates.SINGLE_REPORT_TEMPLATE)
+        self.assertNotIn('Impresora atascada', second.get_xml())
+        self.assertIn('request.description', second.get_xml())
+
+    def test_reloads_when_file_changes(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        name = docx_templates.SINGLE_REPORT_TEMPLATE
+        other = docx_templates.template_path(docx_templates.REPORT_TEMPLATE)
+        shutil.copy(docx_templates.template_path(name), path)
+        with override_settings(REPORT_TEMPLATES_DIR=path):
+            before = docx_templates.template_hash(name)
+            self.assertEqual(docx_templates.template_hash(name), before)
+            shutil.copy(other, os.path.join(path, name))
+            self.assertNotEqual(docx_templates.template_hash(name), before)
+            self.assertNotIn('request.description', docx_templates.load(name).get_xml())
+
+    def test_missing_template(self):
+        with self.assertRaises(FileNotFoundError):
+            docx_templates.warm_up('no_existe.docx')
+
+
+class SpanishDateTests(RequestTestMixin, TestCase):
+    def test_formats_without_locale(self):
+        self.assertEqual(spanish_date(date(2025, 3, 5)), '05 de marzo del 2025')
+        self.assertEqual(spanish_date(datetime(2024, 12, 31, 23, 0)), '31 de diciembre del 2024')
+        # 02:00 UTC del 1 de enero es todavía 31 de diciembre en Caracas
+        self.assertEqual(spanish_date(datetime(2025, 1, 1, 2, 0, tzinfo=dt_timezone.utc)), '31 de diciembre del 2024')
+        self.assertEqual(
+            spanish_range(date(2025, 1, 1), date(2025, 8, 15)),
+            'Desde el 01 de enero del 2025 hasta el 15 de agosto del 2025',
+        )
+
+    def test_thread_safe(self):
+        days = [date(2025, month, 1) for month in range(1, 13)] * 50
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(spanish_date, days))
+        self.assertEqual(results[:2], ['01 de enero del 2025', '01 de febrero del 2025'])
+        self.assertEqual(results[-1], '01 de diciembre del 2025')
+
+    def test_reports_do_not_touch_setlocale(self):
+        self.use_temp_dir('REPORT_CACHE_DIR')
+        self.client.force_login(self.technician)
+        self.create_requests(1)
+        request = Request.objects.get()
+        today = timezone.localdate().isoformat()
+        with patch.object(locale, 'setlocale', side_effect=AssertionError('setlocale')):
+            items = list(iter_report_items(request.created_at, request.created_at))
+            report = self.client.get(reverse('request-generate-report'), {'start_date': today, 'end_date': today})
+            b''.join(report.streaming_content)
+            single = self.client.get(reverse('request-generate-single-report', args=[request.pk]))
+        self.assertEqual(items[0]['date'], spanish_date(request.created_at))
+        self.assertEqual(report.status_code, 200)
+        self.assertEqual(single.status_code, 200)
+        body = zipfile.ZipFile(io.BytesIO(single.content)).read('word/document.xml').decode()
+        self.assertIn(spanish_date(request.created_at), body)
+
+
+class LookupCacheTests(RequestTestMixin, TestCase):
+    def setUp(self):
+        self.warm_lookup_caches()
+
+    def test_list_names_come_from_the_cache(self):
+        self.create_requests(3)
+        # versión para la ETag + el listado, sin consultar nombres
+        with self.assertNumQueries(2):
+            data = self.client.get(reverse('request-list')).json()['results']
+        self.assertEqual({item['department_name'] for item in data}, {'Sistemas'})
+        self.assertEqual(data[0]['technician_full_name'], 'José Rodríguez')
+
+    def test_renames_invalidate_the_cache(self):
+        self.create_requests(1)
+        self.sistemas.name = 'Tecnología'
+        self.sistemas.save()
+        self.technician.last_name = 'Rodríguez Pérez'
+        self.technician.save()
+        item = self.client.get(reverse('request-list')).json()['results'][0]
+        self.assertEqual(item['department_name'], 'Tecnología')
+        self.assertEqual(item['technician_full_name'], 'José Rodríguez Pérez')
+
+    def test_last_login_does_not_invalidate_technicians(self):
+        before = cache_stats()['technicians']['invalidations']
+        self.client.force_login(self.technician)
+        self.assertEqual(cache_stats()['technicians']['invalidations'], before)
+
+    def test_unknown_id_reloads_once(self):
+        # Departamento creado sin señales, como si viniera de otro proceso
+        Department.objects.bulk_create([Department(name='Legal', director='Rosa Díaz')])
+        legal = Department.objects.get(name='Legal')
+        self.create_requests(1, department=legal)
+        with self.assertNumQueries(3):
+            item = self.client.get(reverse('request-list')).json()['results'][0]
+        self.assertEqual(item['department_name'], 'Legal')
+
+
+class ConditionalGetTests(RequestTestMixin, TestCase):
+    url = reverse('request-list')
+
+    def setUp(self):
+        self.warm_lookup_caches()
+        self.create_requests(2)
+
+    def get(self, url=None, **headers):
+        return self.client.get(url or self.url, headers=headers)
+
+    def test_unchanged_list_returns_304_without_serializing(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+
+        with self.assertNumQueries(1), patch.object(RequestSerializer, 'to_representation') as serialize:
+            response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        serialize.assert_not_called()
+
+        self.assertEqual(self.get(if_modified_since=response['Last-Modified']).status_code, 304)
+        self.assertNotEqual(self.client.get(self.url, {'fields': 'id'})['ETag'], etag)
+
+    def test_changes_produce_a_new_etag(self):
+        etags = {self.get()['ETag']}
+        request = Request.objects.first()
+
+        request.subject = 'Editada'
+        request.save()
+        etags.add(self.get()['ETag'])
+        self.sistemas.name = 'Tecnología'
+        self.sistemas.save()
+        etags.add(self.get()['ETag'])
+        request.delete()
+        etags.add(self.get()['ETag'])
+        self.create_requests(1)
+        response = self.get(if_none_match=self.get()['ETag'])
+        etags.add(response['ETag'])
+
+        self.assertEqual(len(etags), 5)
+        self.assertEqual(response.status_code, 304)
+
+    def test_version_comes_from_the_database(self):
+        # Cambios hechos por otro proceso: sin señales ni caché de éste
+        etag = self.get()['ETag']
+        Request.objects.filter(pk=Request.objects.order_by('pk').first().pk).update(
+            subject='Editada', updated_at=timezone.now(),
+        )
+        response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get(if_none_match=etag).status_code, 304)
+        RequestDeletionMark.touch()
+        self.assertEqual(self.get(if_none_match=etag).status_code, 200)
+
+    def test_row_leaving_the_filter_changes_the_etag(self):
+        url = f'{self.url}?status=open'
+        etag = self.get(url)['ETag']
+        # La otra sigue abierta y sigue siendo la más reciente del filtro
+        request = Request.objects.order_by('pk').first()
+        request.status = Request.RESOLVED
+        request.save()
+        response = self.get(url, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 1)
+
+        async_url = f"{reverse('async-request-list')}?status=open"
+        etag = self.get(async_url)['ETag']
+        request.status = Request.OPEN
+        request.save()
+        self.assertEqual(self.get(async_url, if_none_match=etag).status_code, 200)
+
+    def test_detail(self):
+        url = reverse('request-detail', args=[Request.objects.first().pk])
+        etag = self.get(url)['ETag']
+        self.assertEqual(self.get(url, if_none_match=etag).status_code, 304)
+        self.client.patch(url, {'note': 'Cerrada'}, content_type='application/json')
+        response = self.get(url, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['note'], 'Cerrada')
+
+
+class AsyncViewsTests(RequestTestMixin, TestCase):
+    def setUp(self):
+        self.warm_lookup_caches()
+        self.create_requests(3)
+        self.create_requests(2, department=self.compras)
+        stats.rebuild()
+
+    async def compare(self, name, params=None, args=()):
+        sync = await sync_to_async(self.client.get)(reverse(name, args=args), params or {})
+        response = await self.async_client.get(reverse(f'async-{name}', args=args), params or {})
+        self.assertEqual(response.status_code, sync.status_code)
+        self.assertEqual(response['Content-Type'], sync['Content-Type'])
+        return sync, response
+
+    async def test_list_matches_the_sync_view(self):
+        for params in ({}, {'fields': 'id,subject,department_name'}, {'start_date': '2000-01-01'}, {'start_date': 'ayer'}):
+            sync, response = await self.compare('request-list', params)
+            self.assertEqual(response.content, sync.content)
+
+        sync, response = await self.compare('request-list', {'page_size': 2})
+        self.assertEqual(response.json()['results'], sync.json()['results'])
+        self.assertIn('/api/async/requests/?cursor=', response.json()['next'])
+
+    async def test_detail_and_stats_match_the_sync_views(self):
+        pk = (await Request.objects.afirst()).pk
+        for args in ((pk,), (pk + 100,)):
+            sync, response = await self.compare('request-detail', args=args)
+            self.assertEqual(response.content, sync.content)
+
+        today = timezone.localdate().isoformat()
+        for params in ({'start_date': today, 'end_date': today}, {'start_date': today}):
+            sync, response = await self.compare('request-stats', params)
+            self.assertEqual(response.content, sync.content)
+
+    def test_conditional_get_and_queries(self):
+        url = reverse('async-request-list')
+        get = async_to_sync(self.async_client.get)
+        # Versión + listado: los nombres salen de la caché
+        with self.assertNumQueries(2):
+            response = get(url)
+
+        response = get(url, headers={'if-none-match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(async_to_sync(self.async_client.post)(url).status_code, 405)
+
+
+class RequestEventsTests(RequestTestMixin, TestCase):
+    def setUp(self):
+        self.token = Token.objects.create(user=self.technician)
+
+    async def open_stream(self, query):
+        communicator = ApplicationCommunicator(request_events, {
+            'type': 'http', 'method': 'GET', 'path': EVENTS_PATH,
+            'query_string': query.encode(), 'headers': [],
+        })
+        await communicator.send_input({'type': 'http.request', 'body': b''})
+        start = await communicator.receive_output(2)
+        return communicator, start
+
+    async def close_stream(self, communicator):
+        await communicator.send_input({'type': 'http.disconnect'})
+        await communicator.wait(2)
+
+    def create_committed(self, department):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Request.objects.create(
+                subject='Impresora atascada', description='Sin papel', note='Urgente',
+                department=department, technician=self.technician,
+            )
+
+    async def test_streams_filtered_events(self):
+        communicator, start = await self.open_stream(f'token={self.token.key}&department={self.sistemas.pk}')
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream; charset=utf-8'), start['headers'])
+        self.assertEqual((await communicator.receive_output(2))['body'], b'retry: 5000\n\n')
+
+        await sync_to_async(self.create_committed)(self.compras)
+        created = await sync_to_async(self.create_committed)(self.sistemas)
+        body = (await communicator.receive_output(2))['body'].decode()
+        self.assertTrue(body.startswith('id: 1\nevent: created\n'))
+        event = json.loads(body.split('data: ')[1])
+        self.assertEqual((event['id'], event['department']), (created.pk, self.sistemas.pk))
+
+        await self.close_stream(communicator)
+        self.assertFalse(get_broker()._subscriptions)
+
+    async def test_moving_a_request_notifies_the_previous_department(self):
+        request = await sync_to_async(self.create_committed)(self.sistemas)
+        communicator, _ = await self.open_stream(f'token={self.token.key}&department={self.sistemas.pk}')
+        await communicator.receive_output(2)
+
+        def move():
+            with self.captureOnCommitCallbacks(execute=True):
+                request.department = self.compras
+                request.save()
+        await sync_to_async(move)()
+        event = json.loads((await communicator.receive_output(2))['body'].decode().split('data: ')[1])
+        self.assertEqual(event['type'], 'updated')
+        self.assertEqual((event['department'], event['previous_department']), (self.compras.pk, self.sistemas.pk))
+        await self.close_stream(communicator)
+
+    async def test_heartbeat(self):
+        with override_settings(REQUEST_EVENTS_HEARTBEAT=0.05):
+            communicator, _ = await self.open_stream(f'token={self.token.key}')
+            await communicator.receive_output(2)
+            self.assertEqual((await communicator.receive_output(2))['body'], b': ping\n\n')
+            await self.close_stream(communicator)
+
+    async def test_requires_a_staff_token(self):
+        _, start = await self.open_stream('')
+        self.assertEqual(start['status'], 401)
+        user = await sync_to_async(User.objects.create_user)(username='externo')
+        token = await sync_to_async(Token.objects.create)(user=user)
+        _, start = await self.open_stream(f'token={token.key}')
+        self.assertEqual(start['status'], 403)
+
+    async def test_slow_client_gets_a_reset_instead_of_unbounded_queue(self):
+        subscription = Subscription(asyncio.get_running_loop(), max_queue=2)
+        for i in range(5):
+            subscription.deliver({'type': 'created', 'id': i})
+        self.assertEqual(subscription.queue.qsize(), 1)
+        self.assertEqual(subscription.queue.get_nowait(), {'type': 'reset'})
+        self.assertEqual(subscription.dropped, 5)
+        subscription.deliver({'type': 'created', 'id': 5})
+        self.assertEqual(subscription.queue.get_nowait()['id'], 5)
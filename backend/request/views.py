@@ -1,51 +1,99 @@
 import io
-from docxtpl import DocxTemplate, InlineImage
-from docx.shared import Cm
-from django.http import FileResponse, HttpResponse
-from django.utils.timezone import make_aware
-from datetime import datetime, time
-import os
-import locale
-import pandas as pd
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-from tempfile import NamedTemporaryFile
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import parse_etags, quote_etag
+from datetime import datetime, timedelta
 
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework import viewsets, permissions, status
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404 
 
-from .models import Request
-from .serializers import RequestSerializer
+from .models import Request, ReportJob, RequestComment, RequestDeletionMark
+from .serializers import (
+    RequestSerializer,
+    RequestCommentSerializer,
+    ReportJobSerializer,
+    BulkRequestSerializer,
+    BulkDeleteSerializer,
+    SingleReportsSerializer,
+    requested_fields,
+)
+from .exports import EXPORT_FORMATS, export_rows
+from .single_reports import (
+    SINGLE_REPORTS_MAX_ITEMS,
+    merge_single_reports,
+    render_single_report,
+    render_single_reports,
+    single_report_context,
+    single_reports_requests,
+    zip_single_reports,
+)
+from .bulk import BULK_MAX_ITEMS, bulk_create_requests, bulk_update_requests, bulk_delete_requests
+from .pagination import CommentCursorPagination, RequestCursorPagination
 from .filters import RequestFilter
-from department.models import Department
+from . import assignment, docx_templates, report_cache, stats as request_stats
+from .reports import report_range, render_report
+from core.mixins import ConditionalGetMixin
+from department.lookups import departments_cache
+from user.lookups import technicians_cache
 from django.contrib.auth import get_user_model
 
 from django.utils import timezone
 
 User = get_user_model()
 
-class RequestViewSet(viewsets.ModelViewSet):
-    queryset = Request.objects.all().order_by('-created_at')
+# Solicitudes que devuelve la cola de trabajo
+QUEUE_MAX_ITEMS = 200
+# Rango de /metrics si no se indican fechas
+METRICS_DEFAULT_DAYS = 30
+
+class RequestViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    # Los nombres de departamento y técnico vienen de la caché de consultas
+    queryset = Request.objects.order_by('-created_at', '-id')
     permission_classes = [permissions.AllowAny]
     serializer_class = RequestSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_class = RequestFilter
+    pagination_class = RequestCursorPagination
+
+    # ETag: la versión sale de la base de datos, igual en todos los procesos:
+    # la última solicitud modificada de toda la tabla, haya filtros o no
+    # (índice updated_at, id), y la fecha de la última baja, en una consulta
+    # y sin COUNT(*) que recorra la tabla. Las respuestas muestran nombres de
+    # departamentos y técnicos de sus cachés.
+    version_caches = (departments_cache, technicians_cache)
+    conditional_latest = ('-updated_at', '-id')
+    conditional_fields = ('updated_at',)
+    conditional_annotations = {'last_deleted_at': RequestDeletionMark.latest()}
+
+    # Columnas de texto largo que no se leen si ?fields= no las pide
+    deferrable_fields = ('description', 'note')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        requested = requested_fields(self.request)
+        if requested:
+            skipped = [name for name in self.deferrable_fields if name not in requested]
+            if skipped:
+                queryset = queryset.defer(*skipped)
+        return queryset
+
+    def perform_create(self, serializer):
+        if serializer.validated_data.get('technician') is not None:
+            serializer.save()
+            return
+        # Sin técnico: el de menor carga de trabajo, dentro del bloqueo de asignación
+        with assignment.assignment_lock():
+            try:
+                technician_id = assignment.assign_technician(serializer.validated_data['department'].pk)
+            except assignment.NoTechnicianAvailable as e:
+                raise ValidationError({'technician': [str(e)]})
+            serializer.save(technician_id=technician_id)
 
     @action(detail=False, methods=['get'], url_path='generate_report')
     def generate_report(self, request):
-        # Configuracion meses a español
-        try:
-            locale.setlocale(locale.LC_TIME, 'es_ES.UTF-8')
-        except locale.Error:
-            try:
-                locale.setlocale(locale.LC_TIME, 'Spanish_Spain.1252')
-            except locale.Error:
-                locale.setlocale(locale.LC_TIME, '')
-
         # Obtiene fechas del query
         start_date = request.GET.get('start_date')
         end_date = request.GET.get('end_date')
@@ -54,78 +102,187 @@ class RequestViewSet(viewsets.ModelViewSet):
             return Response({"error": "Parámetros start_date y end_date requeridos."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            start = make_aware(datetime.strptime(start_date, "%Y-%m-%d"))
-            end = make_aware(datetime.combine(datetime.strptime(end_date, "%Y-%m-%d"), time.max))
+            start, end = report_range(
+                datetime.strptime(start_date, "%Y-%m-%d").date(),
+                datetime.strptime(end_date, "%Y-%m-%d").date(),
+            )
         except ValueError:
             return Response({"error": "Formato de fecha inválido. Usa YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
 
-        requests = Request.objects.filter(created_at__range=(start, end))
+        # Informe en caché: mismo rango, plantilla y datos
+        key = report_cache.report_key(start, end)
+        cached = report_cache.get(key, start, end)
+        report_file = None
+        if cached is not None:
+            path, etag = cached
+            if quote_etag(etag) in parse_etags(request.headers.get('If-None-Match', '')):
+                response = HttpResponseNotModified()
+                response['ETag'] = quote_etag(etag)
+                return response
+            try:
+                report_file = open(path, 'rb')
+            except FileNotFoundError:
+                # Otro proceso lo expulsó de la caché entre get() y open(): se regenera
+                pass
+        if report_file is None:
+            report_file = io.BytesIO()
+            render_report(start, end, report_file)
+            _, etag = report_cache.put(key, start, end, report_file.getvalue())
+            report_file.seek(0)
+
+        response = FileResponse(report_file, as_attachment=True, filename='reporte_solicitudes.docx')
+        response['ETag'] = quote_etag(etag)
+        response['Cache-Control'] = 'private, no-cache'
+        return response
 
-        # Procesa las solicitudes
-        report_items = []
-        for req in requests:
-            report_items.append({
-                'id': req.id,
-                'subject': req.subject,
-                'description': req.description,
-                'department': req.department.id,
-                'department_name': req.department.name,
-                'technician': req.technician.id,
-                'technician_full_name': f"{req.technician.first_name} {req.technician.last_name}".strip(),
-                'created_at': req.created_at.isoformat(),
-                'date': req.created_at.strftime('%d de %B del %Y'),
-                'note': req.note,
-            })
+    # Altas, cambios y bajas masivas (migraciones desde hojas de cálculo, cierres por lote)
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request):
+        if request.method == 'DELETE':
+            serializer = BulkDeleteSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            ids = serializer.validated_data['ids']
+            missing = bulk_delete_requests(ids)
+            return Response({'deleted': len(set(ids)) - len(missing), 'missing': missing})
+
+        partial = request.method == 'PATCH'
+        serializer = BulkRequestSerializer(data=request.data, many=True, partial=partial, max_length=BULK_MAX_ITEMS)
+        serializer.is_valid(raise_exception=True)
+        if partial:
+            requests = bulk_update_requests(serializer.validated_data)
+        else:
+            try:
+                requests = bulk_create_requests(serializer.validated_data)
+            except assignment.NoTechnicianAvailable as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        data = RequestSerializer(requests, many=True, context=self.get_serializer_context()).data
+        return Response(data, status=status.HTTP_200_OK if partial else status.HTTP_201_CREATED)
+
+    # Exportación en streaming: respeta los mismos filtros que el listado
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        export_format = request.GET.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"Formato no soportado. Usa uno de: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Datos de departamentos para gráfico
-        dept_data = Department.objects.all()
-        unique_dept_names = sorted([dept.name for dept in dept_data])
-        req_by_dept = {}
-        for r in report_items:
-            d_name = r['department_name']
-            req_by_dept[d_name] = req_by_dept.get(d_name, 0) + 1
+        stream, content_type = EXPORT_FORMATS[export_format]
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(stream(export_rows(queryset)), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="solicitudes.{export_format}"'
+        return response
 
-        exist_counts = pd.Series(req_by_dept)
-        full_counts = exist_counts.reindex(unique_dept_names, fill_value=0).sort_index()
+    # Métricas del tablero calculadas con los acumulados diarios
+    @action(detail=False, methods=['get'], url_path='stats')
+    def stats(self, request):
+        start_date = request.GET.get('start_date')
+        end_date = request.GET.get('end_date')
 
-        # Genera gráfico y guarda temporalmente
-        with NamedTemporaryFile(suffix=".png", delete=False) as chart_file:
-            plt.figure(figsize=(10, 6))
-            full_counts.plot(kind='bar', color='skyblue')
-            plt.title('Número de Solicitudes por Departamento')
-            plt.xlabel('Departamento')
-            plt.ylabel('Número de Solicitudes')
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            plt.savefig(chart_file.name, dpi=300)
-            plt.close()
-            chart_path = chart_file.name
+        if not start_date or not end_date:
+            return Response({"error": "Parámetros start_date y end_date requeridos."}, status=status.HTTP_400_BAD_REQUEST)
 
-        doc = DocxTemplate(os.path.join('formato', 'formato_informe_grafica.docx')) # Esta es tu plantilla para el informe con gráfico
+        try:
+            start = datetime.strptime(start_date, "%Y-%m-%d").date()
+            end = datetime.strptime(end_date, "%Y-%m-%d").date()
+        except ValueError:
+            return Response({"error": "Formato de fecha inválido. Usa YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Rango de fechas en texto
-        rango_fechas = f"Desde el {start.strftime('%d de %B del %Y')} hasta el {end.strftime('%d de %B del %Y')}"
+        return Response(request_stats.summary(start, end))
 
-        context = {
-            'items': report_items,
-            'dept_chart': InlineImage(doc, chart_path, Cm(15)),
-            'rango_fechas': rango_fechas
-        }
-
-        # Guarda el .docx temporalmente
-        with NamedTemporaryFile(suffix=".docx", delete=False) as tmp_docx:
-            doc.render(context)
-            doc.save(tmp_docx.name)
-            tmp_docx.seek(0)
-            response = FileResponse(open(tmp_docx.name, 'rb'), as_attachment=True, filename='reporte_solicitudes.docx')
+    # Abiertas por estado y tiempo promedio de resolución, agregados en la base
+    @action(detail=False, methods=['get'], url_path='metrics')
+    def metrics(self, request):
+        start_date = request.GET.get('start_date')
+        end_date = request.GET.get('end_date')
 
-        # eliminar el gráfico
         try:
-            os.remove(chart_path)
-        except Exception as e:
-            print(f"Error al borrar gráfico: {e}")
+            end = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else timezone.localdate()
+            start = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else end - timedelta(days=METRICS_DEFAULT_DAYS)
+        except ValueError:
+            return Response({"error": "Formato de fecha inválido. Usa YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
 
-        return response
+        return Response({
+            'open': request_stats.open_counts(),
+            'resolution': request_stats.resolution_summary(start, end),
+        })
+
+    # Cola de trabajo de un técnico: abiertas por prioridad y antigüedad
+    @action(detail=False, methods=['get'], url_path='queue')
+    def queue(self, request):
+        technician = request.GET.get('technician')
+        if technician is None:
+            if not request.user.is_authenticated:
+                return Response({"error": "Parámetro technician requerido."}, status=status.HTTP_400_BAD_REQUEST)
+            technician = request.user.pk
+        elif not technician.isdigit():
+            return Response({"error": "El parámetro technician debe ser un id."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Mismo filtro y orden que el índice parcial request_open_queue_idx
+        queryset = (
+            self.get_queryset()
+            .filter(technician_id=technician, status__in=Request.OPEN_STATUSES)
+            .order_by('-priority', 'created_at', 'id')[:QUEUE_MAX_ITEMS]
+        )
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    # Hilo de comentarios: los internos sólo los ve el equipo de soporte
+    @action(detail=True, methods=['get', 'post'], url_path='comments', permission_classes=[permissions.IsAuthenticated])
+    def comments(self, request, pk=None):
+        report_request = get_object_or_404(Request.objects.only('id'), pk=pk)
+        context = self.get_serializer_context()
+
+        if request.method == 'POST':
+            serializer = RequestCommentSerializer(data=request.data, context=context)
+            serializer.is_valid(raise_exception=True)
+            comment = serializer.save(request=report_request, author=request.user)
+            return Response(RequestCommentSerializer(comment, context=context).data, status=status.HTTP_201_CREATED)
+
+        comments = RequestComment.objects.filter(request=report_request).select_related('author')
+        if not request.user.is_staff:
+            comments = comments.filter(internal=False)
+        paginator = CommentCursorPagination()
+        page = paginator.paginate_queryset(comments, request, view=self)
+        return paginator.get_paginated_response(RequestCommentSerializer(page, many=True, context=context).data)
+
+    @action(
+        detail=True, methods=['delete'], url_path=r'comments/(?P<comment_id>\d+)', url_name='comment',
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def delete_comment(self, request, pk=None, comment_id=None):
+        comment = get_object_or_404(RequestComment, pk=comment_id, request_id=pk)
+        if not request.user.is_staff and comment.author_id != request.user.pk:
+            return Response(
+                {"detail": "Sólo el autor o el equipo de soporte pueden borrar este comentario."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        comment.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    # Cola de informes: se generan en el worker (process_report_jobs)
+    @action(detail=False, methods=['post'], url_path='reports', url_name='report-jobs')
+    def create_report_job(self, request):
+        serializer = ReportJobSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        requested_by = request.user if request.user.is_authenticated else None
+        job = serializer.save(requested_by=requested_by)
+        return Response(ReportJobSerializer(job, context={'request': request}).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=['get'], url_path=r'reports/(?P<job_id>\d+)', url_name='report-job')
+    def report_job_status(self, request, job_id=None):
+        job = get_object_or_404(ReportJob, pk=job_id)
+        return Response(ReportJobSerializer(job, context={'request': request}).data)
+
+    @action(detail=False, methods=['get'], url_path=r'reports/(?P<job_id>\d+)/download', url_name='report-job-download')
+    def download_report_job(self, request, job_id=None):
+        job = get_object_or_404(ReportJob, pk=job_id)
+        if job.status != ReportJob.DONE or not job.result:
+            return Response(
+                {"detail": "El informe todavía no está disponible.", "status": job.status},
+                status=status.HTTP_409_CONFLICT
+            )
+        return FileResponse(job.result.open('rb'), as_attachment=True, filename='reporte_solicitudes.docx')
 
     # Nueva acción para generar reporte por ID
     @action(detail=True, methods=['get'], url_path='generate_single_report') # detail=True indica que espera un ID en la URL
@@ -149,39 +306,15 @@ class RequestViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        try:
-            locale.setlocale(locale.LC_TIME, 'es_ES.UTF-8')
-        except locale.Error:
-            try:
-                locale.setlocale(locale.LC_TIME, 'Spanish_Spain.1252')
-            except locale.Error:
-                locale.setlocale(locale.LC_TIME, '')
-                
-        context = {
-            'request': {
-                'id': report_request.id,
-                'subject': report_request.subject,
-                'description': report_request.description,
-                'note': report_request.note,
-                'created_at': timezone.localtime(report_request.created_at).strftime('%d de %B del %Y'),
-                'depardepartment_director': report_request.department.director,
-                'department_name': report_request.department.name if report_request.department else 'N/A',
-                'technician_full_name': f"{report_request.technician.first_name} {report_request.technician.last_name}".strip() if report_request.technician else 'N/A',
-            }
-        }
+        context = single_report_context(report_request)
 
         try:
-            template_path = os.path.join('formato', 'formato_informe2.docx')
-            doc = DocxTemplate(template_path)
-            doc.render(context)
-
-            buffer = io.BytesIO()
-            doc.save(buffer)
-            buffer.seek(0)
+            template_path = docx_templates.template_path(docx_templates.SINGLE_REPORT_TEMPLATE)
+            content = render_single_report(context)
 
             filename = f"informe_solicitud_{report_request.id}.docx"
             response = HttpResponse(
-                buffer.getvalue(),
+                content,
                 content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
             )
             response["Content-Disposition"] = f'attachment; filename="{filename}"'
@@ -197,6 +330,65 @@ class RequestViewSet(viewsets.ModelViewSet):
                 {"detail": f"Error al generar el informe: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+    # Informes individuales de varias solicitudes: un .docx unido o un ZIP
+    @action(detail=False, methods=['post'], url_path='single_reports', url_name='single-reports')
+    def generate_single_reports(self, request):
+        user = request.user
+
+        if not user.is_authenticated or (not user.is_superuser and not user.is_staff):
+            return Response(
+                {"detail": "No tienes permisos para generar este informe."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        serializer = SingleReportsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if 'ids' in data:
+            requests = single_reports_requests(ids=data['ids'])
+        else:
+            start, end = report_range(data['start_date'], data['end_date'])
+            # Una de más para saber si el rango supera el límite sin contarlas
+            requests = single_reports_requests(start=start, end=end, limit=SINGLE_REPORTS_MAX_ITEMS + 1)
+            if len(requests) > SINGLE_REPORTS_MAX_ITEMS:
+                return Response(
+                    {"detail": f"El rango incluye más de {SINGLE_REPORTS_MAX_ITEMS} solicitudes. Acota las fechas o indica los ids."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        if not requests:
+            return Response(
+                {"detail": "No se encontraron solicitudes para el informe."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            docx_templates.warm_up(docx_templates.SINGLE_REPORT_TEMPLATE)
+        except FileNotFoundError:
+            template_path = docx_templates.template_path(docx_templates.SINGLE_REPORT_TEMPLATE)
+            return Response(
+                {"detail": f"La plantilla del informe '{template_path}' no se encontró en el servidor. Asegúrate de que la ruta es correcta."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        contexts = [single_report_context(report_request) for report_request in requests]
+
+        if data['output'] == 'merged':
+            content = merge_single_reports(render_single_reports(contexts))
+            response = HttpResponse(
+                content,
+                content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+            )
+            response["Content-Disposition"] = 'attachment; filename="informes_solicitudes.docx"'
+            return response
+
+        response = StreamingHttpResponse(
+            zip_single_reports(requests, contexts),
+            content_type='application/zip'
+        )
+        response["Content-Disposition"] = 'attachment; filename="informes_solicitudes.zip"'
+        return response
             
 """""
         -------------------------------------------------------------------------
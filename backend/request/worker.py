@@ -0,0 +1,15 @@
+# Funciones que ejecutan los procesos del pool de process_report_jobs.
+# Este módulo no importa modelos al cargarse: los procesos se crean con
+# "spawn" y Django todavía no está inicializado cuando se deserializan.
+import django
+
+
+def init_worker():
+    django.setup()
+    from .charts import warm_up
+    warm_up()
+
+
+def run_job(job_id):
+    from .jobs import run_report_job
+    return run_report_job(job_id)
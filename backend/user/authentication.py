@@ -0,0 +1,97 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+
+from core.cache import register
+from core.replicas import use_primary
+from .models import TokenRevocation
+
+
+class TokenCache:
+    """
+    LRU acotado en memoria con vencimiento: token -> (usuario, token).
+    Cada entrada guarda la versión de TokenRevocation con la que se cargó y
+    deja de valer cuando esa versión cambia, aunque el cambio lo haya hecho
+    otro proceso.
+    """
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                user, token, expires, entry_version = entry
+                if entry_version == version and expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    # Copias: el usuario de cada petición no se comparte entre hilos
+                    return copy.copy(user), copy.copy(token)
+                del self._entries[key]
+            self.misses += 1
+        return None
+
+    def set(self, key, user, token, version):
+        entry = (copy.copy(user), copy.copy(token), time.monotonic() + self.ttl, version)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            hits, misses, size = self.hits, self.misses, len(self._entries)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / total, 4) if total else None,
+            'size': size,
+        }
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_MAX_SIZE, settings.TOKEN_CACHE_TTL)
+register('auth_token_lru', token_cache)
+
+
+def invalidate_tokens():
+    """
+    Descarta los tokens en caché de todos los procesos (desactivación de un
+    usuario, borrado de un token, cambio de contraseña...).
+    """
+    TokenRevocation.bump()
+    token_cache.clear()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication sin la consulta Token + User en cada petición: el
+    resultado se guarda en token_cache durante TOKEN_CACHE_TTL segundos. En
+    su lugar se lee la versión de TokenRevocation (una fila por clave
+    primaria), que corta el acceso en cuanto se revoca un token.
+    """
+    def authenticate_credentials(self, key):
+        version = TokenRevocation.current()
+        cached = token_cache.get(key, version)
+        if cached is not None:
+            return cached
+        # Token y usuario de la principal: justo después del login la réplica
+        # puede no tener el token todavía
+        with use_primary():
+            user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, token, version)
+        return user, token
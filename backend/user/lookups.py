@@ -0,0 +1,44 @@
+from django.contrib.auth.models import User
+
+from core.cache import VersionedCache
+
+technicians_cache = VersionedCache('technicians')
+
+
+def full_name(first_name, last_name):
+    return f"{first_name} {last_name}".strip()
+
+
+def _load_names():
+    return {
+        pk: full_name(first_name, last_name)
+        for pk, first_name, last_name in User.objects.values_list('id', 'first_name', 'last_name')
+    }
+
+
+def technician_names(require=None):
+    """
+    Diccionario {id: nombre completo}. Si ``require`` no está se recarga
+    una vez.
+    """
+    names = technicians_cache.get_or_set('names', _load_names)
+    if require is not None and require not in names:
+        names = technicians_cache.refresh('names', _load_names)
+    return names
+
+
+async def _aload_names():
+    return {
+        pk: full_name(first_name, last_name)
+        async for pk, first_name, last_name in User.objects.values_list('id', 'first_name', 'last_name')
+    }
+
+
+async def atechnician_names(require=None):
+    """
+    Versión async de technician_names para las vistas ASGI.
+    """
+    names = await technicians_cache.aget_or_set('names', _aload_names)
+    if require is not None and require not in names:
+        names = await technicians_cache.arefresh('names', _aload_names)
+    return names
@@ -1,3 +1,33 @@
 from django.db import models
+from django.db.models import F
 
-# Create your models here.
+from core.replicas import use_primary
+
+
+class TokenRevocation(models.Model):
+    """
+    Fila única con la versión de los tokens en caché
+    (user.authentication.TokenCache). Cada revocación la incrementa y cada
+    proceso la compara con la de sus entradas en cada petición: al estar en
+    la base de datos, una baja cierra el acceso en todos los workers a la vez.
+    """
+    version = models.BigIntegerField(default=0, verbose_name='Versión')
+
+    class Meta:
+        verbose_name = 'Revocación de tokens'
+        verbose_name_plural = 'Revocaciones de tokens'
+
+    def __str__(self):
+        return f"Versión {self.version}"
+
+    @classmethod
+    def current(cls):
+        # En la principal: una réplica atrasada devolvería la versión de
+        # antes de la baja
+        with use_primary():
+            return cls.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def bump(cls):
+        if not cls.objects.filter(pk=1).update(version=F('version') + 1):
+            cls.objects.get_or_create(pk=1, defaults={'version': 1})
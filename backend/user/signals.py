@@ -0,0 +1,30 @@
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .authentication import invalidate_tokens
+from .lookups import technicians_cache
+
+# Campos que cambian seguido y no afectan a los nombres en caché
+IGNORED_FIELDS = {'last_login'}
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_technicians_cache(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) <= IGNORED_FIELDS:
+        return
+    technicians_cache.invalidate()
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_tokens(sender, instance, update_fields=None, **kwargs):
+    # Desactivar o cambiar la contraseña debe cortar el acceso al instante
+    if update_fields and set(update_fields) <= IGNORED_FIELDS:
+        return
+    invalidate_tokens()
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_tokens()
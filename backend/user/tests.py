@@ -1,3 +1,98 @@
+import time
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+
+from core.cache import clear_lookup_caches
+from .authentication import TokenCache, token_cache
+
+
+class UserConditionalGetTests(TestCase):
+    url = reverse('user-list')
+
+    def setUp(self):
+        clear_lookup_caches()
+        self.addCleanup(clear_lookup_caches)
+        self.admin = User.objects.create_user(username='admin', password='clave-segura-123', is_staff=True, is_superuser=True)
+        self.other = User.objects.create_user(username='baja', is_staff=True)
+        User.objects.create_user(username='tecnico', password='clave-segura-123', is_staff=True)
+        self.client.force_login(self.admin)
+
+    def test_list_etag_follows_changes(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, headers={'if-none-match': etag}).status_code, 304)
+
+        self.client.post(reverse('user-toggle-active', args=[self.other.pk]))
+        response = self.client.get(self.url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        # last_login no invalida la caché de técnicos, pero sí cambia la ETag
+        self.client.login(username='tecnico', password='clave-segura-123')
+        self.assertEqual(self.client.get(self.url, headers={'if-none-match': etag}).status_code, 200)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        self.admin = User.objects.create_user(username='admin', is_staff=True, is_superuser=True)
+        self.technician = User.objects.create_user(username='tecnico', is_staff=True)
+        self.admin_token = Token.objects.create(user=self.admin)
+        self.token = Token.objects.create(user=self.technician)
+
+    def get(self, token):
+        url = reverse('user-detail', args=[self.technician.pk])
+        return self.client.get(url, headers={'authorization': f'Token {token.key}'})
+
+    def test_second_request_skips_the_token_query(self):
+        with self.assertNumQueries(3):
+            # versión de revocación, token + usuario, y el usuario pedido
+            self.assertEqual(self.get(self.token).status_code, 200)
+        with self.assertNumQueries(2):
+            self.assertEqual(self.get(self.token).status_code, 200)
+        self.assertEqual(self.get(self.token).wsgi_request.user, self.technician)
+
+    def test_deactivated_user_is_locked_out_immediately(self):
+        self.get(self.token)
+        response = self.client.post(
+            reverse('user-toggle-active', args=[self.technician.pk]),
+            headers={'authorization': f'Token {self.admin_token.key}'},
+        )
+        self.assertFalse(response.json()['is_active'])
+        self.assertEqual(self.get(self.token).status_code, 401)
+
+    def test_revocation_reaches_other_workers(self):
+        # Cada worker tiene su LRU; la baja la atiende el de token_cache
+        other_worker = TokenCache(max_size=10, ttl=60)
+        with patch('user.authentication.token_cache', other_worker):
+            self.assertEqual(self.get(self.token).status_code, 200)
+            self.assertEqual(other_worker.stats()['size'], 1)
+
+        self.client.post(
+            reverse('user-toggle-active', args=[self.technician.pk]),
+            headers={'authorization': f'Token {self.admin_token.key}'},
+        )
+        with patch('user.authentication.token_cache', other_worker):
+            self.assertEqual(self.get(self.token).status_code, 401)
+
+    def test_deleted_token_is_rejected(self):
+        self.get(self.token)
+        self.token.delete()
+        self.assertEqual(self.get(self.token).status_code, 401)
+
+    def test_lru_is_bounded_and_entries_expire(self):
+        cache = TokenCache(max_size=2, ttl=60)
+        for key in ('a', 'b', 'c'):
+            cache.set(key, self.technician, self.token, 1)
+        self.assertIsNone(cache.get('a', 1))
+        self.assertEqual(cache.get('c', 1)[0], self.technician)
 
-# Create your tests here.
+        now = time.monotonic()
+        with patch('user.authentication.time.monotonic', return_value=now + 61):
+            self.assertIsNone(cache.get('c', 1))
+        self.assertEqual(cache.stats()['size'], 1)
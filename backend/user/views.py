@@ -2,6 +2,8 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.contrib.auth.models import User
+from core.mixins import ConditionalGetMixin
+from .lookups import technicians_cache
 from .serializers import UserSerializer
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.authtoken.models import Token
@@ -11,10 +13,13 @@ from rest_framework.permissions import IsAuthenticated
 
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = User.objects.all().order_by('-date_joined')
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
+    version_caches = (technicians_cache,)
+    # last_login cambia en cada inicio de sesión sin invalidar la caché
+    conditional_fields = ('date_joined', 'last_login')
 
     @action(detail=True, methods=['post'], url_path='toggle-active', permission_classes=[permissions.IsAdminUser])
     def toggle_active(self, request, pk=None):
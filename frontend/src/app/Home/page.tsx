@@ -164,10 +164,11 @@ export default function HomePage() {
 
       let url = `${process.env.NEXT_PUBLIC_BACKEND_URL}/api/requests/`;
 
-      const params = new URLSearchParams();
+      // El panel muestra todas las solicitudes del rango: lista sin paginar
+      const params = new URLSearchParams({ paginate: "false" });
       if (startDate) params.append("start_date", startDate);
       if (endDate) params.append("end_date", endDate);
-      if (params.toString()) url += `?${params.toString()}`;
+      url += `?${params.toString()}`;
 
       const res = await fetch(url, {
         headers: {